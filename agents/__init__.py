@@ -1,13 +1,19 @@
 """
 AI Agents for the Customer Sentiment Alert System.
 Each agent has a specialized role in the sentiment analysis pipeline.
+
+Agent factories are imported lazily so that importing this package does not
+pull in CrewAI or LangChain until an agent is actually created.
 """
+from importlib import import_module
 
-from .monitor_agent import create_monitor_agent
-from .sentiment_analyzer import create_sentiment_analyzer
-from .priority_ranker import create_priority_ranker
-from .context_investigator import create_context_investigator
-from .response_coordinator import create_response_coordinator
+_LAZY_EXPORTS = {
+    "create_monitor_agent": "agents.monitor_agent",
+    "create_sentiment_analyzer": "agents.sentiment_analyzer",
+    "create_priority_ranker": "agents.priority_ranker",
+    "create_context_investigator": "agents.context_investigator",
+    "create_response_coordinator": "agents.response_coordinator",
+}
 
 __all__ = [
     "create_monitor_agent",
@@ -15,4 +21,10 @@ __all__ = [
     "create_priority_ranker",
     "create_context_investigator",
     "create_response_coordinator"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,7 +6,8 @@ from typing import Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
 
-from config import settings
+from agents.routing import RoutedAgent
+from runtime.clients import get_client_registry
 
 
 def create_context_investigator(llm: Optional[ChatOpenAI] = None) -> Agent:
@@ -27,13 +28,9 @@ def create_context_investigator(llm: Optional[ChatOpenAI] = None) -> Agent:
     """
     
     if llm is None:
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.3  # Moderate temperature for pattern recognition
-        )
+        llm = get_client_registry().chat_model(temperature=0.3)  # Moderate temperature for pattern recognition
     
-    context_investigator = Agent(
+    context_investigator = RoutedAgent(
         role="Chief Digital Forensics & Systematic Pattern Intelligence Analyst",
         goal=(
             "Deploy advanced pattern recognition algorithms and investigative methodologies to conduct deep "
@@ -7,10 +7,14 @@ from crewai import Agent
 from langchain_openai import ChatOpenAI
 
 from tools.tavily_search import TavilyCompanySearchTool
-from config import settings
+from agents.routing import RoutedAgent
+from runtime.clients import get_client_registry
 
 
-def create_monitor_agent(llm: Optional[ChatOpenAI] = None) -> Agent:
+def create_monitor_agent(
+    llm: Optional[ChatOpenAI] = None,
+    search_tool: Optional[TavilyCompanySearchTool] = None
+) -> Agent:
     """
     Create a Monitor Agent that searches the real internet for company mentions.
     
@@ -19,22 +23,20 @@ def create_monitor_agent(llm: Optional[ChatOpenAI] = None) -> Agent:
     
     Args:
         llm: Optional language model to use. Defaults to OpenAI GPT-4o-mini.
+        search_tool: Optional search tool to share with callers that run the
+            search directly (MONITOR_MODE=tool). A new one is created otherwise.
         
     Returns:
         Configured Monitor Agent ready to search real internet data
     """
     
     if llm is None:
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.3
-        )
+        llm = get_client_registry().chat_model(temperature=0.3)
     
     # Initialize the Tavily search tool
-    tavily_tool = TavilyCompanySearchTool()
+    tavily_tool = search_tool or TavilyCompanySearchTool()
     
-    monitor_agent = Agent(
+    monitor_agent = RoutedAgent(
         role="Elite Digital Intelligence & Real-Time Internet Surveillance Specialist",
         goal=(
             "Execute comprehensive real-time surveillance of digital ecosystems to identify, capture, and analyze "
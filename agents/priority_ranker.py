@@ -6,7 +6,8 @@ from typing import Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
 
-from config import settings
+from agents.routing import RoutedAgent
+from runtime.clients import get_client_registry
 
 
 def create_priority_ranker(llm: Optional[ChatOpenAI] = None) -> Agent:
@@ -28,13 +29,9 @@ def create_priority_ranker(llm: Optional[ChatOpenAI] = None) -> Agent:
     """
     
     if llm is None:
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.2  # Low temperature for consistent scoring
-        )
+        llm = get_client_registry().chat_model(temperature=0.2)  # Low temperature for consistent scoring
     
-    priority_ranker = Agent(
+    priority_ranker = RoutedAgent(
         role="Strategic Risk Assessment & Executive Decision Support Specialist",
         goal=(
             "Execute sophisticated multi-dimensional risk analysis to mathematically quantify business impact "
@@ -2,16 +2,185 @@
 Response Coordinator Agent for creating email previews and response strategies.
 This agent creates EMAIL PREVIEWS showing what would be sent to different departments.
 DOES NOT send actual emails - only generates preview content.
+
+In "fanout" mode (RESPONSE_MODE) each department's email is written by its own
+concurrent LLM call over a shared, compacted context, and the results are
+merged by EmailPreviewTool, so the stage takes as long as the slowest email
+rather than the sum of all of them.
 """
-from typing import Optional
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
+from pydantic import Field
 
 from tools.email_preview import EmailPreviewTool
+from agents.routing import RouteDecision, RoutedAgent
 from config import settings
+from runtime.clients import get_client_registry
+
+logger = logging.getLogger(__name__)
+
+# Separator CrewAI places between the outputs of context tasks
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+# Department emails written in fan-out mode, keyed by department id
+DEPARTMENT_EMAILS = {
+    "engineering": {
+        "department": "Engineering",
+        "to": "engineering@company.com",
+        "issue_type": "Technical Issues",
+        "focus": "technical defects and reliability problems, with evidence and fix priorities"
+    },
+    "pr": {
+        "department": "PR/Marketing",
+        "to": "pr@company.com",
+        "issue_type": "Reputation Management",
+        "focus": "reputation risk, public messaging and media exposure"
+    },
+    "support": {
+        "department": "Customer Support",
+        "to": "support@company.com",
+        "issue_type": "Customer Response",
+        "focus": "response templates for affected customers and escalation guidance"
+    },
+    "management": {
+        "department": "Management",
+        "to": "management@company.com",
+        "issue_type": "Strategic Decisions",
+        "focus": "business impact, decisions required and success metrics"
+    },
+}
+
+
+def compact_context(context: str, max_chars: int) -> str:
+    """
+    Shrink the shared task context to roughly `max_chars`.
+    
+    Each context section (one per upstream task) gets an equal share of the
+    budget so that no single stage's output crowds out the others.
+    """
+    if len(context) <= max_chars:
+        return context
+    
+    sections = context.split(CONTEXT_SEPARATOR)
+    share = max(200, max_chars // len(sections))
+    return CONTEXT_SEPARATOR.join(
+        section if len(section) <= share else section[:share].rstrip() + " [...]"
+        for section in sections
+    )
+
+
+def parse_email_reply(reply: str, department: Dict[str, str]) -> Dict[str, str]:
+    """
+    Turn a department email reply into EmailPreviewTool input.
+    
+    The model is asked for JSON; anything else is kept as the email body.
+    """
+    email = {}
+    start, end = reply.find("{"), reply.rfind("}")
+    if start != -1 and end > start:
+        try:
+            email = json.loads(reply[start:end + 1])
+        except json.JSONDecodeError:
+            email = {}
+    if not isinstance(email, dict) or not email.get("body"):
+        email = {"body": reply.strip()}
+    
+    return {
+        "to": department["to"],
+        "subject": str(email.get("subject") or f"{department['department']} action required"),
+        "body": str(email["body"]),
+        "priority": str(email.get("priority") or "HIGH").upper(),
+        "issue_type": department["issue_type"]
+    }
 
 
-def create_response_coordinator(llm: Optional[ChatOpenAI] = None) -> Agent:
+class FanoutResponseCoordinator(RoutedAgent):
+    """
+    Response Coordinator that writes each department's email concurrently.
+    
+    CrewAI calls execute_task() for the response stage as usual; instead of a
+    single long generation, one short LLM call is made per department and the
+    replies are merged into one preview document with EmailPreviewTool. With
+    a model router attached, the per-department calls use the routed model.
+    """
+    chat_llm: Any = Field(default=None, description="Chat model used for the per-department calls")
+    departments: List[str] = Field(default_factory=lambda: list(DEPARTMENT_EMAILS))
+    fanout_timeout: float = Field(default=20.0, description="Seconds to wait for the department emails")
+    context_max_chars: int = Field(default=6000, description="Size budget for the shared context")
+    
+    def routed_copy(self, decision: RouteDecision) -> "FanoutResponseCoordinator":
+        """Use the routed model for the per-department calls of this execution."""
+        routed = super().routed_copy(decision)
+        routed.chat_llm = self.router.chat_llm(decision, self.base_llm)
+        return routed
+    
+    def _execute(self, task: Any, context: Optional[str] = None, tools: Optional[List[Any]] = None) -> str:
+        """
+        Generate and merge the department email previews for a task.
+        
+        Args:
+            task: The response task being executed
+            context: Output of the upstream tasks
+            tools: Unused; merging is done locally with EmailPreviewTool
+            
+        Returns:
+            Formatted email previews for all departments that answered in time
+        """
+        shared_context = compact_context(context or "", self.context_max_chars)
+        departments = [DEPARTMENT_EMAILS[key] for key in self.departments]
+        
+        pool = ThreadPoolExecutor(max_workers=len(departments), thread_name_prefix="email-fanout")
+        futures = {
+            pool.submit(self._write_email, task.description, department, shared_context): department
+            for department in departments
+        }
+        done, not_done = wait(futures, timeout=self.fanout_timeout)
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+        emails = []
+        missing = []
+        for future, department in futures.items():
+            if future in not_done:
+                missing.append(f"{department['department']} (timed out)")
+                continue
+            try:
+                emails.append(future.result())
+            except Exception as e:
+                logger.warning(f"{department['department']} email generation failed: {str(e)}")
+                missing.append(f"{department['department']} (failed)")
+        
+        preview_tool = EmailPreviewTool()
+        output = preview_tool._run(json.dumps(emails)) + preview_tool.format_email_summary(emails)
+        if missing:
+            output += "\n⚠️ No preview generated for: " + ", ".join(missing)
+        return output
+    
+    def _write_email(self, assignment: str, department: Dict[str, str], shared_context: str) -> Dict[str, str]:
+        """Ask the model for a single department's email."""
+        messages = [
+            ("system", f"You are the {self.role}. {self.goal}"),
+            ("human", (
+                f"{assignment}\n\n"
+                f"Write ONLY the email for the {department['department']} team ({department['to']}), "
+                f"focused on {department['focus']}.\n\n"
+                f"Analysis so far:\n{shared_context}\n\n"
+                f'Reply with a JSON object with the keys "subject", "priority" '
+                f'(CRITICAL, HIGH, MEDIUM or LOW) and "body".'
+            )),
+        ]
+        reply = self.chat_llm.invoke(messages)
+        return parse_email_reply(getattr(reply, "content", str(reply)), department)
+
+
+def create_response_coordinator(
+    llm: Optional[ChatOpenAI] = None,
+    mode: Optional[str] = None,
+    departments: Optional[List[str]] = None
+) -> Agent:
     """
     Create a Response Coordinator Agent that generates email previews.
     
@@ -25,22 +194,33 @@ def create_response_coordinator(llm: Optional[ChatOpenAI] = None) -> Agent:
     
     Args:
         llm: Optional language model to use. Defaults to OpenAI GPT-4o-mini.
+        mode: "single" (one generation for all emails) or "fanout" (one
+            concurrent call per department). Defaults to settings.RESPONSE_MODE.
+        departments: Department ids to write emails for in fanout mode.
+            Defaults to all of DEPARTMENT_EMAILS.
         
     Returns:
         Configured Response Coordinator Agent ready to create email previews
     """
     
     if llm is None:
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.4  # Moderate creativity for email writing
-        )
+        llm = get_client_registry().chat_model(temperature=0.4)  # Moderate creativity for email writing
     
     # Initialize the email preview tool
     email_preview_tool = EmailPreviewTool()
     
-    response_coordinator = Agent(
+    agent_class = RoutedAgent
+    fanout_options = {}
+    if (mode or settings.RESPONSE_MODE) == "fanout":
+        agent_class = FanoutResponseCoordinator
+        fanout_options = {
+            "chat_llm": llm,
+            "departments": departments or list(DEPARTMENT_EMAILS),
+            "fanout_timeout": settings.RESPONSE_FANOUT_TIMEOUT_SECONDS,
+            "context_max_chars": settings.RESPONSE_CONTEXT_MAX_CHARS
+        }
+    
+    response_coordinator = agent_class(
         role="Executive Crisis Communication Architect & Strategic Response Orchestrator",
         goal=(
             "Engineer precision-crafted communication strategies that transform crisis intelligence into "
@@ -81,7 +261,8 @@ def create_response_coordinator(llm: Optional[ChatOpenAI] = None) -> Agent:
         verbose=True,
         max_iter=2,
         memory=True,
-        allow_delegation=False
+        allow_delegation=False,
+        **fanout_options
     )
     
     return response_coordinator
\ No newline at end of file
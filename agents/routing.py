@@ -0,0 +1,317 @@
+"""
+Per-stage model routing for the workflow agents.
+Each stage gets its own model, max tokens and timeout. When a stage's rolling
+p95 latency exceeds its SLO, requests fall back to a faster model, with an
+occasional probe of the primary model so routing recovers once it is fast
+again. Every routing decision and its observed latency is recorded per task.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from crewai import Agent
+from pydantic import Field
+
+from config import settings
+from runtime.clients import get_client_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StageRoute:
+    """Model settings for one workflow stage. Unset models use the configured defaults."""
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    timeout: float = 60.0
+    slo_p95_seconds: Optional[float] = None
+    fallback_model: Optional[str] = None
+
+
+# Built-in routes. Extraction-style stages get tight token budgets; response
+# drafting gets the largest budget. Override per stage in MODEL_ROUTES_PATH.
+DEFAULT_STAGE_ROUTES: Dict[str, StageRoute] = {
+    "monitor": StageRoute(max_tokens=4000, timeout=45.0, slo_p95_seconds=10.0),
+    "sentiment": StageRoute(max_tokens=3000, timeout=45.0, slo_p95_seconds=12.0),
+    "priority": StageRoute(max_tokens=2500, timeout=45.0, slo_p95_seconds=10.0),
+    "investigation": StageRoute(max_tokens=2500, timeout=45.0, slo_p95_seconds=12.0),
+    "response": StageRoute(max_tokens=4000, timeout=60.0, slo_p95_seconds=15.0),
+}
+
+_ROUTE_FIELDS = {f.name for f in fields(StageRoute)}
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The model settings chosen for one stage execution, and why."""
+    stage: str
+    model: str
+    max_tokens: Optional[int]
+    timeout: float
+    fallback: bool
+    reason: str
+    p95_seconds: Optional[float]
+    slo_p95_seconds: Optional[float]
+
+
+def load_stage_routes(path: Optional[str] = None) -> Dict[str, StageRoute]:
+    """Built-in stage routes with per-stage overrides from the routes file applied."""
+    routes = dict(DEFAULT_STAGE_ROUTES)
+    path = path if path is not None else settings.MODEL_ROUTES_PATH
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for stage, overrides in data.get("stages", {}).items():
+                changes = {key: value for key, value in overrides.items() if key in _ROUTE_FIELDS}
+                routes[stage] = replace(routes.get(stage, StageRoute()), **changes)
+        except (OSError, ValueError, TypeError) as e:
+            logger.error(f"Failed to load model routes from {path}: {e}")
+    return routes
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies with a p95 estimate."""
+    
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=max(1, size))
+    
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def p95(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class ModelRouter:
+    """
+    Chooses the model for each stage execution and tracks its latency.
+    
+    A stage is served by its primary model until the primary's rolling p95
+    latency exceeds the stage SLO (after `min_samples` observations). It
+    then falls back to the faster model, sending every `probe_every`-th
+    request to the primary so its latency estimate stays current.
+    """
+    
+    def __init__(
+        self,
+        routes: Optional[Dict[str, StageRoute]] = None,
+        default_model: Optional[str] = None,
+        fallback_model: Optional[str] = None,
+        window: int = 50,
+        min_samples: int = 5,
+        probe_every: int = 10,
+        max_records: int = 1000
+    ):
+        self.routes = routes if routes is not None else dict(DEFAULT_STAGE_ROUTES)
+        self.default_model = default_model or settings.OPENAI_MODEL_NAME
+        self.fallback_model = fallback_model or settings.MODEL_FALLBACK_NAME
+        self.window = window
+        self.min_samples = min_samples
+        self.probe_every = max(1, probe_every)
+        self.max_records = max_records
+        
+        self._latency: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._fallback_count: Dict[str, int] = {}
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+    
+    def route(self, stage: str) -> RouteDecision:
+        """Pick the model settings for the next execution of a stage."""
+        spec = self.routes.get(stage, StageRoute())
+        primary = spec.model or self.default_model
+        fallback = spec.fallback_model or self.fallback_model
+        
+        with self._lock:
+            window = self._latency.get((stage, primary))
+            p95 = window.p95() if window is not None else None
+            slow = (
+                spec.slo_p95_seconds is not None
+                and p95 is not None
+                and len(window) >= self.min_samples
+                and p95 > spec.slo_p95_seconds
+            )
+            if not slow or fallback == primary:
+                model, use_fallback = primary, False
+                reason = "slo_exceeded_no_fallback" if slow else "primary"
+            else:
+                count = self._fallback_count.get(stage, 0) + 1
+                self._fallback_count[stage] = count
+                if count % self.probe_every == 0:
+                    model, use_fallback, reason = primary, False, "probe"
+                else:
+                    model, use_fallback, reason = fallback, True, "p95_over_slo"
+        
+        return RouteDecision(
+            stage=stage,
+            model=model,
+            max_tokens=spec.max_tokens,
+            timeout=spec.timeout,
+            fallback=use_fallback,
+            reason=reason,
+            p95_seconds=round(p95, 3) if p95 is not None else None,
+            slo_p95_seconds=spec.slo_p95_seconds
+        )
+    
+    def stages_without_fallback(self) -> List[str]:
+        """Stages with an SLO whose fallback model is the same as their primary model."""
+        return [
+            stage for stage, spec in self.routes.items()
+            if spec.slo_p95_seconds is not None
+            and (spec.fallback_model or self.fallback_model) == (spec.model or self.default_model)
+        ]
+    
+    def observe(self, decision: RouteDecision, seconds: float, task_id: Any = None, status: str = "ok") -> None:
+        """Record the latency of a routed execution, and the decision for its task."""
+        with self._lock:
+            key = (decision.stage, decision.model)
+            if key not in self._latency:
+                self._latency[key] = LatencyWindow(self.window)
+            self._latency[key].add(seconds)
+            if not decision.fallback and decision.reason == "primary":
+                self._fallback_count.pop(decision.stage, None)
+            
+            if task_id is not None:
+                record = asdict(decision)
+                record.update({"latency_seconds": round(seconds, 3), "status": status})
+                self._records[str(task_id)] = record
+                self._records.move_to_end(str(task_id))
+                while len(self._records) > self.max_records:
+                    self._records.popitem(last=False)
+    
+    def pop_records(self, tasks: List[Any]) -> List[Dict[str, Any]]:
+        """Routing records of a run's tasks, in task order, removed from the router."""
+        with self._lock:
+            records = [self._records.pop(str(task.id), None) for task in tasks]
+        return [record for record in records if record is not None]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Rolling p95 and sample count per stage and model."""
+        with self._lock:
+            return {
+                f"{stage}:{model}": {"p95_seconds": window.p95(), "samples": len(window)}
+                for (stage, model), window in self._latency.items()
+            }
+    
+    def crew_llm(self, decision: RouteDecision, base: Any) -> Any:
+        """CrewAI LLM for a decision, inheriting temperature and credentials from `base`."""
+        from crewai import LLM
+        
+        # CrewAI calls OpenAI through LiteLLM, which uses the pooled client session
+        get_client_registry().openai_http_client()
+        temperature = getattr(base, "temperature", None)
+        key = ("crew", decision.model, decision.max_tokens, decision.timeout, temperature)
+        with self._lock:
+            if key not in self._clients:
+                options = {
+                    "model": decision.model,
+                    "max_tokens": decision.max_tokens,
+                    "timeout": decision.timeout,
+                    "temperature": temperature,
+                    "api_key": getattr(base, "api_key", None) or settings.OPENAI_API_KEY,
+                    "base_url": getattr(base, "base_url", None),
+                }
+                self._clients[key] = LLM(**{k: v for k, v in options.items() if v is not None})
+            return self._clients[key]
+    
+    def chat_llm(self, decision: RouteDecision, base: Any) -> Any:
+        """LangChain chat model for a decision, for agents that call the model directly."""
+        return get_client_registry().chat_model(
+            decision.model,
+            temperature=getattr(base, "temperature", None),
+            max_tokens=decision.max_tokens,
+            timeout=decision.timeout
+        )
+
+
+class RoutedAgent(Agent):
+    """
+    Agent whose model is chosen by a ModelRouter for every task it executes.
+    
+    Without a router (or stage) it behaves exactly like a plain Agent.
+    """
+    stage: Optional[str] = Field(default=None, description="Workflow stage used to look up the route")
+    router: Any = Field(default=None, exclude=True, description="ModelRouter choosing the model per task")
+    base_llm: Any = Field(default=None, exclude=True, description="LLM the agent was created with")
+    
+    def execute_task(self, task: Any, context: Optional[str] = None, tools: Optional[List[Any]] = None) -> str:
+        if self.router is None or self.stage is None:
+            return self._execute(task, context, tools)
+        
+        decision = self.router.route(self.stage)
+        routed = self.routed_copy(decision)
+        started = time.monotonic()
+        status = "ok"
+        try:
+            return routed._execute(task, context, tools)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.router.observe(decision, time.monotonic() - started, task_id=task.id, status=status)
+    
+    def routed_copy(self, decision: RouteDecision) -> "RoutedAgent":
+        """
+        Shallow copy of the agent with the decision's model settings.
+        
+        The routed model only applies to this one execution; the agent
+        itself keeps its configured LLM, and the executor CrewAI builds for
+        the task is set on the copy.
+        """
+        return self.model_copy(update={"llm": self.router.crew_llm(decision, self.base_llm)})
+    
+    def _execute(self, task: Any, context: Optional[str], tools: Optional[List[Any]]) -> str:
+        return super().execute_task(task, context, tools)
+
+
+def attach_router(agents: Dict[str, Any], router: Optional[ModelRouter]) -> None:
+    """Route each RoutedAgent in `agents` (keyed by stage) through `router`."""
+    if router is None:
+        return
+    for stage, agent in agents.items():
+        if isinstance(agent, RoutedAgent):
+            if agent.base_llm is None:
+                agent.base_llm = agent.llm
+            agent.stage = stage
+            agent.router = router
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> Optional[ModelRouter]:
+    """Process-wide router configured from the MODEL_* settings, or None when routing is off."""
+    global _router
+    if not settings.MODEL_ROUTING_ENABLED:
+        return None
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter(
+                    routes=load_stage_routes(),
+                    window=settings.MODEL_LATENCY_WINDOW,
+                    min_samples=settings.MODEL_LATENCY_MIN_SAMPLES,
+                    probe_every=settings.MODEL_FALLBACK_PROBE_EVERY
+                )
+                same = _router.stages_without_fallback()
+                if same:
+                    logger.warning(
+                        f"Fallback model equals the primary model for stages {', '.join(same)}; "
+                        f"their SLOs cannot trigger a fallback (set MODEL_FALLBACK_NAME or fallback_model)"
+                    )
+    return _router
@@ -6,7 +6,8 @@ from typing import Optional
 from crewai import Agent
 from langchain_openai import ChatOpenAI
 
-from config import settings
+from agents.routing import RoutedAgent
+from runtime.clients import get_client_registry
 
 
 def create_sentiment_analyzer(llm: Optional[ChatOpenAI] = None) -> Agent:
@@ -27,13 +28,9 @@ def create_sentiment_analyzer(llm: Optional[ChatOpenAI] = None) -> Agent:
     """
     
     if llm is None:
-        llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.1  # Lower temperature for consistent analysis
-        )
+        llm = get_client_registry().chat_model(temperature=0.1)  # Lower temperature for consistent analysis
     
-    sentiment_analyzer = Agent(
+    sentiment_analyzer = RoutedAgent(
         role="Chief Emotional Intelligence & Psycholinguistic Analysis Specialist",
         goal=(
             "Deploy cutting-edge psycholinguistic analysis and emotional intelligence algorithms to decode the "
@@ -0,0 +1,11 @@
+"""
+Local analytics for the Customer Sentiment Alert System.
+Deterministic, in-process computations over mention data that replace or
+support LLM stages.
+"""
+
+from .clustering import MentionClusterer
+from .mentions import extract_mentions
+from .priority import PriorityEngine, PriorityWeights
+
+__all__ = ["extract_mentions", "MentionClusterer", "PriorityEngine", "PriorityWeights"]
@@ -0,0 +1,361 @@
+"""
+Local mention clustering for isolated-vs-systemic issue detection.
+Mentions are vectorized as hashed, L2-normalized TF-IDF over word unigrams and
+bigrams, stored as CSR arrays, and grouped by cosine similarity: a leader
+pass followed by one reassignment pass against the cluster centroids.
+The Context Investigator then reads compact cluster summaries (size,
+cross-platform spread, top terms, representative mentions) instead of every
+mention. SciPy sparse matrices are used for the reassignment pass when SciPy
+is installed; otherwise the same product is computed blockwise with NumPy.
+"""
+import json
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from analytics.priority import _issue_category
+
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9'+-]*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can could did do does for from had has have he her his how i if in "
+    "into is it its just me more my no not of on or our out over so than that the their them then there "
+    "these they this to too up us was we were what when which who why will with would you your "
+    "about after all also am any because before being both each few get got here only other same should "
+    "some such very via what's it's i'm don't can't".split()
+)
+
+# Dense cells per block when computing similarities without SciPy
+_CHUNK_CELLS = 1 << 22
+
+
+class SparseRows:
+    """
+    Rows of an L2-normalized sparse matrix in CSR layout.
+    
+    `indptr`, `indices` and `data` follow the scipy.sparse.csr_matrix
+    convention, so the rows can be handed to SciPy without copying.
+    """
+    
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_features: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_features = n_features
+    
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+    
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+    
+    def subset(self, order: np.ndarray) -> "SparseRows":
+        """The given rows, in that order."""
+        starts, ends = self.indptr[order], self.indptr[order + 1]
+        lengths = ends - starts
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        positions = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return SparseRows(indptr, self.indices[positions], self.data[positions], self.n_features)
+    
+    def dot(self, dense_t: np.ndarray) -> np.ndarray:
+        """Product with a dense (n_features, k) matrix, as a dense (rows, k) array."""
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            return self._dot_numpy(dense_t)
+        matrix = csr_matrix((self.data, self.indices, self.indptr), shape=(len(self), self.n_features))
+        return np.asarray(matrix @ dense_t)
+    
+    def _dot_numpy(self, dense_t: np.ndarray) -> np.ndarray:
+        # Only the features present in these rows matter, so multiply dense
+        # blocks over that (small) vocabulary with BLAS
+        used, columns = np.unique(self.indices, return_inverse=True)
+        compact = np.ascontiguousarray(dense_t[used], dtype=np.float32)
+        row_of = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        result = np.zeros((len(self), dense_t.shape[1]), dtype=np.float32)
+        chunk = max(1, _CHUNK_CELLS // max(len(used), 1))
+        for start in range(0, len(self), chunk):
+            end = min(start + chunk, len(self))
+            lo, hi = self.indptr[start], self.indptr[end]
+            if hi == lo:
+                continue
+            block = np.zeros((end - start, len(used)), dtype=np.float32)
+            block[row_of[lo:hi] - start, columns[lo:hi]] = self.data[lo:hi]
+            result[start:end] = block @ compact
+        return result
+
+
+class MentionClusterer:
+    """
+    Groups similar mentions and summarizes each group.
+    
+    A mention joins the most similar existing cluster when its cosine
+    similarity to the cluster centroid reaches `threshold`, and otherwise
+    starts a new cluster. After `max_clusters` clusters, unmatched mentions
+    stay singletons. Only the first `seed_rows` mentions, and later ones that
+    match no seeded cluster, are visited one by one; the rest are matched to
+    the centroids in bulk. A final pass reassigns every mention to its most
+    similar centroid, which removes most order effects of the first pass.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.3,
+        n_features: int = 1 << 14,
+        max_clusters: int = 512,
+        seed_rows: int = 256,
+        representatives: int = 3,
+        systemic_min_size: int = 3
+    ):
+        self.threshold = threshold
+        self.n_features = n_features
+        self.max_clusters = max_clusters
+        # Rows clustered one by one before the rest are matched in bulk
+        self.seed_rows = seed_rows
+        self.representatives = representatives
+        self.systemic_min_size = systemic_min_size
+    
+    @classmethod
+    def from_settings(cls) -> "MentionClusterer":
+        """Build a clusterer from the CLUSTER_* settings."""
+        return cls(
+            threshold=settings.CLUSTER_SIMILARITY_THRESHOLD,
+            n_features=settings.CLUSTER_HASH_FEATURES,
+            max_clusters=settings.CLUSTER_MAX_CLUSTERS,
+            representatives=settings.CLUSTER_REPRESENTATIVES,
+            systemic_min_size=settings.CLUSTER_SYSTEMIC_MIN_SIZE
+        )
+    
+    def vectorize(
+        self,
+        texts: List[str],
+        ignore: Optional[set] = None
+    ) -> Tuple[SparseRows, Dict[int, str]]:
+        """
+        Hashed TF-IDF vectors of unigrams and bigrams.
+        
+        Args:
+            texts: Mention texts
+            ignore: Extra tokens to leave out, e.g. the company name
+        
+        Returns:
+            Tuple of (L2-normalized rows, feature index -> a term hashed to it)
+        """
+        ignore = STOPWORDS | (ignore or set())
+        columns: Dict[str, int] = {}
+        terms: Dict[int, str] = {}
+        indptr = [0]
+        row_indices: List[np.ndarray] = []
+        row_counts: List[np.ndarray] = []
+        
+        for text in texts:
+            tokens = [token for token in _TOKEN.findall(text.lower()) if token not in ignore and len(token) > 1]
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            cols = []
+            for feature in features:
+                col = columns.get(feature)
+                if col is None:
+                    col = zlib.crc32(feature.encode()) % self.n_features
+                    columns[feature] = col
+                    terms.setdefault(col, feature)
+                cols.append(col)
+            unique, counts = np.unique(np.array(cols, dtype=np.int32), return_counts=True)
+            row_indices.append(unique)
+            row_counts.append(counts)
+            indptr.append(indptr[-1] + len(unique))
+        
+        indptr_array = np.array(indptr, dtype=np.int64)
+        indices = np.concatenate(row_indices) if row_indices else np.zeros(0, dtype=np.int32)
+        tf = 1.0 + np.log(np.concatenate(row_counts).astype(np.float32)) if row_counts else np.zeros(0, dtype=np.float32)
+        
+        # Smoothed inverse document frequency over this batch of mentions
+        df = np.bincount(indices, minlength=self.n_features)
+        idf = (np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0).astype(np.float32)
+        data = tf * idf[indices]
+        
+        # Features seen in a single mention cannot link mentions; dropping them
+        # keeps unique words and bigrams from diluting the similarities
+        if len(texts) > 1:
+            keep = df[indices] > 1
+            rows_of = np.repeat(np.arange(len(texts)), np.diff(indptr_array))
+            indptr_array = np.concatenate([[0], np.cumsum(np.bincount(rows_of[keep], minlength=len(texts)))])
+            indices, data = indices[keep], data[keep]
+        
+        norms = np.zeros(len(texts), dtype=np.float32)
+        lengths = np.diff(indptr_array)
+        nonempty = lengths > 0
+        if data.size:
+            norms[nonempty] = np.sqrt(np.add.reduceat(data * data, indptr_array[:-1][nonempty]))
+        data = data / np.repeat(np.where(norms > 0, norms, 1.0), lengths)
+        
+        return SparseRows(indptr_array, indices, data.astype(np.float32), self.n_features), terms
+    
+    def cluster(self, rows: SparseRows) -> np.ndarray:
+        """
+        Cluster labels for each row; rows without features are singletons.
+        
+        Returns:
+            Integer label per row, numbered from 0
+        """
+        n = len(rows)
+        labels = np.full(n, -1, dtype=np.int64)
+        capacity = min(self.max_clusters, max(n, 1), 64)
+        # Centroid sums stored feature-major, so gathering a mention's features is contiguous
+        sums_t = np.zeros((self.n_features, capacity), dtype=np.float32)
+        sq_norms = np.zeros(capacity, dtype=np.float64)
+        k = 0
+        
+        def lead(order: np.ndarray) -> None:
+            """Leader pass: join the most similar centroid or start a cluster."""
+            nonlocal sums_t, sq_norms, capacity, k
+            for i in order:
+                cols, vals = rows.row(i)
+                if not len(cols):
+                    continue
+                if k:
+                    dots = vals @ sums_t[cols, :k]
+                    sims = dots / np.sqrt(sq_norms[:k])
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.threshold:
+                        sums_t[cols, best] += vals
+                        sq_norms[best] += 2.0 * dots[best] + 1.0
+                        labels[i] = best
+                        continue
+                if k == self.max_clusters:
+                    continue
+                if k == capacity:
+                    capacity = min(self.max_clusters, capacity * 2)
+                    sums_t = np.hstack([sums_t, np.zeros((self.n_features, capacity - k), dtype=np.float32)])
+                    sq_norms = np.concatenate([sq_norms, np.zeros(capacity - k)])
+                sums_t[cols, k] = vals
+                sq_norms[k] = 1.0
+                labels[i] = k
+                k += 1
+        
+        def assign(order: np.ndarray) -> None:
+            """Label rows with their most similar normalized centroid, if close enough."""
+            if not k or not len(order):
+                return
+            centroids_t = np.ascontiguousarray(sums_t[:, :k] / np.sqrt(sq_norms[:k]).astype(np.float32))
+            sims = rows.subset(order).dot(centroids_t)
+            best = np.argmax(sims, axis=1)
+            matched = sims[np.arange(len(order)), best] >= self.threshold
+            labels[order] = np.where(matched, best, labels[order])
+        
+        # Seed the centroids from the first rows, match the rest in bulk and
+        # only walk the rows that matched nothing one by one
+        seed = np.arange(min(n, self.seed_rows))
+        rest = np.arange(len(seed), n)
+        lead(seed)
+        assign(rest)
+        lead(rest[labels[rest] < 0])
+        
+        # Reassignment pass against the final centroids
+        assign(np.arange(n))
+        
+        # Unmatched rows become singletons; renumber clusters by size
+        unmatched = np.flatnonzero(labels < 0)
+        labels[unmatched] = np.arange(k, k + len(unmatched))
+        _, labels, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        order = np.argsort(-sizes, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return rank[labels]
+    
+    def summarize(self, company_name: str, mentions: List[Dict[str, Any]], max_clusters: int = 15) -> Dict[str, Any]:
+        """
+        Cluster mentions and build the compact report for the investigator.
+        
+        Args:
+            company_name: Company the mentions are about (left out of the terms)
+            mentions: Mention dictionaries as produced by the monitor stage
+            max_clusters: Largest clusters to describe in full (and isolated
+                mentions to list)
+        
+        Returns:
+            Dictionary with a summary per multi-mention cluster, largest
+            first, and the titles of isolated mentions
+        """
+        texts = [f"{m.get('title', '')} {m.get('content', '')}" for m in mentions]
+        rows, terms = self.vectorize(texts, ignore=set(_TOKEN.findall(company_name.lower())))
+        labels = self.cluster(rows) if mentions else np.zeros(0, dtype=np.int64)
+        platforms = [m.get("platform", "News/Web") for m in mentions]
+        n_platforms = len(set(platforms))
+        
+        summaries = []
+        sizes = np.bincount(labels) if len(labels) else np.zeros(0, dtype=np.int64)
+        described = int(np.sum(sizes > 1))
+        for label in range(min(described, max_clusters)):
+            members = np.flatnonzero(labels == label)
+            member_rows = SparseRows(
+                np.concatenate([[0], np.cumsum(np.diff(rows.indptr)[members])]),
+                np.concatenate([rows.row(i)[0] for i in members]),
+                np.concatenate([rows.row(i)[1] for i in members]),
+                rows.n_features
+            )
+            centroid = np.bincount(member_rows.indices, weights=member_rows.data, minlength=rows.n_features)
+            top_cols = np.argsort(-centroid)[:5]
+            closeness = member_rows.dot((centroid / (np.linalg.norm(centroid) or 1.0)).astype(np.float32)[:, None])[:, 0]
+            spread = Counter(platforms[i] for i in members)
+            size = len(members)
+            
+            if size >= self.systemic_min_size and len(spread) > 1:
+                classification = "systemic"
+            elif size >= self.systemic_min_size:
+                classification = "recurring"
+            else:
+                classification = "small"
+            
+            summaries.append({
+                "cluster": label + 1,
+                "size": size,
+                "share": round(size / len(mentions), 3),
+                "classification": classification,
+                "issue_category": Counter(_issue_category(texts[i].lower()) for i in members).most_common(1)[0][0],
+                "top_terms": [terms[col] for col in top_cols if centroid[col] > 0 and col in terms],
+                "platforms": dict(spread.most_common()),
+                "platform_spread": round(len(spread) / n_platforms, 3) if n_platforms else 0.0,
+                "representatives": [
+                    {
+                        "platform": platforms[members[j]],
+                        "title": mentions[members[j]].get("title", ""),
+                        "url": mentions[members[j]].get("url", ""),
+                        "excerpt": str(mentions[members[j]].get("content", ""))[:120]
+                    }
+                    for j in np.argsort(-closeness, kind="stable")[:self.representatives]
+                ]
+            })
+        
+        # Singletons are isolated by definition; list them by title only
+        isolated = [
+            f"{(mentions[i].get('title') or str(mentions[i].get('content', '')))[:80]} ({platforms[i]})"
+            for i in np.flatnonzero(sizes[labels] == 1)
+        ] if len(labels) else []
+        
+        # Systemic clusters overall: large enough and seen on more than one platform
+        platform_ids = np.unique(np.array(platforms, dtype=object), return_inverse=True)[1] if mentions else labels
+        pairs = np.unique(labels * max(n_platforms, 1) + platform_ids)
+        distinct_platforms = np.bincount(pairs // max(n_platforms, 1), minlength=len(sizes))
+        systemic = int(np.sum((sizes >= self.systemic_min_size) & (distinct_platforms > 1)))
+        
+        return {
+            "company": company_name,
+            "clustering_source": "local_mention_clustering",
+            "total_mentions": len(mentions),
+            "clusters": int(len(sizes)),
+            "singletons": int(np.sum(sizes == 1)),
+            "systemic_clusters": systemic,
+            "similarity_threshold": self.threshold,
+            "summaries": summaries,
+            "isolated_mentions": isolated[:max_clusters]
+        }
+    
+    def summary_json(self, company_name: str, mentions: List[Dict[str, Any]]) -> str:
+        """Cluster report serialized as compact JSON, ready to inject into a task prompt."""
+        return json.dumps(self.summarize(company_name, mentions, max_clusters=settings.CLUSTER_MAX_SUMMARIES))
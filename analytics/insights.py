@@ -0,0 +1,74 @@
+"""
+Dashboard aggregates of a workflow run.
+Sentiment distribution, critical count, platform mix and priority buckets
+are computed once from the run's stage outputs, so dashboards and history
+views read small precomputed counts instead of parsing the crew output.
+"""
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from .mentions import extract_mentions
+from .priority import PRIORITY_LEVELS, PriorityEngine
+from .sentiment_model import SENTIMENT_BANDS, match_entries, sentiment_band
+
+
+def _priority_levels(priority_output: Optional[str], mentions: List[Dict[str, Any]]) -> Tuple[Dict[str, int], str]:
+    """
+    Level counts of the priority stage, or of the local engine when it has none.
+    
+    Returns:
+        Tuple of (counts per level, source): "priority_stage", or
+        "local_engine" when the stage did not run or produced no level counts
+    """
+    if priority_output:
+        try:
+            data = json.loads(priority_output[priority_output.find("{"):priority_output.rfind("}") + 1])
+        except ValueError:
+            data = None
+        counts = data.get("level_counts") if isinstance(data, dict) else None
+        if isinstance(counts, dict) and set(counts) <= set(PRIORITY_LEVELS):
+            return {level: int(counts.get(level, 0)) for level in reversed(PRIORITY_LEVELS)}, "priority_stage"
+    levels = Counter(entry["priority_level"] for entry in PriorityEngine().rank(mentions))
+    return {level: levels[level] for level in reversed(PRIORITY_LEVELS)}, "local_engine"
+
+
+def run_aggregates(completed: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Aggregate the stage outputs of a run.
+    
+    Args:
+        completed: Stage outputs by stage name; "monitor" is required,
+            "sentiment" and "priority" are used when present
+    
+    Returns:
+        Mention count, scored count and sentiment sum, critical count, and
+        counts per sentiment band, platform and priority level (with the
+        source of the priority counts). The critical count is None when no
+        mention could be matched to a sentiment score, since it is then
+        unknown rather than zero.
+    """
+    mentions = extract_mentions(completed.get("monitor", ""))
+    
+    scores = []
+    for _, entry in match_entries(mentions, completed.get("sentiment", "")):
+        try:
+            scores.append(max(-1.0, min(1.0, float(entry["sentiment_score"]))))
+        except (TypeError, ValueError):
+            continue
+    bands = Counter(sentiment_band(score) for score in scores)
+    sentiment_bands = {band: bands[band] for band in SENTIMENT_BANDS}
+    sentiment_bands["unscored"] = max(len(mentions) - len(scores), 0)
+    
+    platforms = Counter(str(mention.get("platform") or "News/Web") for mention in mentions)
+    priority_levels, priority_source = _priority_levels(completed.get("priority"), mentions)
+    return {
+        "mentions": len(mentions),
+        "scored": len(scores),
+        "sentiment_sum": round(sum(scores), 4),
+        "critical": bands["critical"] if scores else None,
+        "sentiment_bands": sentiment_bands,
+        "platforms": dict(platforms.most_common()),
+        "priority_levels": priority_levels,
+        "priority_source": priority_source,
+    }
@@ -0,0 +1,48 @@
+"""
+Helpers for reading structured mention data out of stage outputs.
+"""
+import json
+import re
+from typing import Any, Dict, List
+
+
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def _mentions_from(data: Any) -> List[Dict[str, Any]]:
+    """Pull the mention list out of a parsed JSON document."""
+    if isinstance(data, dict):
+        data = data.get("mentions", data.get("results", []))
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)]
+    return []
+
+
+def extract_mentions(output: str) -> List[Dict[str, Any]]:
+    """
+    Extract the list of mentions from a monitor stage output.
+    
+    The output may be the search tool's JSON, an LLM answer wrapping it in a
+    fenced code block, or JSON embedded in prose.
+    
+    Args:
+        output: Raw stage output
+        
+    Returns:
+        List of mention dictionaries (empty if none could be parsed)
+    """
+    text = str(output).strip()
+    candidates = [text] + _FENCED_JSON.findall(text)
+    for opening, closing in (("{", "}"), ("[", "]")):
+        start, end = text.find(opening), text.rfind(closing)
+        if start != -1 and end > start:
+            candidates.append(text[start:end + 1])
+    
+    for candidate in candidates:
+        try:
+            mentions = _mentions_from(json.loads(candidate))
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if mentions:
+            return mentions
+    return []
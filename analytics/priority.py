@@ -0,0 +1,265 @@
+"""
+Local priority engine for the 0-100 business impact model.
+Computes the Priority Ranker's scoring components (user influence, sentiment
+severity, viral potential, frequency) in batch over mention features with
+NumPy, so scores are reproducible and need no LLM arithmetic.
+"""
+import json
+import math
+import re
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+
+
+# Relative audience reach and resharing potential per platform (0-1)
+PLATFORM_REACH = {
+    "TechCrunch": 1.0,
+    "The Verge": 1.0,
+    "Ars Technica": 0.9,
+    "Twitter/X": 0.8,
+    "Hacker News": 0.7,
+    "Reddit": 0.6,
+    "News/Web": 0.5,
+}
+PLATFORM_VIRALITY = {
+    "Twitter/X": 1.0,
+    "Reddit": 0.8,
+    "TechCrunch": 0.7,
+    "The Verge": 0.7,
+    "Hacker News": 0.6,
+    "Ars Technica": 0.6,
+    "News/Web": 0.4,
+}
+
+# Baseline severity per mention type, raised by severe keywords in the content
+MENTION_TYPE_SEVERITY = {
+    "negative": 0.8,
+    "complaint": 0.6,
+    "neutral": 0.2,
+    "positive": 0.0,
+}
+SEVERE_TERMS = re.compile(
+    r"\b(crash\w*|outage|down|broke\w*|data loss|security|breach|hack\w*|refund|lawsuit|"
+    r"scam|fraud|dangerous|recall|worst|terrible|awful|unusable)\b",
+    re.IGNORECASE
+)
+
+# Issue categories used to count how often the same problem is reported,
+# checked in order; patterns match at word starts
+ISSUE_CATEGORIES = {
+    category: re.compile(pattern)
+    for category, pattern in {
+        "outage": r"\b(outage|down\b|server|unavailable|offline)",
+        "crash": r"\b(crash|freez|hang|unresponsive)",
+        "bug": r"\b(bug|broke|update|glitch|compatib)",
+        "performance": r"\b(slow|buffer|lag|latency|wait)",
+        "billing": r"\b(billing|charg|refund|price|pricing|subscription)",
+        "security": r"\b(security|privacy|breach|hack|leak)",
+        "support": r"\b(support|customer service|no response|ignored)",
+    }.items()
+}
+
+# Reports of the same issue at which the frequency component saturates
+FREQUENCY_SATURATION = 5
+
+PRIORITY_LEVELS = ["Low", "Medium", "High", "Critical"]
+RESPONSE_TIMELINE = {
+    "Critical": "Respond within 1 hour",
+    "High": "Respond within 4 hours",
+    "Medium": "Respond within 24 hours",
+    "Low": "Monitor; respond within 72 hours",
+}
+
+
+@dataclass
+class PriorityWeights:
+    """Maximum points for each scoring component."""
+    user_influence: float = 30.0
+    sentiment_severity: float = 25.0
+    viral_potential: float = 25.0
+    frequency: float = 20.0
+    
+    @classmethod
+    def from_settings(cls) -> "PriorityWeights":
+        """Build weights from the PRIORITY_WEIGHT_* settings."""
+        return cls(
+            user_influence=settings.PRIORITY_WEIGHT_INFLUENCE,
+            sentiment_severity=settings.PRIORITY_WEIGHT_SEVERITY,
+            viral_potential=settings.PRIORITY_WEIGHT_VIRAL,
+            frequency=settings.PRIORITY_WEIGHT_FREQUENCY
+        )
+    
+    def as_array(self) -> np.ndarray:
+        """Weights as a vector, rescaled so the total score stays on 0-100."""
+        weights = np.array(list(asdict(self).values()), dtype=np.float64)
+        total = weights.sum()
+        return weights * (100.0 / total) if total > 0 else weights
+
+
+def _issue_category(text: str) -> str:
+    """Assign a mention to the first matching issue category."""
+    for category, pattern in ISSUE_CATEGORIES.items():
+        if pattern.search(text):
+            return category
+    return "general"
+
+
+def _age_hours(published: Any, now: datetime) -> float:
+    """Hours since publication, or NaN if the date is missing or unparseable."""
+    try:
+        when = datetime.fromisoformat(str(published).replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - when).total_seconds() / 3600.0)
+
+
+class PriorityEngine:
+    """
+    Scores and ranks mentions with the 0-100 business impact model.
+    
+    Per-mention features are extracted once into arrays; the four components
+    are then computed as vector operations over all mentions together.
+    """
+    
+    COMPONENTS = ["user_influence", "sentiment_severity", "viral_potential", "frequency"]
+    
+    def __init__(self, weights: Optional[PriorityWeights] = None):
+        self.weights = weights or PriorityWeights.from_settings()
+    
+    def features(self, mentions: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """
+        Extract the numeric features used by the scoring model.
+        
+        Args:
+            mentions: Mention dictionaries as produced by the monitor stage
+            now: Reference time for recency (defaults to the current UTC time)
+            
+        Returns:
+            Dictionary of per-mention feature arrays
+        """
+        now = now or datetime.now(timezone.utc)
+        texts = [f"{m.get('title', '')} {m.get('content', '')}".lower() for m in mentions]
+        platforms = [m.get("platform", "News/Web") for m in mentions]
+        categories = [_issue_category(text) for text in texts]
+        
+        sentiment = np.array([
+            float(m["sentiment_score"]) if isinstance(m.get("sentiment_score"), (int, float)) else np.nan
+            for m in mentions
+        ])
+        _, inverse, counts = np.unique(np.array(categories, dtype=object), return_inverse=True, return_counts=True)
+        
+        return {
+            "reach": np.array([PLATFORM_REACH.get(p, 0.5) for p in platforms]),
+            "virality": np.array([PLATFORM_VIRALITY.get(p, 0.4) for p in platforms]),
+            "relevance": np.clip([float(m.get("relevance_score") or 0.5) for m in mentions], 0.0, 1.0),
+            "sentiment": sentiment,
+            "type_severity": np.array([
+                MENTION_TYPE_SEVERITY.get(str(m.get("mention_type", "neutral")).lower(), 0.2) for m in mentions
+            ]),
+            "severe_terms": np.array([len(SEVERE_TERMS.findall(text)) for text in texts], dtype=np.float64),
+            "age_hours": np.array([_age_hours(m.get("published_date"), now) for m in mentions]),
+            "issue_count": counts[inverse].astype(np.float64),
+            "category": np.array(categories, dtype=object),
+        }
+    
+    def components(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Compute normalized (0-1) scoring components.
+        
+        Returns:
+            Array of shape (mentions, 4) in COMPONENTS order
+        """
+        relevance = features["relevance"]
+        
+        influence = features["reach"] * (0.6 + 0.4 * relevance)
+        
+        lexical = np.clip(features["type_severity"] + 0.1 * features["severe_terms"], 0.0, 1.0)
+        severity = np.where(np.isnan(features["sentiment"]), lexical, np.clip(-features["sentiment"], 0.0, 1.0))
+        
+        recency = np.where(np.isnan(features["age_hours"]), 0.5, np.exp(-np.nan_to_num(features["age_hours"]) / 24.0))
+        viral = features["virality"] * (0.5 + 0.5 * recency) * (0.5 + 0.5 * relevance)
+        
+        frequency = np.clip(np.log1p(features["issue_count"]) / np.log1p(FREQUENCY_SATURATION), 0.0, 1.0)
+        
+        return np.column_stack([influence, severity, viral, frequency])
+    
+    def rank(self, mentions: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Score and rank mentions by business impact.
+        
+        Args:
+            mentions: Mention dictionaries as produced by the monitor stage
+            now: Reference time for recency
+            
+        Returns:
+            Mentions ordered by score, each with its score, level and component points
+        """
+        if not mentions:
+            return []
+        
+        features = self.features(mentions, now)
+        points = self.components(features) * self.weights.as_array()
+        scores = points.sum(axis=1)
+        levels = np.digitize(scores, [30.5, 50.5, 70.5])
+        order = np.argsort(-scores, kind="stable")
+        
+        ranked = []
+        for rank, i in enumerate(order, 1):
+            mention = mentions[i]
+            ranked.append({
+                "rank": rank,
+                "priority_score": round(float(scores[i]), 1),
+                "priority_level": PRIORITY_LEVELS[levels[i]],
+                "components": {
+                    name: round(float(value), 1) for name, value in zip(self.COMPONENTS, points[i])
+                },
+                "issue_category": features["category"][i],
+                "platform": mention.get("platform", "News/Web"),
+                "title": mention.get("title", ""),
+                "url": mention.get("url", ""),
+                "excerpt": str(mention.get("content", ""))[:160]
+            })
+        return ranked
+    
+    def report(self, company_name: str, mentions: List[Dict[str, Any]], top_n: int = 5) -> Dict[str, Any]:
+        """
+        Build the ranking the Priority Ranker task is expected to produce.
+        
+        Args:
+            company_name: Company the mentions are about
+            mentions: Mention dictionaries as produced by the monitor stage
+            top_n: Number of most critical issues to highlight
+            
+        Returns:
+            Dictionary with the ranking, level counts, response timelines and top issues
+        """
+        ranked = self.rank(mentions)
+        level_counts = {level: 0 for level in reversed(PRIORITY_LEVELS)}
+        for entry in ranked:
+            level_counts[entry["priority_level"]] += 1
+        
+        return {
+            "company": company_name,
+            "scoring_source": "local_priority_engine",
+            "weights": asdict(self.weights),
+            "total_issues": len(ranked),
+            "level_counts": level_counts,
+            "response_timeline": RESPONSE_TIMELINE,
+            "top_issues": [
+                f"{entry['title'] or entry['excerpt']} ({entry['platform']}, "
+                f"{entry['priority_level']} {entry['priority_score']})"
+                for entry in ranked[:top_n]
+            ],
+            "ranking": ranked
+        }
+    
+    def report_json(self, company_name: str, mentions: List[Dict[str, Any]]) -> str:
+        """Priority report serialized as compact JSON, ready to inject into a task prompt."""
+        return json.dumps(self.report(company_name, mentions))
@@ -0,0 +1,555 @@
+"""
+Distilled local sentiment model trained from Sentiment Analyzer labels.
+Every LLM sentiment analysis is kept as labeled training examples (sentiment
+score, urgency, viral potential). A small linear model over hashed word
+unigrams and bigrams is trained from them on the CPU, versioned on disk, and
+scores the mentions it is confident about without an LLM call; the rest are
+still sent to the Sentiment Analyzer.
+
+Train and promote a new version with:
+    python -m analytics.sentiment_model
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from analytics.clustering import SparseRows, _TOKEN
+from analytics.mentions import extract_mentions
+from analytics.priority import PLATFORM_REACH
+
+
+logger = logging.getLogger(__name__)
+
+# Sentiment bands with their score ranges; the band head is what confidence is based on
+SENTIMENT_BANDS = ["critical", "negative", "neutral", "positive"]
+BAND_RANGES = {
+    "critical": (-1.0, -0.5),
+    "negative": (-0.5, -0.1),
+    "neutral": (-0.1, 0.1),
+    "positive": (0.1, 1.0),
+}
+VIRAL_LEVELS = ["Low", "Medium", "High"]
+
+# Output columns of the weight matrix: band logits, viral logits, score, urgency
+_BAND = slice(0, len(SENTIMENT_BANDS))
+_VIRAL = slice(len(SENTIMENT_BANDS), len(SENTIMENT_BANDS) + len(VIRAL_LEVELS))
+_SCORE = len(SENTIMENT_BANDS) + len(VIRAL_LEVELS)
+_URGENCY = _SCORE + 1
+_OUTPUTS = _URGENCY + 1
+
+
+def sentiment_band(score: float) -> str:
+    """Band of a -1..1 sentiment score."""
+    if score < -0.5:
+        return "critical"
+    if score < -0.1:
+        return "negative"
+    if score <= 0.1:
+        return "neutral"
+    return "positive"
+
+
+def mention_key(mention: Dict[str, Any]) -> str:
+    """Identity of a mention across stage outputs: its URL, title or content."""
+    return str(mention.get("url") or mention.get("title") or mention.get("content", ""))[:300]
+
+
+def mention_text(mention: Dict[str, Any]) -> str:
+    return f"{mention.get('title', '')} {mention.get('content', '')}".strip()
+
+
+def hash_features(texts: List[str], platforms: List[str], n_features: int) -> SparseRows:
+    """
+    L2-normalized hashed features: word unigrams and bigrams with sublinear
+    term frequency, plus the platform.
+    
+    Stopwords are kept, so negations such as "not working" survive as bigrams.
+    """
+    indptr = [0]
+    row_indices: List[np.ndarray] = []
+    row_counts: List[np.ndarray] = []
+    for text, platform in zip(texts, platforms):
+        tokens = _TOKEN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])] + [f"platform={platform}"]
+        cols = np.array([zlib.crc32(feature.encode()) % n_features for feature in features], dtype=np.int32)
+        unique, counts = np.unique(cols, return_counts=True)
+        row_indices.append(unique)
+        row_counts.append(counts)
+        indptr.append(indptr[-1] + len(unique))
+    
+    indptr_array = np.array(indptr, dtype=np.int64)
+    indices = np.concatenate(row_indices) if row_indices else np.zeros(0, dtype=np.int32)
+    data = 1.0 + np.log(np.concatenate(row_counts).astype(np.float32)) if row_counts else np.zeros(0, dtype=np.float32)
+    lengths = np.diff(indptr_array)
+    if data.size:
+        norms = np.sqrt(np.add.reduceat(data * data, indptr_array[:-1][lengths > 0]))
+        data = data / np.repeat(norms, lengths[lengths > 0])
+    return SparseRows(indptr_array, indices, data.astype(np.float32), n_features)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _labeled_entries(output: str) -> List[Dict[str, Any]]:
+    """Per-mention entries of a Sentiment Analyzer output that carry a sentiment score."""
+    entries = extract_mentions(output)
+    if not any("sentiment_score" in entry for entry in entries):
+        # The analysis may nest its entries under another key
+        try:
+            data = json.loads(output[output.find("{"):output.rfind("}") + 1])
+        except ValueError:
+            return []
+        lists = [value for value in data.values() if isinstance(value, list)] if isinstance(data, dict) else []
+        entries = next(
+            (items for items in lists if any(isinstance(item, dict) and "sentiment_score" in item for item in items)),
+            []
+        )
+    return [entry for entry in entries if isinstance(entry, dict) and "sentiment_score" in entry]
+
+
+def match_entries(
+    mentions: List[Dict[str, Any]],
+    sentiment_output: str
+) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Pair the entries of a sentiment stage output with the mentions they score.
+    
+    Entries are matched to mentions by URL or title, or by position when
+    the analysis has one entry per mention.
+    
+    Returns:
+        (mention, entry) pairs
+    """
+    entries = _labeled_entries(sentiment_output)
+    by_key = {}
+    for mention in mentions:
+        for field in ("url", "title"):
+            if mention.get(field):
+                by_key[str(mention[field])] = mention
+    positional = len(entries) == len(mentions)
+    
+    pairs = []
+    for i, entry in enumerate(entries):
+        mention = by_key.get(str(entry.get("url", ""))) or by_key.get(str(entry.get("title", "")))
+        if mention is None and positional:
+            mention = mentions[i]
+        if mention is not None:
+            pairs.append((mention, entry))
+    return pairs
+
+
+def extract_labels(mentions: List[Dict[str, Any]], sentiment_output: str) -> List[Dict[str, Any]]:
+    """
+    Join a Sentiment Analyzer output with the mentions it analyzed.
+    
+    Entries without a valid score, urgency and viral potential are dropped.
+    
+    Returns:
+        Training examples with text, platform and the three labels
+    """
+    examples = []
+    for mention, entry in match_entries(mentions, sentiment_output):
+        try:
+            score = float(entry["sentiment_score"])
+            urgency = float(entry.get("urgency_level"))
+        except (TypeError, ValueError):
+            continue
+        viral = str(entry.get("viral_potential", "")).strip().capitalize()
+        if not -1.0 <= score <= 1.0 or not 0.0 <= urgency <= 10.0 or viral not in VIRAL_LEVELS:
+            continue
+        examples.append({
+            "key": mention_key(mention),
+            "text": mention_text(mention),
+            "platform": mention.get("platform", "News/Web"),
+            "sentiment_score": score,
+            "urgency_level": urgency,
+            "viral_potential": viral,
+        })
+    return examples
+
+
+class LabelStore:
+    """
+    Append-only JSONL training set of LLM sentiment labels.
+    
+    The same mention may be labeled by several runs; load() keeps the most
+    recent label per mention text.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def append(self, examples: List[Dict[str, Any]], company_name: str, run_id: str) -> int:
+        """Add the labeled examples of one run. Returns how many were written."""
+        if not examples:
+            return 0
+        labeled_at = datetime.utcnow().isoformat()
+        lines = "".join(
+            json.dumps({**example, "company": company_name, "run_id": run_id, "labeled_at": labeled_at}) + "\n"
+            for example in examples
+        )
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        return len(examples)
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """All examples, deduplicated by mention text (latest label wins)."""
+        examples: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    example = json.loads(line)
+                except ValueError:
+                    continue
+                if example.get("text"):
+                    examples[example["text"]] = example
+        return list(examples.values())
+
+
+class SentimentModel:
+    """
+    Linear model with four heads over shared hashed features.
+    
+    Softmax heads predict the sentiment band and the viral potential, linear
+    heads the sentiment score and urgency. A prediction's confidence is the
+    lower of the two softmax probabilities, and the score is kept inside the
+    predicted band.
+    """
+    
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.n_features = weights.shape[0]
+        self.metadata = metadata or {}
+    
+    @property
+    def version(self) -> str:
+        return self.metadata.get("version", "unversioned")
+    
+    def _outputs(self, rows: SparseRows) -> np.ndarray:
+        # Every row has at least its platform feature, so no reduceat segment is empty
+        products = self.weights[rows.indices] * rows.data[:, None]
+        return np.add.reduceat(products, rows.indptr[:-1], axis=0) + self.bias
+    
+    def predict(self, mentions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score mentions.
+        
+        Returns:
+            One entry per mention in the Sentiment Analyzer's output format,
+            with the model's confidence
+        """
+        if not mentions:
+            return []
+        rows = hash_features(
+            [mention_text(m) for m in mentions],
+            [m.get("platform", "News/Web") for m in mentions],
+            self.n_features
+        )
+        outputs = self._outputs(rows)
+        band_probs = _softmax(outputs[:, _BAND])
+        viral_probs = _softmax(outputs[:, _VIRAL])
+        bands = band_probs.argmax(axis=1)
+        virals = viral_probs.argmax(axis=1)
+        confidence = np.minimum(band_probs.max(axis=1), viral_probs.max(axis=1))
+        
+        predictions = []
+        for i, mention in enumerate(mentions):
+            band = SENTIMENT_BANDS[bands[i]]
+            low, high = BAND_RANGES[band]
+            score = float(np.clip(outputs[i, _SCORE], low, high))
+            reach = PLATFORM_REACH.get(mention.get("platform", "News/Web"), 0.5)
+            predictions.append({
+                "title": mention.get("title", ""),
+                "url": mention.get("url", ""),
+                "platform": mention.get("platform", "News/Web"),
+                "sentiment_score": round(score, 2),
+                "urgency_level": int(np.clip(np.rint(outputs[i, _URGENCY] * 10.0), 0, 10)),
+                "user_influence": "High" if reach >= 0.8 else "Medium" if reach >= 0.6 else "Low",
+                "viral_potential": VIRAL_LEVELS[virals[i]],
+                "critical_flag": band == "critical",
+                "confidence": round(float(confidence[i]), 3),
+                "scored_by": f"local_model:{self.version}",
+            })
+        return predictions
+    
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(os.path.join(directory, "weights.npz"), weights=self.weights, bias=self.bias)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=2)
+    
+    @classmethod
+    def load(cls, directory: str) -> "SentimentModel":
+        with np.load(os.path.join(directory, "weights.npz")) as arrays:
+            weights, bias = arrays["weights"], arrays["bias"]
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        return cls(weights, bias, metadata)
+
+
+def _targets(examples: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    scores = np.array([e["sentiment_score"] for e in examples], dtype=np.float32)
+    bands = np.array([SENTIMENT_BANDS.index(sentiment_band(s)) for s in scores])
+    virals = np.array([VIRAL_LEVELS.index(e["viral_potential"]) for e in examples])
+    urgency = np.array([e["urgency_level"] for e in examples], dtype=np.float32) / 10.0
+    return bands, virals, scores, urgency
+
+
+def train(
+    examples: List[Dict[str, Any]],
+    n_features: int = 1 << 16,
+    epochs: int = 200,
+    learning_rate: float = 0.05,
+    l2: float = 1e-5
+) -> SentimentModel:
+    """
+    Fit all heads jointly with full-batch Adam.
+    
+    Only the features present in the training set get weights, so each epoch
+    costs two passes over the non-zero entries.
+    """
+    rows = hash_features([e["text"] for e in examples], [e.get("platform", "News/Web") for e in examples], n_features)
+    bands, virals, scores, urgency = _targets(examples)
+    n = len(examples)
+    
+    used, columns = np.unique(rows.indices, return_inverse=True)
+    row_of = np.repeat(np.arange(n), np.diff(rows.indptr))
+    values = rows.data.astype(np.float64)
+    weights = np.zeros((len(used), _OUTPUTS))
+    bias = np.zeros(_OUTPUTS)
+    band_onehot = np.eye(len(SENTIMENT_BANDS))[bands]
+    viral_onehot = np.eye(len(VIRAL_LEVELS))[virals]
+    
+    moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        outputs = np.column_stack([
+            np.bincount(row_of, weights=values * weights[columns, j], minlength=n) for j in range(_OUTPUTS)
+        ]) + bias
+        
+        # Gradient of the mean loss with respect to each output column
+        grad = np.empty_like(outputs)
+        grad[:, _BAND] = _softmax(outputs[:, _BAND]) - band_onehot
+        grad[:, _VIRAL] = _softmax(outputs[:, _VIRAL]) - viral_onehot
+        grad[:, _SCORE] = outputs[:, _SCORE] - scores
+        grad[:, _URGENCY] = outputs[:, _URGENCY] - urgency
+        grad /= n
+        
+        weight_grad = np.column_stack([
+            np.bincount(columns, weights=values * grad[row_of, j], minlength=len(used)) for j in range(_OUTPUTS)
+        ]) + l2 * weights
+        bias_grad = grad.sum(axis=0)
+        
+        for param, g, m, v in ((weights, weight_grad, moments[0], moments[1]), (bias, bias_grad, moments[2], moments[3])):
+            m *= beta1
+            m += (1 - beta1) * g
+            v *= beta2
+            v += (1 - beta2) * g * g
+            param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+    
+    full = np.zeros((n_features, _OUTPUTS), dtype=np.float32)
+    full[used] = weights
+    return SentimentModel(full, bias)
+
+
+def evaluate(model: SentimentModel, examples: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    """
+    Holdout metrics, including how many mentions the model would take over
+    at `threshold` and how accurate it is on those.
+    """
+    predictions = model.predict([{"title": "", "content": e["text"], "platform": e.get("platform")} for e in examples])
+    bands, virals, scores, urgency = _targets(examples)
+    predicted_bands = np.array([SENTIMENT_BANDS.index(sentiment_band(p["sentiment_score"])) for p in predictions])
+    predicted_virals = np.array([VIRAL_LEVELS.index(p["viral_potential"]) for p in predictions])
+    confident = np.array([p["confidence"] >= threshold for p in predictions], dtype=bool)
+    correct = (predicted_bands == bands) & (predicted_virals == virals)
+    return {
+        "examples": len(examples),
+        "band_accuracy": round(float(np.mean(predicted_bands == bands)), 4),
+        "viral_accuracy": round(float(np.mean(predicted_virals == virals)), 4),
+        "score_mae": round(float(np.mean(np.abs([p["sentiment_score"] for p in predictions] - scores))), 4),
+        "urgency_mae": round(float(np.mean(np.abs([p["urgency_level"] for p in predictions] - urgency * 10.0))), 4),
+        "confidence_threshold": threshold,
+        "coverage": round(float(np.mean(confident)), 4),
+        "confident_accuracy": round(float(np.mean(correct[confident])), 4) if confident.any() else None,
+    }
+
+
+class ModelRegistry:
+    """
+    Versioned model artifacts: <directory>/v0001/{weights.npz,meta.json}, ...
+    
+    CURRENT names the version being served. New versions are only promoted
+    when they pass the evaluation gates, so a bad training run never
+    replaces a good model.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded: Optional[SentimentModel] = None
+    
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("v") and name[1:].isdigit())
+    
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def publish(self, model: SentimentModel, metadata: Dict[str, Any], promote: bool) -> str:
+        """Save a new version, and serve it if `promote` is set."""
+        versions = self.versions()
+        version = f"v{int(versions[-1][1:]) + 1 if versions else 1:04d}"
+        model.metadata = {**metadata, "version": version, "promoted": promote}
+        model.save(os.path.join(self.directory, version))
+        if promote:
+            self.promote(version)
+        return version
+    
+    def promote(self, version: str) -> None:
+        """Serve a saved version (also used to roll back)."""
+        pointer = os.path.join(self.directory, "CURRENT")
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+    
+    def current(self) -> Optional[SentimentModel]:
+        """The served model, reloaded when CURRENT changes; None if there is none."""
+        version = self.current_version()
+        if version is None:
+            return None
+        if self._loaded is None or self._loaded.version != version:
+            with self._lock:
+                if self._loaded is None or self._loaded.version != version:
+                    try:
+                        self._loaded = SentimentModel.load(os.path.join(self.directory, version))
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.error(f"Failed to load sentiment model {version}: {e}")
+                        return None
+        return self._loaded
+
+
+def _holdout(example: Dict[str, Any]) -> bool:
+    """Deterministic 20% holdout split by mention text."""
+    return hashlib.sha1(example["text"].encode()).digest()[0] < 52
+
+
+def train_and_publish(
+    store: LabelStore,
+    registry: ModelRegistry,
+    threshold: float,
+    min_examples: int,
+    min_accuracy: float,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Train on the label store, evaluate on a holdout split and publish a version.
+    
+    The version is promoted when the training set has at least
+    `min_examples` examples and the holdout accuracy on confident mentions
+    reaches `min_accuracy` (or when `force` is set).
+    """
+    examples = store.load()
+    if len(examples) < 2:
+        return {"trained": False, "reason": f"only {len(examples)} labeled examples"}
+    training = [e for e in examples if not _holdout(e)]
+    holdout = [e for e in examples if _holdout(e)] or training
+    
+    started = time.perf_counter()
+    model = train(training, n_features=settings.SENTIMENT_MODEL_FEATURES)
+    training_seconds = round(time.perf_counter() - started, 2)
+    metrics = evaluate(model, holdout, threshold)
+    
+    # Final model is refit on every example; the gates use the holdout metrics
+    model = train(examples, n_features=settings.SENTIMENT_MODEL_FEATURES)
+    accuracy = metrics["confident_accuracy"] or 0.0
+    promote = force or (len(examples) >= min_examples and accuracy >= min_accuracy)
+    version = registry.publish(model, {
+        "trained_at": datetime.utcnow().isoformat(),
+        "examples": len(examples),
+        "training_seconds": training_seconds,
+        "n_features": settings.SENTIMENT_MODEL_FEATURES,
+        "holdout": metrics,
+    }, promote=promote)
+    return {"trained": True, "version": version, "promoted": promote, "holdout": metrics}
+
+
+_store: Optional[LabelStore] = None
+_registry: Optional[ModelRegistry] = None
+_lock = threading.Lock()
+
+
+def get_label_store() -> Optional[LabelStore]:
+    """Process-wide label store, or None when SENTIMENT_LABELS_ENABLED is off."""
+    global _store
+    if not settings.SENTIMENT_LABELS_ENABLED:
+        return None
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = LabelStore(settings.SENTIMENT_LABELS_PATH)
+    return _store
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry of SENTIMENT_MODEL_DIR."""
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = ModelRegistry(settings.SENTIMENT_MODEL_DIR)
+    return _registry
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train and publish the local sentiment model")
+    parser.add_argument("--labels", default=settings.SENTIMENT_LABELS_PATH)
+    parser.add_argument("--force", action="store_true", help="Promote even if the evaluation gates fail")
+    parser.add_argument("--promote", metavar="VERSION", help="Serve an existing version (e.g. to roll back)")
+    args = parser.parse_args(argv)
+    
+    registry = get_model_registry()
+    if args.promote:
+        registry.promote(args.promote)
+        print(f"Serving sentiment model {args.promote}")
+        return 0
+    
+    summary = train_and_publish(
+        LabelStore(args.labels),
+        registry,
+        threshold=settings.SENTIMENT_CONFIDENCE_THRESHOLD,
+        min_examples=settings.SENTIMENT_MODEL_MIN_EXAMPLES,
+        min_accuracy=settings.SENTIMENT_MODEL_MIN_ACCURACY,
+        force=args.force
+    )
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["trained"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency benchmark against a local stub LLM.
+
+Starts an OpenAI-compatible stub server whose latency grows with load and
+that answers 429 above its capacity. The capacity and base latency change
+over three phases (normal, degraded, recovered) to inject a slowdown.
+Closed-loop clients then run three-stage "analyses" against it, once with
+every request admitted and once through the AIMD limit used by the API,
+where excess requests are shed. Reports per phase: completed analyses,
+upstream errors (429s and transport errors), shed requests, p95 analysis latency and the limit.
+
+Usage:
+    python benchmarks/adaptive_concurrency.py
+    python benchmarks/adaptive_concurrency.py --clients 48 --phase-seconds 6
+"""
+import argparse
+import math
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from runtime.clients import ClientRegistry  # noqa: E402
+from runtime.concurrency import AdaptiveConcurrencyLimit, classify_outcome  # noqa: E402
+
+
+STAGES = ("monitor", "sentiment", "response")
+
+# (name, capacity in concurrent calls, base latency in seconds)
+PHASES = [("normal", 12, 0.05), ("degraded", 4, 0.15), ("recovered", 12, 0.05)]
+
+
+class StubLLM(BaseHTTPRequestHandler):
+    """Chat completions stub: latency rises past half capacity, 429 above capacity."""
+    protocol_version = "HTTP/1.1"
+    capacity = 12
+    base_latency = 0.05
+    in_flight = 0
+    lock = threading.Lock()
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with StubLLM.lock:
+            StubLLM.in_flight += 1
+            load = StubLLM.in_flight
+        try:
+            if load > self.capacity:
+                self._reply(429, b'{"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}')
+                return
+            knee = self.capacity / 2
+            time.sleep(self.base_latency * (1 + max(0.0, load - knee) / knee))
+            self._reply(200, b'{"choices": [{"message": {"role": "assistant", "content": "ok"}}]}')
+        finally:
+            with StubLLM.lock:
+                StubLLM.in_flight -= 1
+    
+    def _reply(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def analysis(http: Any, url: str, slo: float) -> Dict[str, Any]:
+    """
+    One analysis: sequential stage calls, shaped like a workflow result.
+    
+    429s and transport errors (e.g. connections reset by the overloaded
+    stub) both end the analysis as an upstream error.
+    """
+    records = []
+    for stage in STAGES:
+        started = time.monotonic()
+        try:
+            response = http.post(url, json={"model": "stub", "messages": [{"role": "user", "content": stage}]})
+        except httpx.TransportError as e:
+            return {"status": "error", "error": f"Connection error in {stage}: {e!r}", "model_routing": records}
+        elapsed = time.monotonic() - started
+        if response.status_code == 429:
+            return {"status": "error", "error": f"Error code: 429 - rate limit in {stage}", "model_routing": records}
+        records.append({"stage": stage, "latency_seconds": elapsed, "slo_p95_seconds": slo, "status": "ok"})
+    return {"status": "success", "model_routing": records}
+
+
+def p95(samples: List[float]) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+def run(label: str, limiter: Optional[AdaptiveConcurrencyLimit], http: Any, url: str, args: argparse.Namespace) -> None:
+    phase_stats = {name: {"done": 0, "errors": 0, "shed": 0, "latency": [], "limits": []} for name, _, _ in PHASES}
+    current = {"phase": PHASES[0][0]}
+    stop = threading.Event()
+    
+    def client() -> None:
+        while not stop.is_set():
+            stats = phase_stats[current["phase"]]
+            if limiter is not None and not limiter.try_acquire():
+                stats["shed"] += 1
+                # Scaled-down Retry-After so shed clients come back within the run
+                time.sleep(args.shed_backoff_ms / 1000)
+                continue
+            started = time.monotonic()
+            results = analysis(http, url, args.stage_slo_ms / 1000)
+            elapsed = time.monotonic() - started
+            if limiter is not None:
+                limiter.release(classify_outcome(results), elapsed)
+            if results["status"] == "error":
+                stats["errors"] += 1
+                time.sleep(0.01)
+            else:
+                stats["done"] += 1
+                stats["latency"].append(elapsed)
+    
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for name, capacity, latency in PHASES:
+        current["phase"] = name
+        StubLLM.capacity, StubLLM.base_latency = capacity, latency
+        ends = time.monotonic() + args.phase_seconds
+        while time.monotonic() < ends:
+            if limiter is not None:
+                phase_stats[name]["limits"].append(limiter.limit)
+            time.sleep(0.1)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    print(f"{label}:")
+    for name, capacity, _ in PHASES:
+        stats = phase_stats[name]
+        latency = p95(stats["latency"])
+        limits = stats["limits"]
+        limit = f"limit {min(limits)}-{max(limits)} (end {limits[-1]})" if limits else "no limit"
+        print(
+            f"  {name:<10} capacity {capacity:3d}  {stats['done']:6d} done  {stats['errors']:6d} upstream errors"
+            f"{stats['shed']:7d} shed  p95 {latency * 1000 if latency else 0:7.0f} ms  {limit}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the adaptive concurrency limit against a stub LLM")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--phase-seconds", type=float, default=4.0)
+    parser.add_argument("--stage-slo-ms", type=float, default=150.0)
+    parser.add_argument("--shed-backoff-ms", type=float, default=20.0)
+    parser.add_argument("--cooldown-seconds", type=float, default=0.3, help="Decrease cooldown, scaled to the stub's latency")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLM)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    
+    registry = ClientRegistry()
+    http = registry.openai_http_client()
+    print(f"{args.clients} closed-loop clients, {len(STAGES)} stage calls per analysis, {args.phase_seconds:.0f}s per phase")
+    run("every request admitted", None, http, url, args)
+    run("adaptive (AIMD) limit with shedding", AdaptiveConcurrencyLimit(
+        initial=8,
+        min_limit=1,
+        max_limit=args.clients,
+        cooldown_seconds=args.cooldown_seconds
+    ), http, url, args)
+    
+    registry.close()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for platform extraction and mention classification.
+
+Compares the compiled matcher in tools/classification.py with the previous
+per-result substring chains over synthetic mentions, with the shipped
+lexicons and with a lexicon grown to thousands of terms. Also checks that
+both implementations agree on the shipped lexicons.
+
+Usage:
+    python benchmarks/classification.py
+    python benchmarks/classification.py --mentions 100000 --lexicon-terms 5000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from tools.classification import DEFAULT_LEXICONS, MentionClassifier, extract_platform  # noqa: E402
+
+
+HOSTS = [
+    "https://twitter.com/user/status/1", "https://x.com/user/status/2", "https://www.reddit.com/r/tech/3",
+    "https://news.ycombinator.com/item?id=4", "https://techcrunch.com/2024/story", "https://www.theverge.com/a",
+    "https://arstechnica.com/gadgets/b", "https://example-news.com/article", "https://blog.company.io/post",
+]
+WORDS = (
+    "the app keeps crashing after update and support is slow my order never arrived "
+    "really love the new design great battery but login fails again worst experience "
+    "broken checkout problem with billing issue on android bug report terrible service"
+).split()
+
+
+def legacy_platform(url: str) -> str:
+    """Substring chain previously used by TavilyCompanySearchTool._extract_platform."""
+    if 'twitter.com' in url or 'x.com' in url:
+        return 'Twitter/X'
+    elif 'reddit.com' in url:
+        return 'Reddit'
+    elif 'news.ycombinator.com' in url:
+        return 'Hacker News'
+    elif 'techcrunch.com' in url:
+        return 'TechCrunch'
+    elif 'theverge.com' in url:
+        return 'The Verge'
+    elif 'arstechnica.com' in url:
+        return 'Ars Technica'
+    else:
+        return 'News/Web'
+
+
+def legacy_classifier(lexicons):
+    """Per-category any(...) scans previously used by _classify_mention_type."""
+    ordered = [(category, lexicons["lexicons"][category]) for category in lexicons["precedence"]]
+    
+    def classify(content: str) -> str:
+        content_lower = content.lower()
+        for category, words in ordered:
+            if any(word in content_lower for word in words):
+                return category
+        return lexicons["default"]
+    return classify
+
+
+def grow_lexicons(rng: random.Random, terms: int):
+    """Shipped lexicons plus `terms` synthetic complaint/negative terms."""
+    grown = {
+        "precedence": DEFAULT_LEXICONS["precedence"],
+        "default": DEFAULT_LEXICONS["default"],
+        "lexicons": {k: list(v) for k, v in DEFAULT_LEXICONS["lexicons"].items()},
+    }
+    for i in range(terms):
+        term = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12)))
+        grown["lexicons"]["complaint" if i % 2 else "negative"].append(term)
+    return grown
+
+
+def timed(fn, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark mention platform extraction and classification")
+    parser.add_argument("--mentions", type=int, default=100_000)
+    parser.add_argument("--lexicon-terms", type=int, default=5_000, help="Synthetic terms for the grown lexicon")
+    args = parser.parse_args()
+    
+    rng = random.Random(7)
+    urls = [rng.choice(HOSTS) for _ in range(args.mentions)]
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))) for _ in range(args.mentions)]
+    
+    mismatches = sum(legacy_platform(u) != extract_platform(u) for u in urls[:10_000])
+    compiled = MentionClassifier(DEFAULT_LEXICONS["lexicons"], DEFAULT_LEXICONS["precedence"], DEFAULT_LEXICONS["default"])
+    legacy = legacy_classifier(DEFAULT_LEXICONS)
+    mismatches += sum(legacy(t) != compiled.classify(t) for t in texts[:10_000])
+    
+    print(f"{args.mentions:,} synthetic mentions\n")
+    print(f"{'':34}{'legacy':>10}{'compiled':>10}{'speedup':>10}")
+    
+    rows = [
+        ("platform extraction", timed(legacy_platform, urls), timed(extract_platform, urls)),
+        (f"classification ({compiled.term_count} terms)", timed(legacy, texts), timed(compiled.classify, texts)),
+    ]
+    
+    grown = grow_lexicons(rng, args.lexicon_terms)
+    grown_compiled = MentionClassifier(grown["lexicons"], grown["precedence"], grown["default"])
+    grown_texts = texts[: max(1, args.mentions // 10)]
+    scale = args.mentions / len(grown_texts)
+    rows.append((
+        f"classification ({grown_compiled.term_count} terms)",
+        timed(legacy_classifier(grown), grown_texts) * scale,
+        timed(grown_compiled.classify, grown_texts) * scale,
+    ))
+    
+    for label, old, new in rows:
+        print(f"{label:34}{old:9.2f}s{new:9.2f}s{old / new:9.1f}x")
+    print(f"\n(grown-lexicon timings measured on {len(grown_texts):,} mentions and scaled)")
+    
+    if mismatches:
+        print(f"❌ {mismatches} results differ from the legacy implementation")
+        return 1
+    print("✅ Compiled matcher agrees with the legacy implementation on the shipped lexicons")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the API and CLI entry points.
+
+Runs `python -X importtime` in a fresh interpreter for each module, reports the
+cumulative import cost and the heaviest dependencies, and exits non-zero if a
+module exceeds its budget or eagerly imports a heavy dependency (CrewAI,
+LangChain, Tavily) that should only load when a workflow is first used.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 800 --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points and their default budgets in milliseconds
+DEFAULT_BUDGETS = {
+    "main": 1000,
+    "crew_setup": 500,
+}
+
+# Packages that must not be imported until a workflow is built
+HEAVY_PACKAGES = ("crewai", "langchain_openai", "langchain_core", "tavily")
+
+
+def measure(module: str) -> Tuple[float, List[Tuple[float, str]]]:
+    """
+    Import `module` in a fresh interpreter and parse -X importtime output.
+    
+    Returns:
+        Tuple of (cumulative milliseconds for the module, list of
+        (cumulative milliseconds, package, nesting depth) for every import)
+    """
+    env = dict(os.environ)
+    # Settings require API keys at import time; dummy values are enough here
+    env.setdefault("OPENAI_API_KEY", "sk-importtime")
+    env.setdefault("TAVILY_API_KEY", "tvly-importtime")
+    
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    
+    imports = []
+    total_ms = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, raw_name = line.replace("import time:", "|").split("|")
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        cumulative_ms = int(cumulative_us) / 1000.0
+        imports.append((cumulative_ms, name, depth))
+        if name == module:
+            total_ms = cumulative_ms
+    
+    return total_ms, imports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check import-time budgets")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per module; the best run is reported")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Override the budget for every module")
+    parser.add_argument("--top", type=int, default=8, help="Number of heaviest imports to show")
+    args = parser.parse_args()
+    
+    failures = []
+    
+    for module, default_budget in DEFAULT_BUDGETS.items():
+        budget = args.budget_ms or default_budget
+        runs = [measure(module) for _ in range(args.runs)]
+        best_ms, imports = min(runs, key=lambda run: run[0])
+        
+        heavy = sorted({name.split(".")[0] for _, name, _ in imports if name.split(".")[0] in HEAVY_PACKAGES})
+        status = "OK" if best_ms <= budget and not heavy else "FAIL"
+        
+        print(f"{status:4} {module:12} {best_ms:8.1f} ms (budget {budget:.0f} ms)")
+        
+        # Direct imports of the entry point, heaviest first
+        top_level = sorted(
+            [(ms, name) for ms, name, depth in imports if depth == 1],
+            reverse=True
+        )[:args.top]
+        for ms, name in top_level:
+            print(f"       {ms:8.1f} ms  {name}")
+        
+        if best_ms > budget:
+            failures.append(f"{module} took {best_ms:.1f} ms, over its {budget:.0f} ms budget")
+        if heavy:
+            failures.append(f"{module} eagerly imports {', '.join(heavy)}")
+    
+    if failures:
+        print("\n❌ Import-time budget exceeded:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    
+    print("\n✅ All entry points within import-time budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
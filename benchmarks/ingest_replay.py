@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Offline ingest benchmark for the mention pipeline.
+
+Writes a large synthetic JSONL feed and replays it through ReplaySource
+(normalize → filter → dedup → score → top-K), reporting throughput and the
+resident memory growth, which should stay flat regardless of feed size.
+
+Usage:
+    python benchmarks/ingest_replay.py
+    python benchmarks/ingest_replay.py --mentions 1000000 --companies 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from memory_soak import rss_mb  # noqa: E402  (sibling benchmark script)
+from tools.sources import ReplaySource  # noqa: E402
+
+
+HOSTS = ["twitter.com", "x.com", "reddit.com", "news.ycombinator.com", "techcrunch.com", "example.com"]
+PHRASES = [
+    "keeps crashing after the update", "support never answered", "love the new release",
+    "billing charged me twice", "worst outage this year", "app is broken again", "works fine for me",
+]
+
+
+def write_feed(path: str, mentions: int, companies: int, rng: random.Random) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(mentions):
+            company = f"Brand{rng.randrange(companies):04d}"
+            record = {
+                "url": f"https://{rng.choice(HOSTS)}/post/{rng.randrange(mentions // 2)}",
+                "content": f"{company} {rng.choice(PHRASES)} #{i}",
+                "title": f"{company} mention",
+                "published_date": "2024-10-02T12:00:00Z",
+                "relevance_score": round(rng.random(), 4),
+            }
+            f.write(json.dumps(record) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark offline mention ingest")
+    parser.add_argument("--mentions", type=int, default=200_000)
+    parser.add_argument("--companies", type=int, default=20)
+    args = parser.parse_args()
+    
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feed.jsonl")
+        write_feed(path, args.mentions, args.companies, rng)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        
+        source = ReplaySource(path)
+        source.fetch("Brand0000")  # warm up lexicons and caches
+        baseline = rss_mb()
+        
+        started = time.perf_counter()
+        mentions, stats = source.fetch("Brand0001")
+        elapsed = time.perf_counter() - started
+        growth = rss_mb() - baseline
+    
+    print(f"Feed: {args.mentions:,} mentions ({size_mb:.1f} MB)")
+    print(f"Replayed in {elapsed:.2f}s ({stats['raw'] / elapsed:,.0f} records/s), "
+          f"{stats['accepted']:,} relevant, kept top {len(mentions)}")
+    print(f"RSS growth during replay: {growth:+.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
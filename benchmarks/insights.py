@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the materialized dashboard insights.
+
+Aggregates synthetic runs (monitor, sentiment and priority outputs),
+records them across companies, and times the reads behind GET /insights:
+a single run, a company with a long run history, and the company list.
+
+Usage:
+    python benchmarks/insights.py
+    python benchmarks/insights.py --runs 5000 --companies 20 --history 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from analytics.insights import run_aggregates  # noqa: E402
+from runtime.insights import InsightsStore  # noqa: E402
+
+
+PLATFORMS = ["Twitter/X", "Reddit", "News/Web", "Hacker News", "TechCrunch"]
+
+
+def synthetic_run(rng: random.Random, mentions: int) -> dict:
+    monitor = [
+        {
+            "platform": rng.choice(PLATFORMS),
+            "title": f"Mention {i}",
+            "content": rng.choice(["app crashes again", "love the update", "refund still pending", "new store opening"]),
+            "url": f"https://example.com/{rng.random()}",
+        }
+        for i in range(mentions)
+    ]
+    sentiment = [{"url": m["url"], "sentiment_score": round(rng.uniform(-1, 1), 2)} for m in monitor]
+    return {"monitor": json.dumps(monitor), "sentiment": json.dumps({"mentions": sentiment})}
+
+
+def timed(repeat: int, call) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the materialized dashboard insights")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--mentions", type=int, default=15, help="Mentions per run")
+    parser.add_argument("--history", type=int, default=500, help="Runs of history per company read")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    rng = random.Random(3)
+    store = InsightsStore(os.path.join(tempfile.mkdtemp(), "insights.db"))
+    companies = [f"Company{i}" for i in range(args.companies)]
+    runs = [synthetic_run(rng, args.mentions) for _ in range(20)]
+    
+    started = time.perf_counter()
+    for i in range(args.runs):
+        aggregates = run_aggregates(runs[i % len(runs)])
+        store.record_run(f"run-{i}", "fast", companies[i % len(companies)], aggregates, completed_at=time.time() - (args.runs - i) * 60)
+    per_run = (time.perf_counter() - started) / args.runs * 1000
+    print(f"Aggregated and recorded {args.runs} runs of {args.mentions} mentions: {per_run:.2f}ms per run\n")
+    
+    history = store.company_json(companies[0], runs=args.history)
+    print(f"{'read':<34} {'p50':>9} {'bytes':>9}")
+    print(f"{'single run':<34} {timed(args.repeat, lambda: store.run_json('run-0')):7.2f}ms {len(store.run_json('run-0')):9d}")
+    print(f"{f'company + {args.history} runs of history':<34} "
+          f"{timed(args.repeat, lambda: store.company_json(companies[0], runs=args.history)):7.2f}ms {len(history):9d}")
+    print(f"{'company list':<34} {timed(args.repeat, store.companies_json):7.2f}ms {len(store.companies_json()):9d}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Soak test for the Deep workflow's bounded memory backend.
+
+Replays the memory traffic of many deep runs (stage outputs saved to
+short-term memory, entities extracted, long-term task evaluations, and the
+contextual searches each agent performs) against ScopedMemoryRegistry, and
+checks that resident memory stays flat once the caps are reached.
+
+No LLM or Tavily calls are made: the crew's own work is not what grows, the
+memory stores are, so the stores are exercised directly with realistic sizes.
+
+Usage:
+    python benchmarks/memory_soak.py
+    python benchmarks/memory_soak.py --runs 1000 --companies 300 --max-growth-mb 8
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-soak")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-soak")
+
+from workflows.memory import ScopedMemoryRegistry  # noqa: E402
+
+
+STAGES = ["monitor", "sentiment", "priority", "investigation", "response"]
+WORDS = (
+    "crash outage refund battery login update broken slow support charging app server "
+    "billing delay recall privacy bug screen viral complaint angry customer churn"
+).split()
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def fake_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def simulate_deep_run(registry: ScopedMemoryRegistry, company: str, rng: random.Random) -> None:
+    """Reproduce the memory saves and searches of one deep run."""
+    key = registry.scope_key(company)
+    scope = registry.get(key)
+    
+    for stage in STAGES:
+        # Each agent searches memory for context before working
+        scope.short_term.search(f"{company} {stage} {fake_text(rng, 8)}", limit=3)
+        scope.entities.search(f"{company} {fake_text(rng, 5)}", limit=3)
+        scope.long_term.load(f"{stage} task for {company}", latest_n=2)
+        
+        # ...and saves its output, extracted entities and a task evaluation afterwards
+        scope.short_term.save(fake_text(rng, 400), {"agent": stage})
+        for _ in range(3):
+            scope.entities.save(f"{company} {fake_text(rng, 20)}", {"type": "issue"})
+        scope.long_term.save(f"{stage} task for {company}", {"quality": 8, "suggestions": []}, time.time(), 8)
+    
+    if key.startswith("request:"):
+        registry.release(key)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Soak test the bounded memory backend")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--companies", type=int, default=300, help="Distinct companies to rotate through")
+    parser.add_argument("--warmup", type=int, default=200, help="Runs before the RSS baseline is taken")
+    parser.add_argument("--max-growth-mb", type=float, default=8.0, help="Allowed RSS growth after warm-up")
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    registry = ScopedMemoryRegistry()
+    companies = [f"Company{i}" for i in range(args.companies)]
+    
+    baseline = None
+    samples = []
+    started = time.time()
+    
+    for run in range(1, args.runs + 1):
+        simulate_deep_run(registry, rng.choice(companies), rng)
+        
+        if run == args.warmup:
+            gc.collect()
+            baseline = rss_mb()
+        if run % 100 == 0:
+            gc.collect()
+            samples.append((run, rss_mb(), registry.stats()["items"]))
+            print(f"run {run:5d}  rss {samples[-1][1]:7.1f} MB  items {samples[-1][2]}")
+    
+    elapsed = time.time() - started
+    final = samples[-1][1]
+    growth = final - (baseline if baseline is not None else samples[0][1])
+    
+    print(f"\n{args.runs} simulated deep runs in {elapsed:.1f}s")
+    print(f"RSS after warm-up: {baseline:.1f} MB, final: {final:.1f} MB, growth: {growth:+.1f} MB")
+    print(f"Memory stats: {registry.stats()}")
+    
+    if growth > args.max_growth_mb:
+        print(f"❌ RSS grew by {growth:.1f} MB (limit {args.max_growth_mb} MB)")
+        return 1
+    
+    print("✅ RSS stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark for local mention clustering.
+
+Generates synthetic mentions around a handful of recurring issues plus
+unrelated noise, spread over several platforms, and times vectorization,
+clustering and summarization for growing batch sizes. Also reports how much
+smaller the cluster summary handed to the Context Investigator is than the
+raw mention JSON it replaces.
+
+Usage:
+    python benchmarks/mention_clustering.py
+    python benchmarks/mention_clustering.py --sizes 1000 5000 20000 --content-words 60
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from analytics.clustering import MentionClusterer  # noqa: E402
+
+
+ISSUES = [
+    "app keeps crashing after the latest update on iphone",
+    "charged twice for my subscription and the refund was denied",
+    "servers down again outage cannot login all morning",
+    "customer support ignored my ticket for three weeks",
+    "battery drains fast since the firmware update",
+    "love the new design and the dark mode feature",
+]
+FILLER = (
+    "honestly really today again seriously still everyone anyone else noticed this week please fix "
+    "thanks team waiting hours minutes update phone laptop tablet account order"
+).split()
+NOISE = "weather coffee music travel parking lunch tickets football recipe garden movie podcast".split()
+PLATFORMS = ["Twitter/X", "Reddit", "News/Web", "Hacker News", "TechCrunch", "The Verge"]
+
+
+def synthetic_mentions(rng: random.Random, count: int, content_words: int, noise_share: float):
+    mentions = []
+    for i in range(count):
+        if rng.random() < noise_share:
+            words = rng.sample(NOISE, 6) + [f"topic{i}"]
+        else:
+            words = rng.choice(ISSUES).split()
+        # Keep the issue phrase intact and surround it with filler
+        filler = rng.choices(FILLER, k=max(0, content_words - len(words)))
+        cut = rng.randint(0, len(filler))
+        content = " ".join(filler[:cut] + words + filler[cut:])
+        mentions.append({
+            "platform": rng.choice(PLATFORMS),
+            "title": f"Acme: {content[:60]}",
+            "content": content,
+            "url": f"https://example.com/mention/{i}",
+            "published_date": "2024-01-01T00:00:00Z",
+            "relevance_score": round(rng.random(), 2),
+        })
+    return mentions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark local mention clustering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 500, 2000, 5000])
+    parser.add_argument("--content-words", type=int, default=40)
+    parser.add_argument("--noise-share", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    rng = random.Random(7)
+    clusterer = MentionClusterer()
+    clusterer.summarize("Acme", synthetic_mentions(rng, 50, args.content_words, args.noise_share))  # warm-up
+    
+    print(f"{'mentions':>9} {'vectorize':>10} {'cluster':>9} {'summary':>9} {'clusters':>9} {'systemic':>9} "
+          f"{'raw chars':>10} {'summary chars':>14}")
+    for size in args.sizes:
+        mentions = synthetic_mentions(rng, size, args.content_words, args.noise_share)
+        texts = [f"{m['title']} {m['content']}" for m in mentions]
+        timings = {"vectorize": [], "cluster": [], "summary": []}
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            rows, _ = clusterer.vectorize(texts, ignore={"acme"})
+            vectorized = time.perf_counter()
+            clusterer.cluster(rows)
+            clustered = time.perf_counter()
+            report = clusterer.summarize("Acme", mentions)
+            summarized = time.perf_counter()
+            timings["vectorize"].append(vectorized - started)
+            timings["cluster"].append(clustered - vectorized)
+            timings["summary"].append(summarized - clustered)
+        best = {name: min(values) * 1000 for name, values in timings.items()}
+        print(
+            f"{size:9d} {best['vectorize']:8.1f}ms {best['cluster']:7.1f}ms {best['summary']:7.1f}ms "
+            f"{report['clusters']:9d} {report['systemic_clusters']:9d} "
+            f"{len(json.dumps(mentions)):10d} {len(json.dumps(report)):14d}"
+        )
+    print("summary = vectorize + cluster + build the investigator report (end-to-end)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the mention search index.
+
+Builds an index of synthetic mentions across companies, platforms, dates
+and sentiment scores (in runs of SEARCH_TOP_K mentions, as the workflows
+write them), then times representative analyst queries with facet counts.
+
+Usage:
+    python benchmarks/mention_search.py
+    python benchmarks/mention_search.py --mentions 1000000 --path /tmp/mentions.db
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from runtime.mention_index import MentionIndex  # noqa: E402
+
+
+COMPANIES = ["Tesla", "Apple", "Spotify", "Netflix", "Uber", "Airbnb", "Microsoft", "Amazon", "Google", "Meta"]
+PLATFORMS = ["Twitter/X", "Reddit", "News/Web", "Hacker News", "TechCrunch", "The Verge"]
+TYPES = ["complaint", "negative", "positive", "neutral"]
+WORDS = (
+    "supercharger charging app update battery crash outage login refund billing support ticket delivery "
+    "driver price subscription design feature camera screen account password slow fast great terrible "
+    "love hate broken fixed waiting hours service store order shipping return warranty recall"
+).split()
+FILLER = "the a my is was and again today still after before with for this that really very".split()
+
+QUERIES = {
+    "term + platform + sentiment + 30 days": dict(query="supercharger", platform="Reddit", sentiment_max=-0.5, since_days=30),
+    "term across companies": dict(query="refund"),
+    "phrase + company": dict(query='"battery crash"', company="Apple"),
+    "prefix term + type": dict(query="charg*", mention_type="complaint"),
+    "filters only (company, 7 days)": dict(company="Tesla", since_days=7),
+    "filters only (critical, 30 days)": dict(sentiment_max=-0.5, since_days=30),
+}
+
+
+def build(index: MentionIndex, rng: random.Random, count: int, run_size: int) -> None:
+    now = datetime.now(timezone.utc)
+    for start in range(0, count, run_size):
+        company = rng.choice(COMPANIES)
+        mentions, scored = [], []
+        for i in range(start, min(start + run_size, count)):
+            words = rng.choices(WORDS, k=3) + rng.choices(FILLER, k=12)
+            rng.shuffle(words)
+            mention = {
+                "platform": rng.choice(PLATFORMS),
+                "title": f"{company} {' '.join(words[:6])}",
+                "content": " ".join(words),
+                "url": f"https://example.com/{company.lower()}/{i}",
+                "published_date": (now - timedelta(days=rng.uniform(0, 365))).isoformat(),
+                "mention_type": rng.choice(TYPES),
+            }
+            mentions.append(mention)
+            scored.append((mention, {"sentiment_score": round(rng.uniform(-1, 1), 2), "urgency_level": rng.randint(0, 10)}))
+        index.index_mentions(company, mentions, run_id=f"run-{start}")
+        index.update_sentiment(company, scored)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the mention search index")
+    parser.add_argument("--mentions", type=int, default=200000)
+    parser.add_argument("--run-size", type=int, default=15)
+    parser.add_argument("--path", default=None, help="Index file (default: a temporary file)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    path = args.path or os.path.join(tempfile.mkdtemp(), "mentions.db")
+    index = MentionIndex(path)
+    existing = index.stats()["mentions"]
+    if existing < args.mentions:
+        started = time.perf_counter()
+        build(index, random.Random(5), args.mentions - existing, args.run_size)
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {args.mentions - existing} mentions in {elapsed:.1f}s "
+              f"({elapsed / max(args.mentions - existing, 1) * args.run_size * 1000:.2f}ms per run of {args.run_size})")
+    print(f"Index: {index.stats()['mentions']} mentions, {os.path.getsize(path) / 1e6:.0f} MB\n")
+    
+    print(f"{'query':<40} {'matches':>9} {'p50':>9} {'max':>9}")
+    for name, params in QUERIES.items():
+        since_days = params.pop("since_days", None)
+        if since_days:
+            params["since"] = time.time() - since_days * 86400
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = index.search(**params)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        matches = f"{result['total']}{'' if result['exact'] else '+'}"
+        print(f"{name:<40} {matches:>9} {timings[len(timings) // 2]:7.1f}ms {timings[-1]:7.1f}ms")
+    print("\nTimes include the page of results, the total and all facet counts.")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Connection reuse benchmark for the shared client registry.
+
+Starts a local keep-alive HTTP server with a small simulated latency and
+sends the same concurrent load twice: once with a new client per call (as
+when every workflow, agent and tool built its own client) and once through
+the registry's shared pools. Reports wall time and connections opened for
+both the OpenAI (httpx) and the Tavily (requests) clients. Against the real
+APIs every avoided connection also saves a TLS handshake.
+
+Usage:
+    python benchmarks/pooled_clients.py
+    python benchmarks/pooled_clients.py --requests 2000 --concurrency 32
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+import httpx  # noqa: E402
+import requests  # noqa: E402
+
+from runtime.clients import ClientRegistry  # noqa: E402
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.005
+    connections = 0
+    lock = threading.Lock()
+    
+    def setup(self):
+        super().setup()
+        with Handler.lock:
+            Handler.connections += 1
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def run(label: str, call, total: int, concurrency: int) -> None:
+    Handler.connections = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: call(), range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {elapsed:7.2f}s  {total / elapsed:8.0f} req/s  {Handler.connections:6d} connections")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark shared pooled HTTP clients")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    
+    Handler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    payload = {"model": "bench", "messages": [{"role": "user", "content": "hi"}]}
+    
+    registry = ClientRegistry()
+    shared_http = registry.openai_http_client()
+    shared_session = registry.tavily_session()
+    
+    def fresh_httpx():
+        with httpx.Client() as client:
+            client.post(url, json=payload).raise_for_status()
+    
+    def pooled_httpx():
+        shared_http.post(url, json=payload).raise_for_status()
+    
+    def fresh_requests():
+        with requests.Session() as session:
+            session.post(url, json=payload).raise_for_status()
+    
+    def pooled_requests():
+        shared_session.post(url, json=payload).raise_for_status()
+    
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency_ms:.0f} ms server latency")
+    print("OpenAI client (httpx):")
+    run("new client per call", fresh_httpx, args.requests, args.concurrency)
+    run("shared registry pool", pooled_httpx, args.requests, args.concurrency)
+    print("Tavily client (requests):")
+    run("new session per call", fresh_requests, args.requests, args.concurrency)
+    run("shared registry pool", pooled_requests, args.requests, args.concurrency)
+    
+    stats = registry.stats()
+    for name in ("openai", "tavily"):
+        pool = stats[name]
+        print(
+            f"{name} pool: {pool['requests']} requests, {pool['connections_opened']} connections opened, "
+            f"reuse ratio {pool['reuse_ratio']}"
+        )
+    registry.close()
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the distilled local sentiment model.
+
+Generates synthetic labeled mentions (issue phrases per sentiment band in
+filler text, with noisy scores), trains a model on a growing number of
+labels, and reports training time, per-mention inference latency, holdout
+accuracy and the share of mentions the model would take over from the LLM
+at the confidence threshold.
+
+Usage:
+    python benchmarks/sentiment_model.py
+    python benchmarks/sentiment_model.py --labels 500 2000 10000 --threshold 0.9
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Settings require API keys at import time; dummy values are enough here
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-bench")
+
+from analytics.sentiment_model import evaluate, train  # noqa: E402
+
+
+PHRASES = {
+    -0.8: ["app crashes and deletes my data", "charged twice and the refund was denied", "total outage cannot login"],
+    -0.3: ["support is slow to respond", "update made the battery worse", "not happy with the new pricing"],
+    0.0: ["announced a new office opening", "earnings call scheduled for thursday", "released version notes today"],
+    0.6: ["love the new design", "great customer service experience", "excellent performance after the update"],
+}
+FILLER = "honestly today really this week my phone and the team again still everyone noticed".split()
+PLATFORMS = ["Twitter/X", "Reddit", "News/Web", "Hacker News"]
+
+
+def synthetic_labels(rng: random.Random, count: int, noise: float):
+    examples = []
+    for i in range(count):
+        score = rng.choice(list(PHRASES))
+        platform = rng.choice(PLATFORMS)
+        words = rng.choices(FILLER, k=8)
+        cut = rng.randint(0, len(words))
+        text = " ".join(words[:cut] + rng.choice(PHRASES[score]).split() + words[cut:] + [f"ref{i}"])
+        if rng.random() < noise:
+            # Mislabeled by the LLM
+            score = rng.choice(list(PHRASES))
+        examples.append({
+            "text": text,
+            "platform": platform,
+            "sentiment_score": max(-1.0, min(1.0, score + rng.uniform(-0.1, 0.1))),
+            "urgency_level": 9 if score < -0.5 else 5 if score < 0 else 1,
+            "viral_potential": "High" if score < -0.5 and platform == "Twitter/X" else "Low" if platform == "News/Web" else "Medium",
+        })
+    return examples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the local sentiment model")
+    parser.add_argument("--labels", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--holdout", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.05, help="Share of mislabeled training examples")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+    
+    rng = random.Random(11)
+    holdout = synthetic_labels(rng, args.holdout, noise=0.0)
+    mentions = [{"title": "", "content": e["text"], "platform": e["platform"]} for e in holdout]
+    
+    print(f"{'labels':>7} {'train':>8} {'infer/mention':>14} {'band acc':>9} {'coverage':>9} {'confident acc':>14}")
+    for count in args.labels:
+        examples = synthetic_labels(rng, count, args.noise)
+        started = time.perf_counter()
+        model = train(examples)
+        trained = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        model.predict(mentions)
+        per_mention = (time.perf_counter() - started) / len(mentions) * 1e6
+        
+        metrics = evaluate(model, holdout, args.threshold)
+        confident_accuracy = metrics["confident_accuracy"]
+        print(
+            f"{count:7d} {trained:7.2f}s {per_mention:12.1f}us {metrics['band_accuracy']:9.3f} "
+            f"{metrics['coverage']:9.3f} {confident_accuracy if confident_accuracy is not None else float('nan'):14.3f}"
+        )
+    print(f"coverage = share of mentions at confidence >= {args.threshold} (scored locally instead of by the LLM)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,11 +15,171 @@ class Settings(BaseSettings):
     # Tavily Search API Configuration  
     TAVILY_API_KEY: str
     
+    # Tavily Resilience Configuration
+    TAVILY_QUERY_DEADLINE_SECONDS: float = 8.0
+    TAVILY_MAX_RETRIES: int = 2
+    TAVILY_BACKOFF_BASE_SECONDS: float = 0.25
+    TAVILY_BACKOFF_MAX_SECONDS: float = 2.0
+    TAVILY_HEDGE_ENABLED: bool = True
+    TAVILY_HEDGE_PERCENTILE: float = 95.0
+    TAVILY_HEDGE_MIN_SAMPLES: int = 20
+    TAVILY_BREAKER_FAILURE_THRESHOLD: int = 5
+    TAVILY_BREAKER_RESET_SECONDS: float = 30.0
+    
+    # HTTP Connection Pool Configuration
+    OPENAI_POOL_MAX_CONNECTIONS: int = 50   # Concurrent OpenAI connections per process
+    OPENAI_POOL_MAX_KEEPALIVE: int = 20     # Idle OpenAI connections kept open for reuse
+    OPENAI_HTTP_TIMEOUT_SECONDS: float = 60.0
+    TAVILY_POOL_CONNECTIONS: int = 4        # Hosts with a cached Tavily connection pool
+    TAVILY_POOL_MAXSIZE: int = 16           # Connections kept per Tavily host
+    HTTP_KEEPALIVE_SECONDS: float = 30.0    # Idle OpenAI connections are closed after this
+    
     # Application Configuration
     DEBUG: bool = True
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     
+    # Mention Ingestion Configuration
+    SEARCH_MAX_RESULTS: int = 5             # Results requested per search query
+    SEARCH_TOP_K: int = 15                  # Mentions kept per search run
+    SEARCH_QUERY_CONCURRENCY: int = 5       # Search queries in flight at once (default wave size)
+    SEARCH_PLANS_PATH: str = "data/search_plans.json"  # Per-tier/per-company query sets, domains and budgets
+    SEARCH_DEFAULT_TIER: str = "standard"   # "small", "standard" or "enterprise"
+    MENTION_LEXICONS_PATH: str = "data/mention_lexicons.json"  # Keyword lexicons for mention types
+    MENTION_SOURCE: str = "tavily"          # "tavily", "replay", "directory" or "mock"
+    MENTION_REPLAY_PATH: str = "data/mock_data.json"  # JSONL/CSV (or JSON list) file for the replay source
+    MENTION_WATCH_DIR: str = "data/feeds"   # Directory of exported feeds for the directory source
+    MENTION_WATCH_PATTERN: str = "*.jsonl,*.csv"
+    MONITOR_MODE: str = "tool"              # "tool" calls the search directly, "agent" goes through the Monitor LLM agent
+    
+    # Request Deadline Configuration (seconds, 0 disables)
+    REQUEST_DEADLINE_SECONDS: float = 60.0
+    
+    # Request Coalescing Configuration
+    SINGLE_FLIGHT_ENABLED: bool = True
+    RESULT_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Admission Scheduling Configuration
+    # Runs are admitted by weighted fair queuing across priority classes, each
+    # with its own concurrency cap (0 = all slots) and queue limit (0 = unbounded queue)
+    SCHEDULER_MAX_CONCURRENCY: int = 8      # Workflow runs executing at once (resized by the adaptive limit)
+    SCHEDULER_WEIGHT_INTERACTIVE: float = 8.0
+    SCHEDULER_WEIGHT_SCHEDULED: float = 3.0
+    SCHEDULER_WEIGHT_BATCH: float = 1.0
+    SCHEDULER_CAP_INTERACTIVE: int = 0
+    SCHEDULER_CAP_SCHEDULED: int = 4
+    SCHEDULER_CAP_BATCH: int = 4
+    SCHEDULER_MAX_QUEUED_INTERACTIVE: int = 100
+    SCHEDULER_MAX_QUEUED_SCHEDULED: int = 500
+    SCHEDULER_MAX_QUEUED_BATCH: int = 0
+    
+    # Adaptive Concurrency Configuration
+    # AIMD limit on analyses in flight: +1 per round trip while stages meet
+    # their SLOs, multiplicative decrease on upstream errors or slow stages.
+    # Requests over the limit are shed with 503 and Retry-After.
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = True
+    CONCURRENCY_INITIAL_LIMIT: int = 8
+    CONCURRENCY_MIN_LIMIT: int = 1
+    CONCURRENCY_MAX_LIMIT: int = 32
+    CONCURRENCY_BACKOFF_RATIO: float = 0.7       # On 429s, timeouts and upstream errors
+    CONCURRENCY_SLOW_BACKOFF_RATIO: float = 0.9  # On stages over their latency SLO
+    CONCURRENCY_DECREASE_COOLDOWN_SECONDS: float = 5.0
+    
+    # Execution Backend Configuration
+    # "inline" runs workflows in the API process; "process_pool" runs them in
+    # pre-warmed worker processes to avoid GIL contention between requests.
+    EXECUTION_BACKEND: str = "inline"
+    WORKER_POOL_SIZE: int = 0  # 0 = one worker per CPU core
+    WORKER_MAX_JOBS: int = 50  # Recycle a worker after this many runs (0 = never)
+    WORKER_START_METHOD: str = "spawn"
+    WORKER_DEADLINE_GRACE_SECONDS: float = 5.0
+    WORKER_EXIT_TIMEOUT_SECONDS: float = 30.0  # Time a recycled or stopped worker gets to flush its stores
+    
+    # Deep Workflow Memory Configuration
+    MEMORY_BACKEND: str = "bounded"    # "bounded", "crewai" (unbounded default) or "off"
+    MEMORY_SCOPE: str = "company"      # "company" or "request"
+    MEMORY_EMBEDDER: str = "local"     # "local" hashing index or "provider" embeddings API
+    MEMORY_MAX_ITEMS: int = 200        # Per store, per scope
+    MEMORY_MAX_SCOPES: int = 50
+    MEMORY_TTL_SECONDS: float = 3600.0
+    
+    # Deep Workflow Planning Configuration
+    DEEP_PLANNING_MODE: str = "static"      # "static" (cached plan), "llm" (plan every run) or "off"
+    DEEP_PLAN_SOURCE: str = "handwritten"   # "handwritten" or "generated" (once per task-definition change)
+    PLAN_CACHE_PATH: str = "outputs/deep_plan.json"
+    
+    # Deep Workflow Execution Configuration
+    DEEP_PARALLEL_STAGES: bool = True       # Run priority ranking and investigation concurrently
+    
+    # Response Coordination Configuration
+    RESPONSE_MODE: str = "single"           # "single" (one generation) or "fanout" (concurrent call per department)
+    RESPONSE_FANOUT_TIMEOUT_SECONDS: float = 20.0
+    RESPONSE_CONTEXT_MAX_CHARS: int = 6000  # Shared context budget for the department calls
+    
+    # Priority Scoring Configuration
+    PRIORITY_MODE: str = "hybrid"           # "llm", "local" (NumPy scoring, no LLM stage) or "hybrid" (local scores, LLM narrative)
+    PRIORITY_WEIGHT_INFLUENCE: float = 30.0 # Max points per component; rescaled to a 0-100 total
+    PRIORITY_WEIGHT_SEVERITY: float = 25.0
+    PRIORITY_WEIGHT_VIRAL: float = 25.0
+    PRIORITY_WEIGHT_FREQUENCY: float = 20.0
+    
+    # Mention Search Index Configuration
+    MENTION_INDEX_ENABLED: bool = True
+    MENTION_INDEX_PATH: str = "data/mentions.db"  # SQLite FTS5 index of every run's mentions
+    SEARCH_FACET_SCAN_LIMIT: int = 10000    # Matches counted for totals and facets per search
+    
+    # Insights Configuration
+    INSIGHTS_ENABLED: bool = True           # Materialize per-run and per-company aggregates for GET /insights
+    INSIGHTS_DB_PATH: str = "data/insights.db"
+    
+    # Local Sentiment Model Configuration
+    SENTIMENT_MODE: str = "hybrid"          # "hybrid" (confident mentions scored by the local model) or "llm"
+    SENTIMENT_LABELS_ENABLED: bool = True   # Keep Sentiment Analyzer outputs as training labels
+    SENTIMENT_LABELS_PATH: str = "data/sentiment_labels.jsonl"
+    SENTIMENT_MODEL_DIR: str = "data/models/sentiment"
+    SENTIMENT_MODEL_FEATURES: int = 65536   # Hashed feature dimensions
+    SENTIMENT_CONFIDENCE_THRESHOLD: float = 0.8  # Lower-confidence mentions go to the LLM
+    SENTIMENT_MODEL_MIN_EXAMPLES: int = 200      # Labeled examples before a model is promoted
+    SENTIMENT_MODEL_MIN_ACCURACY: float = 0.85   # Holdout accuracy on confident mentions to promote
+    
+    # Mention Clustering Configuration
+    INVESTIGATION_MODE: str = "clusters"    # "clusters" (investigator reads local cluster summaries) or "raw" (every mention)
+    CLUSTER_SIMILARITY_THRESHOLD: float = 0.3  # Cosine similarity to join a cluster
+    CLUSTER_HASH_FEATURES: int = 16384      # Hashed TF-IDF dimensions
+    CLUSTER_MAX_CLUSTERS: int = 512
+    CLUSTER_MAX_SUMMARIES: int = 15         # Largest clusters described to the investigator
+    CLUSTER_REPRESENTATIVES: int = 3        # Representative mentions per cluster
+    CLUSTER_SYSTEMIC_MIN_SIZE: int = 3      # Mentions (on 2+ platforms) for a cluster to count as systemic
+    
+    # Model Routing Configuration
+    MODEL_ROUTING_ENABLED: bool = True
+    MODEL_ROUTES_PATH: str = "data/model_routes.json"  # Per-stage model, max_tokens, timeout and p95 SLO
+    MODEL_FALLBACK_NAME: str = "gpt-4.1-nano"  # Faster model used when a stage's p95 exceeds its SLO
+    MODEL_LATENCY_WINDOW: int = 50          # Recent executions per stage/model in the rolling p95
+    MODEL_LATENCY_MIN_SAMPLES: int = 5      # Executions needed before the SLO is enforced
+    MODEL_FALLBACK_PROBE_EVERY: int = 10    # While falling back, send every Nth request to the primary model
+    
+    # Output Sink Configuration
+    OUTPUT_SINK: str = "files"  # "files", "jsonl" or "off"
+    OUTPUT_DIR: str = "outputs"
+    OUTPUT_SINK_COMPRESS: bool = False
+    OUTPUT_SINK_FSYNC: bool = True
+    OUTPUT_SINK_BATCH_SIZE: int = 64
+    OUTPUT_SINK_FLUSH_SECONDS: float = 0.5
+    
+    # Checkpoint Configuration
+    # Completed stage outputs are committed to SQLite under the run id; a
+    # retry within the resume window skips the stages already done
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_DB_PATH: str = "data/checkpoints.db"
+    CHECKPOINT_RESUME_WINDOW_SECONDS: float = 900.0
+    CHECKPOINT_RETENTION_SECONDS: float = 86400.0
+    CHECKPOINT_LEASE_SECONDS: float = 300.0  # How long a run owned by another host stays claimed after its last update
+    SHUTDOWN_DRAIN_SECONDS: float = 30.0  # Wait for in-flight runs before stopping
+    
+    # Startup Configuration
+    WARM_WORKFLOWS_ON_STARTUP: bool = True
+    
     # CrewAI Configuration
     CREWAI_TRACING_ENABLED: Optional[str] = None
     
@@ -3,15 +3,31 @@ Main CrewAI setup and orchestration for the Customer Sentiment Alert System.
 Provides unified interface for both Fast and Deep analysis workflows.
 """
 import logging
+import threading
 import time
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 
-from langchain_openai import ChatOpenAI
-
-from workflows.fast_workflow import FastWorkflow
-from workflows.deep_workflow import DeepWorkflow
 from config import settings
+from runtime.concurrency import AdaptiveConcurrencyLimit, ConcurrencyLimitExceeded
+from runtime.deadline import Deadline, DeadlineExceeded
+from runtime.singleflight import SingleFlight
+from runtime.checkpoints import close_checkpoint_store, get_checkpoint_store
+from runtime.clients import close_client_registry, get_client_registry
+from runtime.insights import close_insights_store, get_insights_store
+from runtime.instance_pool import InstancePool
+from runtime.mention_index import close_mention_index, get_mention_index
+from runtime.output_sink import close_output_sink
+from runtime.scheduler import AdmissionRejected, AdmissionScheduler
+from workflows.execution import WORKFLOW_STAGES, StageRecorder, build_partial_results
+
+if TYPE_CHECKING:
+    from runtime.worker_pool import WorkflowWorkerPool
+    from workflows.fast_workflow import FastWorkflow
+    from workflows.deep_workflow import DeepWorkflow
+    from workflows.memory import ScopedMemoryRegistry
 
 
 # Configure logging
@@ -25,18 +41,63 @@ class SentimentAlertCrew:
     
     Manages both Fast (3 agents) and Deep (5 agents) analysis workflows.
     Searches REAL internet data using Tavily API and generates email previews.
+    
+    Workflows (and with them CrewAI, LangChain and the Tavily client) are
+    built on first use or by warm_up(), so constructing the crew is cheap.
+    CrewAI agents are not safe to share between concurrent runs, so every
+    run checks out its own workflow instance from a pool.
+    
+    Every run passes through an admission scheduler, so interactive requests
+    are not starved by scheduled monitoring or batch work.
     """
     
+    # Relative cost of a run for fair sharing between priority classes
+    # (deep runs take roughly 2.5x as long as fast runs)
+    WORKFLOW_COSTS = {"fast": 1.0, "deep": 2.5}
+    
     def __init__(self):
-        """Initialize the crew with workflow instances."""
+        """Initialize the crew; workflows are constructed lazily."""
         logger.info("Initializing Customer Sentiment Alert System...")
         
         # Validate configuration
         self._validate_config()
         
-        # Initialize workflows
-        self.fast_workflow = FastWorkflow()
-        self.deep_workflow = DeepWorkflow()
+        # Workflow instances are built on first use, one per concurrent run
+        self._workflows: Dict[str, InstancePool] = {
+            "fast": InstancePool(self._build_fast_workflow),
+            "deep": InstancePool(self._build_deep_workflow)
+        }
+        self._deep_memory: Optional["ScopedMemoryRegistry"] = None
+        self._workflow_lock = threading.Lock()
+        
+        # Optional pool of worker processes holding their own warm workflows
+        self._pool: Optional["WorkflowWorkerPool"] = None
+        
+        # Coalesce concurrent identical analyses and briefly cache complete results
+        self._flights = SingleFlight(
+            result_ttl=settings.RESULT_CACHE_TTL_SECONDS,
+            cache_if=lambda results: results.get("status") == "success" and not results.get("partial")
+        )
+        
+        # Priority classes share the execution slots by weighted fair queuing
+        self._scheduler = AdmissionScheduler(
+            max_concurrency=settings.SCHEDULER_MAX_CONCURRENCY,
+            weights={
+                "interactive": settings.SCHEDULER_WEIGHT_INTERACTIVE,
+                "scheduled": settings.SCHEDULER_WEIGHT_SCHEDULED,
+                "batch": settings.SCHEDULER_WEIGHT_BATCH
+            },
+            caps={
+                "interactive": settings.SCHEDULER_CAP_INTERACTIVE,
+                "scheduled": settings.SCHEDULER_CAP_SCHEDULED,
+                "batch": settings.SCHEDULER_CAP_BATCH
+            },
+            max_queued={
+                "interactive": settings.SCHEDULER_MAX_QUEUED_INTERACTIVE,
+                "scheduled": settings.SCHEDULER_MAX_QUEUED_SCHEDULED,
+                "batch": settings.SCHEDULER_MAX_QUEUED_BATCH
+            }
+        )
         
         logger.info("✅ Crew initialization complete")
     
@@ -50,7 +111,140 @@ class SentimentAlertCrew:
         else:
             logger.info("✅ Tavily API configured for real internet search")
     
-    def run_fast(self, company_name: str) -> Dict[str, Any]:
+    def _build_fast_workflow(self) -> "FastWorkflow":
+        from workflows.fast_workflow import FastWorkflow
+        
+        started = time.time()
+        workflow = FastWorkflow()
+        logger.info(f"✅ Fast workflow ready in {time.time() - started:.2f}s")
+        return workflow
+    
+    def _build_deep_workflow(self) -> "DeepWorkflow":
+        from workflows.deep_workflow import DeepWorkflow
+        from workflows.memory import ScopedMemoryRegistry
+        
+        # Company-scoped crew memory is shared by all deep workflow instances
+        with self._workflow_lock:
+            if self._deep_memory is None:
+                self._deep_memory = ScopedMemoryRegistry()
+        started = time.time()
+        workflow = DeepWorkflow(memory_registry=self._deep_memory)
+        logger.info(f"✅ Deep workflow ready in {time.time() - started:.2f}s")
+        return workflow
+    
+    @property
+    def worker_pool(self) -> Optional["WorkflowWorkerPool"]:
+        """Worker process pool, started on first access when EXECUTION_BACKEND is 'process_pool'."""
+        if settings.EXECUTION_BACKEND != "process_pool":
+            return None
+        if self._pool is None:
+            with self._workflow_lock:
+                if self._pool is None:
+                    from runtime.worker_pool import WorkflowWorkerPool
+                    
+                    pool = WorkflowWorkerPool()
+                    pool.start()
+                    self._pool = pool
+        return self._pool
+    
+    def warm_up(self) -> None:
+        """Build workflows (or start the worker pool) ahead of the first request."""
+        try:
+            if settings.EXECUTION_BACKEND == "process_pool":
+                self.worker_pool
+            else:
+                self._workflows["fast"].warm()
+                self._workflows["deep"].warm()
+        except Exception as e:
+            logger.error(f"❌ Workflow warm-up failed: {e}")
+    
+    def set_concurrency_limit(self, limit: int) -> None:
+        """Resize the shared execution slots, e.g. from the adaptive concurrency limit."""
+        self._scheduler.resize(limit)
+    
+    def shutdown(self, drain_seconds: Optional[float] = None) -> None:
+        """
+        Drain in-flight runs, then release execution resources such as worker processes.
+        
+        New and queued runs are rejected while draining. Runs still going when
+        the drain timeout passes are marked interrupted in the checkpoint store,
+        so a retry naming their run id resumes them from their last completed stage.
+        
+        Args:
+            drain_seconds: How long to wait for running analyses. Defaults to
+                SHUTDOWN_DRAIN_SECONDS from config.
+        """
+        if drain_seconds is None:
+            drain_seconds = settings.SHUTDOWN_DRAIN_SECONDS
+        logger.info(f"Draining in-flight runs (up to {drain_seconds}s)...")
+        if not self._scheduler.drain(timeout=drain_seconds):
+            logger.warning("Drain timed out; unfinished runs are checkpointed for resume")
+        
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        close_output_sink()
+        close_checkpoint_store()
+        close_mention_index()
+        close_insights_store()
+        close_client_registry()
+    
+    def _execute(
+        self,
+        workflow: str,
+        company_name: str,
+        deadline: Deadline,
+        priority: str,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run a workflow on the configured execution backend once the scheduler admits it."""
+        with self._scheduler.admit(
+            priority,
+            timeout=deadline.remaining(),
+            cost=self.WORKFLOW_COSTS[workflow]
+        ) as queue_time:
+            pool = self.worker_pool
+            if pool is not None:
+                results = pool.run(workflow, company_name, deadline, resume_run_id)
+            else:
+                results = self._run_inline(workflow, company_name, deadline, resume_run_id)
+        
+        results = dict(results)
+        results["priority"] = priority
+        results["queue_time_seconds"] = round(queue_time, 3)
+        return results
+    
+    def _run_inline(
+        self,
+        workflow: str,
+        company_name: str,
+        deadline: Deadline,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run a workflow in this process on an instance no other run is using."""
+        pool = self._workflows[workflow]
+        instance = pool.acquire()
+        reusable = False
+        try:
+            results = instance.run(company_name, deadline=deadline, resume_run_id=resume_run_id)
+            # A crew abandoned at its deadline may still be running on these agents
+            reusable = not results.get("crew_abandoned")
+            return results
+        finally:
+            pool.release(instance, reusable=reusable)
+    
+    def workflows_ready(self) -> Dict[str, bool]:
+        """Report which workflows have been constructed."""
+        return {workflow: pool.created > 0 for workflow, pool in self._workflows.items()}
+    
+    def run_fast(
+        self,
+        company_name: str,
+        deadline_seconds: Optional[float] = None,
+        priority: str = "interactive",
+        limiter: Optional[AdaptiveConcurrencyLimit] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute fast 3-agent analysis workflow.
         
@@ -59,6 +253,13 @@ class SentimentAlertCrew:
         
         Args:
             company_name: Name of company to analyze (e.g., "Apple", "Tesla")
+            deadline_seconds: Optional time budget for the whole request.
+                Defaults to REQUEST_DEADLINE_SECONDS from config.
+            priority: Admission class: "interactive", "scheduled" or "batch"
+            limiter: Adaptive concurrency limit the run must fit under.
+                Requests that share another run's result do not count.
+            resume_run_id: Run id of an earlier partial or failed run to
+                resume instead of starting over
             
         Returns:
             Dictionary containing analysis results and email previews
@@ -74,8 +275,16 @@ class SentimentAlertCrew:
         logger.info(f"🚀 Starting FAST analysis for: {company_name}")
         
         try:
-            # Execute fast workflow
-            results = self.fast_workflow.run(company_name)
+            # Execute fast workflow, sharing any in-flight run for the same company
+            deadline = Deadline.from_request(deadline_seconds)
+            results, coalesced = self._run_coalesced(
+                "fast", company_name, deadline,
+                lambda: self._execute("fast", company_name, deadline, priority, resume_run_id),
+                limiter,
+                resume_run_id
+            )
+            results = dict(results)
+            results["coalesced"] = coalesced
             
             # Add additional metadata
             results.update({
@@ -88,6 +297,28 @@ class SentimentAlertCrew:
             logger.info(f"✅ Fast analysis complete for {company_name} in {results.get('processing_time', 'unknown')}")
             return results
             
+        except ConcurrencyLimitExceeded as e:
+            logger.warning(f"⏳ Shedding fast analysis of {company_name}: {e}")
+            return {
+                "status": "shed",
+                "workflow": "fast",
+                "company": company_name,
+                "error": str(e),
+                "retry_after": e.retry_after,
+                "execution_timestamp": datetime.utcnow().isoformat()
+            }
+            
+        except AdmissionRejected as e:
+            logger.warning(f"⏳ Fast analysis for {company_name} rejected: {e}")
+            return {
+                "status": "rejected",
+                "workflow": "fast",
+                "company": company_name,
+                "priority": priority,
+                "error": str(e),
+                "execution_timestamp": datetime.utcnow().isoformat()
+            }
+            
         except Exception as e:
             logger.error(f"❌ Fast workflow failed for {company_name}: {e}")
             return {
@@ -98,7 +329,14 @@ class SentimentAlertCrew:
                 "execution_timestamp": datetime.utcnow().isoformat()
             }
     
-    def run_deep(self, company_name: str) -> Dict[str, Any]:
+    def run_deep(
+        self,
+        company_name: str,
+        deadline_seconds: Optional[float] = None,
+        priority: str = "interactive",
+        limiter: Optional[AdaptiveConcurrencyLimit] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute comprehensive 5-agent analysis workflow.
         
@@ -107,6 +345,13 @@ class SentimentAlertCrew:
         
         Args:
             company_name: Name of company to analyze (e.g., "Apple", "Tesla")
+            deadline_seconds: Optional time budget for the whole request.
+                Defaults to REQUEST_DEADLINE_SECONDS from config.
+            priority: Admission class: "interactive", "scheduled" or "batch"
+            limiter: Adaptive concurrency limit the run must fit under.
+                Requests that share another run's result do not count.
+            resume_run_id: Run id of an earlier partial or failed run to
+                resume instead of starting over
             
         Returns:
             Dictionary containing comprehensive analysis results and detailed email previews
@@ -122,8 +367,16 @@ class SentimentAlertCrew:
         logger.info(f"🔍 Starting DEEP analysis for: {company_name}")
         
         try:
-            # Execute deep workflow
-            results = self.deep_workflow.run(company_name)
+            # Execute deep workflow, sharing any in-flight run for the same company
+            deadline = Deadline.from_request(deadline_seconds)
+            results, coalesced = self._run_coalesced(
+                "deep", company_name, deadline,
+                lambda: self._execute("deep", company_name, deadline, priority, resume_run_id),
+                limiter,
+                resume_run_id
+            )
+            results = dict(results)
+            results["coalesced"] = coalesced
             
             # Add additional metadata
             results.update({
@@ -143,6 +396,28 @@ class SentimentAlertCrew:
             logger.info(f"✅ Deep analysis complete for {company_name} in {results.get('processing_time', 'unknown')}")
             return results
             
+        except ConcurrencyLimitExceeded as e:
+            logger.warning(f"⏳ Shedding deep analysis of {company_name}: {e}")
+            return {
+                "status": "shed",
+                "workflow": "deep",
+                "company": company_name,
+                "error": str(e),
+                "retry_after": e.retry_after,
+                "execution_timestamp": datetime.utcnow().isoformat()
+            }
+            
+        except AdmissionRejected as e:
+            logger.warning(f"⏳ Deep analysis for {company_name} rejected: {e}")
+            return {
+                "status": "rejected",
+                "workflow": "deep",
+                "company": company_name,
+                "priority": priority,
+                "error": str(e),
+                "execution_timestamp": datetime.utcnow().isoformat()
+            }
+            
         except Exception as e:
             logger.error(f"❌ Deep workflow failed for {company_name}: {e}")
             return {
@@ -153,6 +428,94 @@ class SentimentAlertCrew:
                 "execution_timestamp": datetime.utcnow().isoformat()
             }
     
+    def run_batch(
+        self,
+        company_names: List[str],
+        workflow: str = "fast",
+        priority: str = "batch"
+    ) -> Dict[str, Any]:
+        """
+        Analyze many companies as low-priority work.
+        
+        Runs are submitted at `priority` and admitted by the scheduler, so
+        they fill spare capacity without delaying interactive requests.
+        Stage outputs are persisted through the output sink as usual.
+        
+        Args:
+            company_names: Companies to analyze
+            workflow: "fast" or "deep"
+            priority: "scheduled" or "batch"
+            
+        Returns:
+            Summary with the number of runs per result status
+        """
+        run = self.run_fast if workflow == "fast" else self.run_deep
+        started = time.time()
+        workers = self._scheduler.cap(priority)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{priority}-runs") as pool:
+            # Batch runs are not bounded by the interactive request deadline
+            results = list(pool.map(lambda company: run(company, deadline_seconds=0, priority=priority), company_names))
+        
+        statuses: Dict[str, int] = {}
+        for results_item in results:
+            status = results_item.get("status", "unknown")
+            statuses[status] = statuses.get(status, 0) + 1
+        
+        summary = {
+            "workflow": workflow,
+            "priority": priority,
+            "companies": len(company_names),
+            "statuses": statuses,
+            "run_ids": [results_item.get("run_id") for results_item in results],
+            "processing_time": f"{round(time.time() - started, 2)} seconds"
+        }
+        logger.info(f"📦 {priority.capitalize()} {workflow} analysis of {len(company_names)} companies complete: {statuses}")
+        return summary
+    
+    def _run_coalesced(
+        self,
+        workflow: str,
+        company_name: str,
+        deadline: Deadline,
+        execute: Callable[[], Dict[str, Any]],
+        limiter: Optional[AdaptiveConcurrencyLimit] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a workflow through single-flight deduplication.
+        
+        Concurrent requests for the same workflow and company (and resumed
+        run, if any) share one execution; the leader's deadline governs the
+        shared run. A follower
+        whose own deadline runs out first, like a run that is not admitted
+        before its deadline, gets an empty partial result. Only the leader
+        takes a slot of `limiter`; followers and cached results never wait
+        on it or get shed by it.
+        
+        Returns:
+            Tuple of (workflow results, whether they were shared)
+        
+        Raises:
+            ConcurrencyLimitExceeded: If the leader's run is shed by `limiter`
+        """
+        if limiter is not None:
+            execute = partial(limiter.run, execute, client_deadline=deadline.client_bounded)
+        key = (workflow, company_name.lower(), resume_run_id)
+        try:
+            if not settings.SINGLE_FLIGHT_ENABLED:
+                return execute(), False
+            return self._flights.do(key, execute, timeout=deadline.remaining())
+        except DeadlineExceeded as e:
+            return build_partial_results(
+                workflow=workflow,
+                company_name=company_name,
+                stages=WORKFLOW_STAGES[workflow],
+                recorder=StageRecorder(deadline),
+                processing_time=round(deadline.elapsed(), 2),
+                reason=str(e)
+            ), True
+    
     def get_health_status(self) -> Dict[str, Any]:
         """
         Get system health and configuration status.
@@ -168,11 +531,22 @@ class SentimentAlertCrew:
                 "real_internet_search": bool(settings.TAVILY_API_KEY),
                 "openai_configured": bool(settings.OPENAI_API_KEY),
                 "workflows_available": ["fast", "deep"],
+                "workflows_ready": self.workflows_ready(),
                 "agent_count": {
                     "fast_workflow": 3,
                     "deep_workflow": 5
                 }
             },
+            "request_coalescing": {
+                "enabled": settings.SINGLE_FLIGHT_ENABLED,
+                "result_cache_ttl_seconds": settings.RESULT_CACHE_TTL_SECONDS,
+                "in_flight": self._flights.in_flight(),
+                **self._flights.stats
+            },
+            "execution_backend": {
+                "backend": settings.EXECUTION_BACKEND,
+                "worker_pool": self._pool.health_check() if self._pool is not None else None
+            },
             "configuration": {
                 "openai_model": settings.OPENAI_MODEL_NAME,
                 "tavily_configured": bool(settings.TAVILY_API_KEY),
@@ -188,6 +562,32 @@ class SentimentAlertCrew:
             "timestamp": datetime.utcnow().isoformat()
         }
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get admission scheduling, checkpoint, search index and connection pool metrics for this process.
+        
+        With the process execution backend, workflows (and their pools) run in
+        the worker processes, so these counters only cover the API process.
+        
+        Returns:
+            Dictionary with per-class queue times and slot usage, checkpointed
+            runs per status, and request, connection reuse and utilization
+            counters per pool
+        """
+        store = get_checkpoint_store()
+        index = get_mention_index()
+        insights = get_insights_store()
+        return {
+            "execution_backend": settings.EXECUTION_BACKEND,
+            "workflow_instances": {workflow: pool.stats() for workflow, pool in self._workflows.items()},
+            "connection_pools": get_client_registry().stats(),
+            "admission": self._scheduler.stats(),
+            "checkpoints": store.stats() if store else None,
+            "mention_index": index.stats() if index else None,
+            "insights": insights.stats() if insights else None,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
     def get_supported_companies(self) -> Dict[str, Any]:
         """
         Get list of example companies that can be analyzed.
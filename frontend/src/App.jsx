@@ -22,6 +22,7 @@ import { filterResults } from './utils/filterUtils'
 import { extractExecutiveInsights } from './utils/formatters'
 import { toastConfig } from './utils/toastConfig'
 import { useKeyboardShortcuts } from './hooks/useKeyboardShortcuts'
+import { useInsights } from './hooks/useInsights'
 import { useTheme } from './contexts/ThemeContext'
 
 function App() {
@@ -43,6 +44,8 @@ function App() {
 
   const abortControllerRef = useRef(null)
   const { toggleTheme } = useTheme()
+  // Server-side aggregates of the displayed run and its company's history
+  const insights = useInsights(results)
 
   // Check backend health on mount
   useEffect(() => {
@@ -451,6 +454,7 @@ function App() {
               <div className="space-y-8">
                 <ResultsSummary
                   results={results}
+                  insights={insights}
                   onNewAnalysis={handleReset}
                 />
 
@@ -465,7 +469,7 @@ function App() {
                   ) : null
                 })()}
 
-                <SentimentChart results={results} />
+                <SentimentChart results={results} insights={insights} />
 
                 {/* Results Filter */}
                 <ResultsFilter onFilterChange={handleFilterChange} />
@@ -1,6 +1,6 @@
 import { Clock, TrendingUp, AlertTriangle, Users, Download, RotateCcw, Database } from 'lucide-react'
 
-function ResultsSummary({ results, onNewAnalysis }) {
+function ResultsSummary({ results, insights, onNewAnalysis }) {
   if (!results) return null
 
   const handleDownloadReport = () => {
@@ -16,14 +16,16 @@ function ResultsSummary({ results, onNewAnalysis }) {
     URL.revokeObjectURL(url)
   }
 
-  // Parse mentions count from crew output
+  // Counts materialized by the backend, or parsed from the crew output
   const getMentionsCount = () => {
+    if (insights?.run) return insights.run.mentions
     const match = results.crew_output?.match(/(\d+)\s+(?:real\s+)?mentions?/i)
     return match ? match[1] : 'N/A'
   }
 
-  // Parse critical issues count
   const getCriticalCount = () => {
+    // null when the sentiment output could not be matched to the mentions
+    if (insights?.run && insights.run.critical !== null) return insights.run.critical
     const match = results.crew_output?.match(/(\d+)\s+critical/i)
     return match ? match[1] : '0'
   }
@@ -1,9 +1,22 @@
 import { LineChart, Line, BarChart, Bar, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts'
 import { TrendingUp, BarChart3, PieChart as PieIcon } from 'lucide-react'
 
-export default function SentimentChart({ results }) {
-  // Parse sentiment data from results
+const PRIORITY_COLORS = { Critical: '#ef4444', High: '#f59e0b', Medium: '#10b981', Low: '#6b7280' }
+
+export default function SentimentChart({ results, insights }) {
+  const run = insights?.run
+  const history = insights?.company?.history || []
+
+  // Sentiment per run (-1..1 mapped to 0-100), oldest first
   const parseSentimentTrend = () => {
+    const scored = history.filter((entry) => entry.average_sentiment !== null)
+    if (scored.length > 1) {
+      return scored.slice().reverse().map((entry) => ({
+        time: new Date(entry.completed_at).toLocaleDateString(undefined, { month: 'short', day: 'numeric' }),
+        score: Math.round((entry.average_sentiment + 1) * 50),
+        mentions: entry.mentions
+      }))
+    }
     // Extract sentiment scores over time (simulated from agent outputs)
     return [
       { time: '6h ago', score: 65, mentions: 12 },
@@ -14,6 +27,14 @@ export default function SentimentChart({ results }) {
   }
 
   const parsePriorityDistribution = () => {
+    if (run) {
+      return Object.entries(run.priority_levels).map(([level, value]) => ({
+        name: level,
+        value,
+        color: PRIORITY_COLORS[level]
+      }))
+    }
+
     // Parse priority counts from crew output
     const output = results.crew_output || ''
     const criticalMatch = output.match(/(\d+)\s+critical/i)
@@ -29,6 +50,10 @@ export default function SentimentChart({ results }) {
   }
 
   const parseIssueCategories = () => {
+    // Platform mix of the run's mentions
+    if (run) {
+      return Object.entries(run.platforms).map(([platform, count]) => ({ category: platform, count }))
+    }
     return [
       { category: 'Product', count: 15 },
       { category: 'Service', count: 12 },
@@ -92,6 +117,9 @@ export default function SentimentChart({ results }) {
           <h3 className="text-lg font-semibold mb-4 flex items-center gap-2">
             <PieIcon className="w-5 h-5 text-purple-400" />
             Priority Distribution
+            {run?.priority_source === 'local_engine' && (
+              <span className="text-xs font-normal text-gray-400">(estimated by local engine)</span>
+            )}
           </h3>
           <ResponsiveContainer width="100%" height={250}>
             <PieChart>
@@ -124,7 +152,7 @@ export default function SentimentChart({ results }) {
         <div className="glass rounded-xl p-6 md:col-span-2">
           <h3 className="text-lg font-semibold mb-4 flex items-center gap-2">
             <BarChart3 className="w-5 h-5 text-green-400" />
-            Issue Categories
+            {run ? 'Platform Mix' : 'Issue Categories'}
           </h3>
           <ResponsiveContainer width="100%" height={250}>
             <BarChart data={categoryData}>
@@ -0,0 +1,40 @@
+import { useEffect, useState } from 'react'
+import { getInsights } from '../services/api'
+
+/**
+ * Custom hook for the backend's materialized aggregates of an analysis
+ * @param {Object} results - Workflow results with company and run_id
+ * @param {number} runs - Runs of company history to load
+ * @returns {Object|null} { run, company } once loaded; run is null if this run was not recorded
+ */
+export const useInsights = (results, runs = 20) => {
+  const [insights, setInsights] = useState(null)
+  const company = results?.company
+  const runId = results?.run_id
+
+  useEffect(() => {
+    setInsights(null)
+    if (!company) return
+
+    let cancelled = false
+    const load = async () => {
+      const companyInsights = await getInsights({ company, runs })
+      if (!companyInsights) return
+      // Older runs (e.g. opened from the local history) are fetched on their own
+      let run = companyInsights.history.find((entry) => entry.run_id === runId) || null
+      if (!run && runId) {
+        run = await getInsights({ runId })
+      }
+      if (!cancelled) {
+        setInsights({ run, company: companyInsights })
+      }
+    }
+    load()
+
+    return () => {
+      cancelled = true
+    }
+  }, [company, runId, runs])
+
+  return insights
+}
@@ -133,6 +133,36 @@ export const getSupportedCompanies = async () => {
   }
 }
 
+/**
+ * Get dashboard aggregates materialized by the backend when runs complete
+ * @param {Object} params - { runId } for one run, or { company, runs } for a company's totals and run history
+ * @returns {Object|null} Insights, or null when none are recorded (e.g. partial runs)
+ */
+export const getInsights = async ({ runId, company, runs } = {}) => {
+  const params = new URLSearchParams()
+  if (runId) params.set('run_id', runId)
+  if (company) params.set('company', company)
+  if (runs !== undefined) params.set('runs', runs)
+
+  try {
+    const response = await fetch(`${API_BASE_URL}/insights?${params}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    })
+
+    if (!response.ok) {
+      return null
+    }
+
+    return await response.json()
+  } catch (error) {
+    console.error('Insights error:', error)
+    return null
+  }
+}
+
 /**
  * Get system information
  */
@@ -3,17 +3,22 @@ FastAPI server for the Customer Sentiment Alert System.
 Provides REST API endpoints for real-time sentiment analysis of any company.
 """
 import logging
+import threading
 import time
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 
 from crew_setup import SentimentAlertCrew
 from config import settings
+from runtime.concurrency import AdaptiveConcurrencyLimit
+from runtime.insights import get_insights_store
+from runtime.mention_index import FACETS, get_mention_index
 
 
 # Configure logging
@@ -46,6 +51,28 @@ except Exception as e:
     logger.error(f"❌ Failed to initialize crew: {e}")
     crew = None
 
+# Adaptive concurrency limit for the analysis endpoints; it also sizes the
+# crew's execution slots
+limiter = None
+if crew and settings.ADAPTIVE_CONCURRENCY_ENABLED:
+    limiter = AdaptiveConcurrencyLimit.from_settings(on_change=crew.set_concurrency_limit)
+    crew.set_concurrency_limit(limiter.limit)
+
+
+@app.on_event("startup")
+async def warm_workflows():
+    """Build workflows in the background so health checks answer immediately."""
+    if crew and settings.WARM_WORKFLOWS_ON_STARTUP:
+        threading.Thread(target=crew.warm_up, name="workflow-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def release_workers():
+    """Drain in-flight runs, checkpoint the rest and stop worker processes."""
+    if crew:
+        # Off the event loop, so runs finishing during the drain can still respond
+        await run_in_threadpool(crew.shutdown)
+
 
 # Request models
 class AnalysisRequest(BaseModel):
@@ -57,6 +84,63 @@ class AnalysisRequest(BaseModel):
         description="Name of the company to analyze (e.g., 'Apple', 'Tesla')",
         example="Apple"
     )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        le=600,
+        description="Optional time budget for the analysis in seconds. Stages that don't fit are skipped and partial results are returned.",
+        example=30
+    )
+    priority: str = Field(
+        "interactive",
+        pattern="^(interactive|scheduled|batch)$",
+        description="Admission class. Interactive requests are admitted ahead of scheduled and batch work.",
+        example="interactive"
+    )
+    resume_run_id: Optional[str] = Field(
+        None,
+        max_length=64,
+        description="run_id of an earlier partial or failed analysis to resume. Its completed stages are reused; without it a new run starts."
+    )
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request model for low-priority analysis of many companies."""
+    company_names: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Companies to analyze",
+        example=["Apple", "Tesla", "Spotify"]
+    )
+    workflow: str = Field("fast", pattern="^(fast|deep)$", description="Workflow to run for each company")
+    priority: str = Field("batch", pattern="^(scheduled|batch)$", description="Admission class for the runs")
+
+
+async def run_analysis(run, request: AnalysisRequest) -> Dict[str, Any]:
+    """
+    Run a workflow off the event loop within the adaptive concurrency limit.
+    
+    Runs that would start a new execution over the limit are shed
+    immediately with 503 and Retry-After rather than queuing until their
+    deadline passes. Requests served from a shared in-flight run or the
+    result cache are never shed.
+    """
+    results = await run_in_threadpool(
+        run,
+        request.company_name,
+        deadline_seconds=request.deadline_seconds,
+        priority=request.priority,
+        limiter=limiter,
+        resume_run_id=request.resume_run_id
+    )
+    if results.get("status") == "shed":
+        raise HTTPException(
+            status_code=503,
+            detail="Server is at its concurrency limit, please retry later",
+            headers={"Retry-After": str(results.get("retry_after", 1))}
+        )
+    return results
 
 
 # API Endpoints
@@ -77,7 +161,11 @@ async def root():
         "endpoints": {
             "fast_analysis": "POST /analyze/fast",
             "deep_analysis": "POST /analyze/deep", 
+            "batch_analysis": "POST /analyze/batch",
             "health_check": "GET /health",
+            "metrics": "GET /metrics",
+            "search": "GET /search",
+            "insights": "GET /insights",
             "supported_companies": "GET /supported-companies"
         },
         "timestamp": datetime.utcnow().isoformat()
@@ -90,7 +178,106 @@ async def health_check():
     if not crew:
         raise HTTPException(status_code=503, detail="Crew not initialized")
     
-    return crew.get_health_status()
+    return await run_in_threadpool(crew.get_health_status)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Admission, adaptive concurrency and connection pool metrics."""
+    if not crew:
+        raise HTTPException(status_code=503, detail="Crew not initialized")
+    
+    return {
+        **crew.get_metrics(),
+        "adaptive_concurrency": limiter.snapshot() if limiter else None
+    }
+
+
+def _epoch(when: Optional[datetime]) -> Optional[float]:
+    """Epoch seconds of a query datetime; times without an offset are UTC."""
+    if when is None:
+        return None
+    return (when if when.tzinfo else when.replace(tzinfo=timezone.utc)).timestamp()
+
+
+@app.get("/search")
+async def search_mentions(
+    q: Optional[str] = Query(None, max_length=500, description="Full-text query over mention titles and content", example="supercharger"),
+    company: Optional[str] = Query(None, description="Company (case-insensitive)", example="Tesla"),
+    platform: Optional[str] = Query(None, description="Platform, e.g. Reddit or Twitter/X", example="Reddit"),
+    mention_type: Optional[str] = Query(None, description="complaint, negative, positive or neutral"),
+    sentiment_min: Optional[float] = Query(None, ge=-1, le=1),
+    sentiment_max: Optional[float] = Query(None, ge=-1, le=1, example=-0.5),
+    since_days: Optional[float] = Query(None, gt=0, description="Only mentions published in the last N days", example=30),
+    since: Optional[datetime] = Query(None, description="Published at or after (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Published at or before (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern="^(relevance|recent)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    facets: str = Query(",".join(FACETS), description="Comma-separated facets to count")
+):
+    """
+    Search every mention indexed from past runs, across companies.
+    
+    Combines a full-text query with filters and returns a page of results
+    with facet counts (platform, company, sentiment band, mention type).
+    """
+    index = get_mention_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Mention index is disabled")
+    
+    since_ts = _epoch(since)
+    if since_days is not None:
+        since_ts = max(since_ts or 0.0, time.time() - since_days * 86400)
+    return await run_in_threadpool(
+        index.search,
+        query=q,
+        company=company,
+        platform=platform,
+        mention_type=mention_type,
+        sentiment_min=sentiment_min,
+        sentiment_max=sentiment_max,
+        since=since_ts,
+        until=_epoch(until),
+        sort=sort,
+        limit=limit,
+        offset=offset,
+        facets=[facet.strip() for facet in facets.split(",") if facet.strip()]
+    )
+
+
+@app.get("/insights")
+async def get_insights(
+    company: Optional[str] = Query(None, description="Company rollup and run history (case-insensitive)", example="Tesla"),
+    run_id: Optional[str] = Query(None, description="Aggregates of a single run"),
+    runs: int = Query(50, ge=0, le=1000, description="Runs of history to include, newest first"),
+    since_days: Optional[float] = Query(None, gt=0, description="Only runs completed in the last N days"),
+    limit: int = Query(100, ge=1, le=1000, description="Companies to list when neither company nor run_id is given")
+):
+    """
+    Dashboard aggregates materialized when each run completes.
+    
+    Sentiment distribution, critical count, platform mix and priority
+    buckets for one run (`run_id`), for a company with its run history
+    (`company`), or for the most recently analyzed companies.
+    """
+    store = get_insights_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Insights are disabled")
+    
+    if run_id:
+        insights = await run_in_threadpool(store.run_json, run_id)
+        if insights is None:
+            raise HTTPException(status_code=404, detail=f"No insights for run {run_id}")
+    elif company:
+        since = time.time() - since_days * 86400 if since_days is not None else None
+        insights = await run_in_threadpool(store.company_json, company, runs, since)
+        if insights is None:
+            raise HTTPException(status_code=404, detail=f"No completed runs for {company}")
+    else:
+        insights = await run_in_threadpool(store.companies_json, limit)
+    # Runs are stored serialized; the history is served without re-encoding
+    return Response(content=insights, media_type="application/json")
 
 
 @app.get("/supported-companies")
@@ -128,15 +315,20 @@ async def analyze_fast(request: AnalysisRequest):
     logger.info(f"🚀 Fast analysis requested for: {request.company_name}")
     
     try:
-        # Execute fast workflow
-        results = crew.run_fast(request.company_name)
+        # Execute fast workflow off the event loop so concurrent requests can coalesce
+        results = await run_analysis(crew.run_fast, request)
         
+        if results.get("status") == "rejected":
+            raise HTTPException(status_code=503, detail=results.get("error"), headers={"Retry-After": "5"})
         if results.get("status") == "error":
             raise HTTPException(status_code=500, detail=results.get("error", "Analysis failed"))
         
         # Structure the response
         response = {
-            "status": "success",
+            "status": "partial" if results.get("status") == "partial" else "success",
+            "partial": results.get("partial", False),
+            "run_id": results.get("run_id"),
+            "resumed_stages": results.get("resumed_stages", []),
             "workflow": "fast", 
             "company": request.company_name,
             "agents_used": 3,
@@ -156,6 +348,12 @@ async def analyze_fast(request: AnalysisRequest):
                 "content": "See detailed crew output for full email previews"
             },
             "performance": results.get("performance", {}),
+            "stages_completed": results.get("stages_completed"),
+            "stages_skipped": results.get("stages_skipped", []),
+            "deadline": results.get("deadline"),
+            "coalesced": results.get("coalesced", False),
+            "priority": results.get("priority", request.priority),
+            "queue_time_seconds": results.get("queue_time_seconds"),
             "crew_output": results.get("crew_output"),
             "note": "This analysis uses REAL internet data from Tavily API, not mock data"
         }
@@ -199,15 +397,20 @@ async def analyze_deep(request: AnalysisRequest):
     logger.info(f"🔍 Deep analysis requested for: {request.company_name}")
     
     try:
-        # Execute deep workflow
-        results = crew.run_deep(request.company_name)
+        # Execute deep workflow off the event loop so concurrent requests can coalesce
+        results = await run_analysis(crew.run_deep, request)
         
+        if results.get("status") == "rejected":
+            raise HTTPException(status_code=503, detail=results.get("error"), headers={"Retry-After": "5"})
         if results.get("status") == "error":
             raise HTTPException(status_code=500, detail=results.get("error", "Analysis failed"))
         
         # Structure the comprehensive response
         response = {
-            "status": "success",
+            "status": "partial" if results.get("status") == "partial" else "success",
+            "partial": results.get("partial", False),
+            "run_id": results.get("run_id"),
+            "resumed_stages": results.get("resumed_stages", []),
             "workflow": "deep",
             "company": request.company_name,
             "agents_used": 5,
@@ -236,6 +439,12 @@ async def analyze_deep(request: AnalysisRequest):
             },
             "performance": results.get("performance", {}),
             "capabilities": results.get("analysis_features", []),
+            "stages_completed": results.get("stages_completed"),
+            "stages_skipped": results.get("stages_skipped", []),
+            "deadline": results.get("deadline"),
+            "coalesced": results.get("coalesced", False),
+            "priority": results.get("priority", request.priority),
+            "queue_time_seconds": results.get("queue_time_seconds"),
             "crew_output": results.get("crew_output"),
             "note": "This comprehensive analysis uses REAL internet data from Tavily API"
         }
@@ -250,6 +459,35 @@ async def analyze_deep(request: AnalysisRequest):
         raise HTTPException(status_code=500, detail=f"Comprehensive analysis failed: {str(e)}")
 
 
+@app.post("/analyze/batch", status_code=202)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Queue analyses of many companies as scheduled or batch work.
+    
+    Runs are admitted only as capacity allows, so they never delay interactive
+    `/analyze/*` requests. Stage outputs are persisted through the output sink;
+    progress is visible in the `admission` section of `GET /metrics`.
+    """
+    if not crew:
+        raise HTTPException(status_code=503, detail="Sentiment analysis system not available")
+    
+    threading.Thread(
+        target=crew.run_batch,
+        args=(request.company_names, request.workflow, request.priority),
+        name=f"{request.priority}-analysis",
+        daemon=True
+    ).start()
+    
+    logger.info(f"📦 Queued {request.priority} {request.workflow} analysis of {len(request.company_names)} companies")
+    return {
+        "status": "accepted",
+        "workflow": request.workflow,
+        "priority": request.priority,
+        "companies": len(request.company_names),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unhandled errors."""
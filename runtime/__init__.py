@@ -0,0 +1,9 @@
+"""
+Runtime infrastructure for the Customer Sentiment Alert System.
+Request-scoped execution controls shared by the API, crew and workflows.
+"""
+
+from .deadline import Deadline, DeadlineExceeded
+from .singleflight import SingleFlight
+
+__all__ = ["Deadline", "DeadlineExceeded", "SingleFlight"]
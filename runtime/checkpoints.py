@@ -0,0 +1,255 @@
+"""
+Durable checkpoints of workflow stage outputs.
+Every completed stage is committed to a local SQLite database under its run
+id. When a run is cut short by a crash, redeploy, deadline or upstream error,
+a retry that names its run id claims it and only runs the stages that are
+still missing.
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Runs in these states may be resumed
+RESUMABLE_STATUSES = ("running", "interrupted", "abandoned", "partial", "error")
+
+# States in which the run's crew may still be executing: "abandoned" runs
+# returned at their deadline while the crew was still running. "interrupted"
+# runs are not among them: their owner marked them during a graceful shutdown
+# and is exiting, so they can be claimed right away (even after a redeploy to
+# another host, or when the new process reuses the old pid).
+LIVE_STATUSES = ("running", "abandoned")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    workflow TEXT NOT NULL,
+    company TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_lookup ON runs (workflow, company, updated_at);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    output TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+"""
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: str, updated_at: float, lease: float) -> bool:
+    """
+    Whether the process that owns a run may still be working on it.
+    
+    Owners on this host are checked by pid. Owners on other hosts can't be
+    checked, so they hold the run for `lease` seconds after its last update
+    (every checkpointed stage renews it).
+    """
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return time.time() - updated_at < lease
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError):
+        return True
+    return True
+
+
+class CheckpointStore:
+    """
+    SQLite store of runs and their completed stage outputs.
+    
+    Stage outputs are committed synchronously so they survive a crash right
+    after the stage finishes. The database runs in WAL mode, so API and
+    worker processes on the same host can share it.
+    """
+    
+    def __init__(self, path: str, resume_window: float = 900.0, retention: float = 86400.0, lease: float = 300.0):
+        self.path = path
+        self.resume_window = resume_window
+        self.retention = retention
+        self.lease = lease
+        self.owner = _owner()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.purge()
+    
+    @contextmanager
+    def _transaction(self, mode: str = "") -> Iterator[sqlite3.Connection]:
+        """Run statements in one transaction under the store lock."""
+        with self._lock:
+            self._conn.execute(f"BEGIN {mode}")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def claim(self, run_id: str, workflow: str, company_name: str) -> Optional[str]:
+        """
+        Take over an unfinished run named by a retry.
+        
+        A run is only taken over if it belongs to the same workflow and
+        company, was updated within the resume window, and nothing may still
+        be executing it: its owner is gone, or its abandoned crew has exited.
+        
+        Returns:
+            The run id, now owned by this process, or None if the run can't
+            be resumed
+        """
+        with self._transaction("IMMEDIATE") as conn:
+            row = conn.execute(
+                "SELECT status, owner, updated_at FROM runs WHERE run_id = ? AND workflow = ? AND company = ?",
+                (run_id, workflow, company_name.lower())
+            ).fetchone()
+            if row is None:
+                logger.info(f"No {workflow} run {run_id} for {company_name} to resume")
+                return None
+            status, owner, updated_at = row
+            if status not in RESUMABLE_STATUSES or updated_at < time.time() - self.resume_window:
+                logger.info(f"Run {run_id} can't be resumed (status {status})")
+                return None
+            if status in LIVE_STATUSES and _owner_alive(owner, updated_at, self.lease):
+                logger.warning(f"Run {run_id} may still be executing on {owner}; not resuming it")
+                return None
+            conn.execute(
+                "UPDATE runs SET status = 'running', owner = ?, updated_at = ? WHERE run_id = ?",
+                (self.owner, time.time(), run_id)
+            )
+        return run_id
+    
+    def start_run(self, run_id: str, workflow: str, company_name: str) -> None:
+        """Register a run owned by this process."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, workflow, company, status, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = 'running', owner = excluded.owner, updated_at = excluded.updated_at",
+                (run_id, workflow, company_name.lower(), self.owner, now, now)
+            )
+    
+    def save_stage(self, run_id: str, stage: str, output: str) -> None:
+        """Commit a completed stage output."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO stages (run_id, stage, output, completed_at) VALUES (?, ?, ?, ?)",
+                (run_id, stage, output, now)
+            )
+            conn.execute("UPDATE runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+    
+    def load_stages(self, run_id: str) -> Dict[str, str]:
+        """Completed stage outputs of a run, in completion order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, output FROM stages WHERE run_id = ? ORDER BY completed_at",
+                (run_id,)
+            ).fetchall()
+        return dict(rows)
+    
+    def finish_run(self, run_id: str, status: str) -> None:
+        """Mark a run "completed" (nothing left to resume), "abandoned", "partial" or "error"."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                (status, time.time(), run_id)
+            )
+    
+    def settle_abandoned(self, run_id: str) -> None:
+        """Mark an abandoned run "partial" once its crew has exited, so it can be resumed."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = 'partial', updated_at = ? WHERE run_id = ? AND status = 'abandoned'",
+                (time.time(), run_id)
+            )
+    
+    def interrupt_owned(self) -> int:
+        """Mark this process's running runs as interrupted so others can resume them."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE runs SET status = 'interrupted', updated_at = ? WHERE owner = ? AND status = 'running'",
+                (time.time(), self.owner)
+            )
+        return cursor.rowcount
+    
+    def purge(self) -> None:
+        """Delete runs (and their stage outputs) older than the retention period."""
+        cutoff = time.time() - self.retention
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM stages WHERE run_id IN (SELECT run_id FROM runs WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM runs WHERE updated_at < ?", (cutoff,))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Number of runs per status and of checkpointed stages."""
+        with self._lock:
+            runs = dict(self._conn.execute("SELECT status, COUNT(*) FROM runs GROUP BY status").fetchall())
+            stages = self._conn.execute("SELECT COUNT(*) FROM stages").fetchone()[0]
+        return {"path": self.path, "runs": runs, "stages": stages}
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Process-wide store configured from the CHECKPOINT_* settings, or None when disabled."""
+    global _store
+    if not settings.CHECKPOINT_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore(
+                    settings.CHECKPOINT_DB_PATH,
+                    resume_window=settings.CHECKPOINT_RESUME_WINDOW_SECONDS,
+                    retention=settings.CHECKPOINT_RETENTION_SECONDS,
+                    lease=settings.CHECKPOINT_LEASE_SECONDS
+                )
+    return _store
+
+
+def close_checkpoint_store() -> None:
+    """Mark this process's unfinished runs as interrupted and close the store."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            interrupted = _store.interrupt_owned()
+            if interrupted:
+                logger.info(f"Checkpointed {interrupted} unfinished run(s) for resume")
+            _store.close()
+            _store = None
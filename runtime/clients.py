@@ -0,0 +1,265 @@
+"""
+Process-wide registry of pooled HTTP clients for OpenAI and Tavily.
+Every workflow, agent and tool in a process shares the same keep-alive
+connection pools instead of creating its own clients, so TLS handshakes and
+pools are not duplicated. Pool statistics show how many requests reused an
+existing connection.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Thread-safe request and connection counters for one pool."""
+    
+    def __init__(self, name: str, max_connections: int):
+        self.name = name
+        self.max_connections = max_connections
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def request_started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def request_finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+    
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+    
+    def tls_handshake(self) -> None:
+        with self._lock:
+            self.tls_handshakes += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "connections_reused": reused,
+                "reuse_ratio": round(reused / self.requests, 3) if self.requests else None,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_connections": self.max_connections,
+                "utilization": round(self.peak_in_flight / self.max_connections, 3) if self.max_connections else None
+            }
+
+
+def _instrumented_transport(transport: Any, stats: PoolStats) -> Any:
+    """Wrap an httpx transport so requests and new connections are counted."""
+    import httpx
+    
+    class InstrumentedTransport(httpx.BaseTransport):
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            trace = request.extensions.get("trace")
+            
+            def _trace(event_name: str, info: Dict[str, Any]) -> None:
+                # httpcore reports connection setup through the trace extension
+                if event_name == "connection.connect_tcp.complete":
+                    stats.connection_opened()
+                elif event_name == "connection.start_tls.complete":
+                    stats.tls_handshake()
+                if trace is not None:
+                    trace(event_name, info)
+            
+            request.extensions["trace"] = _trace
+            stats.request_started()
+            try:
+                return transport.handle_request(request)
+            finally:
+                stats.request_finished()
+        
+        def close(self) -> None:
+            transport.close()
+    
+    return InstrumentedTransport()
+
+
+class _SessionStats:
+    """Reads request and connection counters from a requests.Session's urllib3 pools."""
+    
+    def __init__(self, name: str, adapter: Any, max_connections: int):
+        self.name = name
+        self.adapter = adapter
+        self.max_connections = max_connections
+    
+    def to_dict(self) -> Dict[str, Any]:
+        pools = [self.adapter.poolmanager.pools[key] for key in list(self.adapter.poolmanager.pools.keys())]
+        requests = sum(pool.num_requests for pool in pools)
+        opened = sum(pool.num_connections for pool in pools)
+        reused = max(0, requests - opened)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else None,
+            "idle_connections": sum(pool.pool.qsize() for pool in pools if pool.pool is not None),
+            "hosts": len(pools),
+            "max_connections": self.max_connections
+        }
+
+
+class ClientRegistry:
+    """
+    Lazily created, shared clients for the external APIs.
+    
+    - OpenAI: one httpx.Client with a keep-alive pool, used by every
+      ChatOpenAI model and, through LiteLLM's client session, by CrewAI's LLM
+    - Tavily: one requests.Session with a pooled HTTPAdapter, used by a
+      single TavilyClient wrapped in the resilient search client
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._openai_http: Any = None
+        self._openai_stats: Optional[PoolStats] = None
+        self._chat_models: Dict[Tuple[Any, ...], Any] = {}
+        self._tavily_session: Any = None
+        self._tavily_stats: Optional[_SessionStats] = None
+        self._search_client: Any = None
+        self.created_at = time.time()
+    
+    def openai_http_client(self) -> Any:
+        """Shared keep-alive httpx client for OpenAI calls."""
+        with self._lock:
+            if self._openai_http is None:
+                import httpx
+                
+                limits = httpx.Limits(
+                    max_connections=settings.OPENAI_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_SECONDS
+                )
+                self._openai_stats = PoolStats("openai", settings.OPENAI_POOL_MAX_CONNECTIONS)
+                self._openai_http = httpx.Client(
+                    transport=_instrumented_transport(httpx.HTTPTransport(limits=limits), self._openai_stats),
+                    timeout=httpx.Timeout(settings.OPENAI_HTTP_TIMEOUT_SECONDS, connect=10.0)
+                )
+                self._bind_litellm(self._openai_http)
+            return self._openai_http
+    
+    def chat_model(self, model: Optional[str] = None, temperature: Optional[float] = None, **options: Any) -> Any:
+        """
+        Shared ChatOpenAI instance for a model configuration.
+        
+        Args:
+            model: Model name. Defaults to settings.OPENAI_MODEL_NAME.
+            temperature: Sampling temperature
+            **options: Further ChatOpenAI options, e.g. max_tokens or timeout
+        """
+        model = model or settings.OPENAI_MODEL_NAME
+        key = (model, temperature, tuple(sorted(options.items())))
+        with self._lock:
+            if key not in self._chat_models:
+                from langchain_openai import ChatOpenAI
+                
+                kwargs = {"temperature": temperature, **options}
+                self._chat_models[key] = ChatOpenAI(
+                    model=model,
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=self.openai_http_client(),
+                    **{k: v for k, v in kwargs.items() if v is not None}
+                )
+            return self._chat_models[key]
+    
+    def tavily_session(self) -> Any:
+        """Shared requests.Session with a pooled keep-alive adapter for Tavily."""
+        with self._lock:
+            if self._tavily_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                adapter = HTTPAdapter(
+                    pool_connections=settings.TAVILY_POOL_CONNECTIONS,
+                    pool_maxsize=settings.TAVILY_POOL_MAXSIZE
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._tavily_stats = _SessionStats("tavily", adapter, settings.TAVILY_POOL_MAXSIZE)
+                self._tavily_session = session
+            return self._tavily_session
+    
+    def search_client(self) -> Any:
+        """Shared resilient Tavily client, or None when no API key is configured."""
+        with self._lock:
+            if self._search_client is None and settings.TAVILY_API_KEY:
+                from tavily import TavilyClient
+                from tools.resilient_search import ResilientSearchClient
+                
+                try:
+                    client = TavilyClient(api_key=settings.TAVILY_API_KEY, session=self.tavily_session())
+                except TypeError:
+                    # tavily-python releases without the session argument
+                    client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+                    logger.warning("Installed tavily-python does not accept a session; Tavily calls are not pooled")
+                self._search_client = ResilientSearchClient(client)
+            return self._search_client
+    
+    def stats(self) -> Dict[str, Any]:
+        """Request, connection reuse and utilization counters per pool."""
+        return {
+            "openai": self._openai_stats.to_dict() if self._openai_stats else None,
+            "tavily": self._tavily_stats.to_dict() if self._tavily_stats else None,
+            "chat_models": len(self._chat_models)
+        }
+    
+    def close(self) -> None:
+        """Close the pooled connections."""
+        with self._lock:
+            if self._openai_http is not None:
+                self._openai_http.close()
+                self._openai_http = None
+                self._chat_models.clear()
+            if self._tavily_session is not None:
+                self._tavily_session.close()
+                self._tavily_session = None
+                self._search_client = None
+    
+    @staticmethod
+    def _bind_litellm(http_client: Any) -> None:
+        """Let CrewAI's LiteLLM-based LLM reuse the pool for OpenAI calls."""
+        try:
+            import litellm
+        except ImportError:
+            return
+        if getattr(litellm, "client_session", None) is None:
+            litellm.client_session = http_client
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Process-wide client registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def close_client_registry() -> None:
+    """Close the process-wide clients, if any were created."""
+    if _registry is not None:
+        _registry.close()
@@ -0,0 +1,207 @@
+"""
+Adaptive concurrency limiting with load shedding.
+The number of analyses allowed in flight follows an AIMD rule: it grows by
+about one per round trip while stages meet their latency SLOs, and shrinks
+multiplicatively on upstream errors (429s, timeouts) or slow stages.
+Requests over the limit are shed immediately instead of queuing until they
+time out.
+"""
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+
+# Outcomes reported when a request finishes
+OK = "ok"            # Stages met their SLOs: additive increase
+SLOW = "slow"        # A stage exceeded its latency SLO or the deadline: mild decrease
+OVERLOAD = "overload"  # Upstream rate limit or timeout: multiplicative decrease
+IGNORE = "ignore"    # Not a capacity signal (e.g. invalid input)
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a run is shed because the concurrency limit is reached."""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_OVERLOAD_ERRORS = re.compile(
+    r"\b429\b|rate.?limit|timed? ?out|timeout|overloaded|\b50[23]\b|connection (?:error|reset|refused)",
+    re.IGNORECASE
+)
+
+
+def classify_outcome(results: Dict[str, Any], client_deadline: bool = False) -> str:
+    """
+    Turn a workflow result into a congestion signal for the limiter.
+    
+    Args:
+        results: Result dictionary of run_fast / run_deep
+        client_deadline: The run's deadline was chosen by the client tighter
+            than the server's; a run cut short by it is not a slow run
+    
+    Returns:
+        One of OK, SLOW, OVERLOAD or IGNORE
+    """
+    status = results.get("status")
+    if status == "rejected":
+        return IGNORE
+    if status == "error":
+        return OVERLOAD if _OVERLOAD_ERRORS.search(str(results.get("error", ""))) else IGNORE
+    
+    routing = results.get("model_routing") or []
+    if any(record.get("status") == "error" for record in routing):
+        return OVERLOAD
+    if status == "partial" and results.get("partial_reason") and not client_deadline:
+        return SLOW
+    if any(
+        record.get("slo_p95_seconds") is not None and record.get("latency_seconds", 0) > record["slo_p95_seconds"]
+        for record in routing
+    ):
+        return SLOW
+    return OK
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit.
+    
+    try_acquire() admits a request while fewer than `limit` are in flight;
+    release() feeds back the request's outcome; run() does both around a
+    call. Decreases are applied at most
+    once per cooldown so one burst of failures does not collapse the limit.
+    `on_change` is called with the new integer limit whenever it changes.
+    """
+    
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.7,
+        slow_backoff_ratio: float = 0.9,
+        cooldown_seconds: float = 5.0,
+        on_change: Optional[Callable[[int], None]] = None
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.backoff_ratio = backoff_ratio
+        self.slow_backoff_ratio = slow_backoff_ratio
+        self.cooldown_seconds = cooldown_seconds
+        self.on_change = on_change
+        
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {"admitted": 0, "shed": 0, "ok": 0, "slow": 0, "overload": 0, "increases": 0, "decreases": 0}
+    
+    @classmethod
+    def from_settings(cls, on_change: Optional[Callable[[int], None]] = None) -> "AdaptiveConcurrencyLimit":
+        return cls(
+            initial=settings.CONCURRENCY_INITIAL_LIMIT,
+            min_limit=settings.CONCURRENCY_MIN_LIMIT,
+            max_limit=settings.CONCURRENCY_MAX_LIMIT,
+            backoff_ratio=settings.CONCURRENCY_BACKOFF_RATIO,
+            slow_backoff_ratio=settings.CONCURRENCY_SLOW_BACKOFF_RATIO,
+            cooldown_seconds=settings.CONCURRENCY_DECREASE_COOLDOWN_SECONDS,
+            on_change=on_change
+        )
+    
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+    
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+    def try_acquire(self) -> bool:
+        """Admit a request if it fits under the current limit."""
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                self.stats["shed"] += 1
+                return False
+            self._in_flight += 1
+            self.stats["admitted"] += 1
+            return True
+    
+    def release(self, outcome: str, latency_seconds: float) -> None:
+        """Finish an admitted request and adjust the limit from its outcome."""
+        with self._lock:
+            self._in_flight -= 1
+            before = int(self._limit)
+            
+            if outcome != IGNORE:
+                self.stats[outcome] += 1
+                self._latency_ewma = (
+                    latency_seconds if self._latency_ewma is None
+                    else 0.8 * self._latency_ewma + 0.2 * latency_seconds
+                )
+            
+            now = time.monotonic()
+            if outcome == OK:
+                # Additive increase: about +1 per limit's worth of successful requests
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            elif outcome in (SLOW, OVERLOAD) and now - self._last_decrease >= self.cooldown_seconds:
+                ratio = self.backoff_ratio if outcome == OVERLOAD else self.slow_backoff_ratio
+                self._limit = max(self.min_limit, self._limit * ratio)
+                self._last_decrease = now
+            
+            after = int(self._limit)
+            if after > before:
+                self.stats["increases"] += 1
+            elif after < before:
+                self.stats["decreases"] += 1
+        
+        if after != before and self.on_change is not None:
+            self.on_change(after)
+    
+    def run(self, fn: Callable[[], Dict[str, Any]], client_deadline: bool = False) -> Dict[str, Any]:
+        """
+        Run `fn` as one admitted request and feed its outcome back.
+        
+        Args:
+            fn: Function running the request and returning its results
+            client_deadline: Passed to classify_outcome
+        
+        Raises:
+            ConcurrencyLimitExceeded: If the request does not fit under the limit
+        """
+        if not self.try_acquire():
+            raise ConcurrencyLimitExceeded(
+                f"Server is at its concurrency limit ({self.in_flight} in flight, limit {self.limit})",
+                retry_after=self.retry_after()
+            )
+        started = time.monotonic()
+        outcome = IGNORE
+        try:
+            results = fn()
+            outcome = classify_outcome(results, client_deadline=client_deadline)
+            return results
+        except Exception as e:
+            outcome = classify_outcome({"status": "error", "error": str(e)})
+            raise
+        finally:
+            self.release(outcome, time.monotonic() - started)
+    
+    def retry_after(self) -> int:
+        """Suggested Retry-After seconds for a shed request: roughly when a slot should free up."""
+        with self._lock:
+            latency = self._latency_ewma or 5.0
+            return max(1, min(60, round(latency / max(1, int(self._limit)))))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "latency_ewma_seconds": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                **self.stats
+            }
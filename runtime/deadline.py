@@ -0,0 +1,72 @@
+"""
+Request deadlines for bounding end-to-end analysis latency.
+A Deadline is created once per request and handed down through the crew
+into the workflow so every stage can see how much budget is left.
+"""
+import time
+from typing import Optional
+
+from config import settings
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget runs out before work completes."""
+
+
+class Deadline:
+    """
+    Time budget for a single analysis request.
+    
+    A budget of None (or <= 0) means the request is unbounded; all checks
+    then pass and remaining() returns None. `client_bounded` marks a budget
+    the client chose tighter than the server's own deadline.
+    """
+    
+    def __init__(self, budget_seconds: Optional[float] = None, client_bounded: bool = False):
+        self.budget_seconds = budget_seconds if budget_seconds and budget_seconds > 0 else None
+        self.client_bounded = client_bounded and self.budget_seconds is not None
+        self.started_at = time.monotonic()
+    
+    @classmethod
+    def from_request(cls, budget_seconds: Optional[float] = None) -> "Deadline":
+        """Create a deadline from a client-supplied budget, defaulting to config."""
+        server_budget = settings.REQUEST_DEADLINE_SECONDS
+        if budget_seconds is None:
+            return cls(server_budget)
+        tighter = budget_seconds > 0 and (not server_budget or server_budget <= 0 or budget_seconds < server_budget)
+        return cls(budget_seconds, client_bounded=tighter)
+    
+    @property
+    def bounded(self) -> bool:
+        return self.budget_seconds is not None
+    
+    def elapsed(self) -> float:
+        """Seconds since the deadline was created."""
+        return time.monotonic() - self.started_at
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget, or None if unbounded."""
+        if not self.bounded:
+            return None
+        return max(0.0, self.budget_seconds - self.elapsed())
+    
+    def expired(self) -> bool:
+        return self.bounded and self.remaining() <= 0
+    
+    def can_fit(self, seconds: float) -> bool:
+        """Return True if work estimated at `seconds` fits in the remaining budget."""
+        return not self.bounded or self.remaining() >= seconds
+    
+    def check(self, context: str = "") -> None:
+        """Raise DeadlineExceeded if the budget has run out."""
+        if self.expired():
+            where = f" {context}" if context else ""
+            raise DeadlineExceeded(f"Request deadline of {self.budget_seconds}s exceeded{where}")
+    
+    def to_dict(self) -> dict:
+        """Summary for inclusion in workflow results."""
+        return {
+            "budget_seconds": self.budget_seconds,
+            "elapsed_seconds": round(self.elapsed(), 2),
+            "expired": self.expired()
+        }
@@ -0,0 +1,243 @@
+"""
+Materialized dashboard aggregates per run and per company.
+When a run completes, its aggregates (analytics.insights) are serialized
+once in their API form, and the company rollup is updated in the same
+transaction. Dashboards and history views read these rows instead of
+re-deriving counts from the raw crew output of every run.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from config import settings
+
+
+# Counters that are summed when runs are rolled up per company (stored as one JSON column)
+COUNT_FIELDS = ("sentiment_bands", "platforms", "priority_levels")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_insights (
+    run_id TEXT PRIMARY KEY,
+    company_key TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_insights_company ON run_insights (company_key, completed_at);
+CREATE TABLE IF NOT EXISTS company_insights (
+    company_key TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    first_run_at REAL NOT NULL,
+    last_run_at REAL NOT NULL,
+    mentions INTEGER NOT NULL,
+    scored INTEGER NOT NULL,
+    sentiment_sum REAL NOT NULL,
+    critical INTEGER NOT NULL,
+    counts TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS company_insights_recent ON company_insights (last_run_at);
+"""
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _summary(aggregates: Any, counts: Dict[str, Any]) -> Dict[str, Any]:
+    """API form of run or company aggregates: counts plus the average sentiment."""
+    return {
+        "mentions": aggregates["mentions"],
+        "average_sentiment": round(aggregates["sentiment_sum"] / aggregates["scored"], 3) if aggregates["scored"] else None,
+        "critical": aggregates["critical"],
+        **counts,
+    }
+
+
+def _merge(totals: Dict[str, int], counts: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(totals)
+    for key, count in counts.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+class InsightsStore:
+    """
+    SQLite store of run aggregates and their per-company rollups.
+    
+    Each run is recorded at most once, so rollups stay exact when a run is
+    reported twice. Reads return JSON text assembled from the stored
+    serialized runs, so long histories are not decoded and re-encoded.
+    Writes take SQLite's write lock up front (BEGIN IMMEDIATE) because the
+    rollup is read-modify-write and API and worker processes may share the
+    database (WAL mode). Runs with an unknown critical count (None) add
+    nothing to the company's critical total.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+    
+    def record_run(
+        self,
+        run_id: str,
+        workflow: str,
+        company_name: str,
+        aggregates: Dict[str, Any],
+        completed_at: Optional[float] = None
+    ) -> bool:
+        """
+        Store a completed run's aggregates and add them to its company's rollup.
+        
+        Returns:
+            False if the run was already recorded
+        """
+        completed_at = completed_at or time.time()
+        company_key = company_name.lower()
+        counts = {field: aggregates[field] for field in COUNT_FIELDS}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                summary = {
+                    "run_id": run_id,
+                    "company": company_name,
+                    "workflow": workflow,
+                    "completed_at": _iso(completed_at),
+                    **_summary(aggregates, counts),
+                    "priority_source": aggregates.get("priority_source"),
+                }
+                inserted = self._conn.execute(
+                    "INSERT INTO run_insights (run_id, company_key, completed_at, summary) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(run_id) DO NOTHING",
+                    (run_id, company_key, completed_at, json.dumps(summary))
+                ).rowcount == 1
+                if inserted:
+                    rollup = self._conn.execute(
+                        "SELECT * FROM company_insights WHERE company_key = ?", (company_key,)
+                    ).fetchone()
+                    if rollup is not None:
+                        totals = json.loads(rollup["counts"])
+                        counts = {field: _merge(totals.get(field, {}), counts[field]) for field in COUNT_FIELDS}
+                        counts["platforms"] = dict(sorted(counts["platforms"].items(), key=lambda item: -item[1]))
+                    self._conn.execute(
+                        "INSERT INTO company_insights (company_key, company, runs, first_run_at, last_run_at, mentions, "
+                        "scored, sentiment_sum, critical, counts) "
+                        "VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(company_key) DO UPDATE SET "
+                        "company = excluded.company, runs = runs + 1, "
+                        "first_run_at = MIN(first_run_at, excluded.first_run_at), "
+                        "last_run_at = MAX(last_run_at, excluded.last_run_at), "
+                        "mentions = mentions + excluded.mentions, scored = scored + excluded.scored, "
+                        "sentiment_sum = sentiment_sum + excluded.sentiment_sum, "
+                        "critical = critical + excluded.critical, counts = excluded.counts",
+                        (
+                            company_key, company_name, completed_at, completed_at, aggregates["mentions"],
+                            aggregates["scored"], aggregates["sentiment_sum"], aggregates["critical"] or 0, json.dumps(counts)
+                        )
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+    
+    def run_json(self, run_id: str) -> Optional[str]:
+        """Aggregates of one run as JSON, or None if it was not recorded."""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM run_insights WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+    
+    def company_json(self, company_name: str, runs: int = 50, since: Optional[float] = None) -> Optional[str]:
+        """
+        Rollup of a company and its most recent runs, as JSON.
+        
+        Args:
+            company_name: Company (case-insensitive)
+            runs: Maximum number of runs to include, newest first
+            since: Only include runs completed after this epoch time
+        
+        Returns:
+            Company totals and per-run aggregates ("history"), or None if
+            the company has no recorded runs
+        """
+        company_key = company_name.lower()
+        with self._lock:
+            rollup = self._conn.execute(
+                "SELECT * FROM company_insights WHERE company_key = ?", (company_key,)
+            ).fetchone()
+            if rollup is None:
+                return None
+            history = [row[0] for row in self._conn.execute(
+                "SELECT summary FROM run_insights WHERE company_key = ? AND completed_at >= ? "
+                "ORDER BY completed_at DESC LIMIT ?",
+                (company_key, since or 0.0, runs)
+            )]
+        company = json.dumps({
+            "company": rollup["company"],
+            "runs": rollup["runs"],
+            "first_run_at": _iso(rollup["first_run_at"]),
+            "last_run_at": _iso(rollup["last_run_at"]),
+            "totals": _summary(rollup, json.loads(rollup["counts"])),
+        })
+        return f'{company[:-1]}, "history": [{", ".join(history)}]}}'
+    
+    def companies_json(self, limit: int = 100) -> str:
+        """Rollups of the companies analyzed most recently, as JSON."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM company_insights ORDER BY last_run_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return json.dumps({"companies": [
+            {
+                "company": row["company"],
+                "runs": row["runs"],
+                "last_run_at": _iso(row["last_run_at"]),
+                **_summary(row, json.loads(row["counts"])),
+            }
+            for row in rows
+        ]})
+    
+    def stats(self) -> Dict[str, Any]:
+        """Number of recorded runs and companies."""
+        with self._lock:
+            runs = self._conn.execute("SELECT COUNT(*) FROM run_insights").fetchone()[0]
+            companies = self._conn.execute("SELECT COUNT(*) FROM company_insights").fetchone()[0]
+        return {"path": self.path, "runs": runs, "companies": companies}
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[InsightsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_insights_store() -> Optional[InsightsStore]:
+    """Process-wide store configured from the INSIGHTS_* settings, or None when disabled."""
+    global _store
+    if not settings.INSIGHTS_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = InsightsStore(settings.INSIGHTS_DB_PATH)
+    return _store
+
+
+def close_insights_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,66 @@
+"""
+Pool of exclusively checked-out instances.
+CrewAI agents keep per-execution state (executor, task, crew), so a workflow
+and its agents must not serve two runs at once. Each run checks out its own
+instance; the pool grows to the peak number of concurrent runs.
+"""
+import threading
+from typing import Callable, Dict, Generic, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+class InstancePool(Generic[T]):
+    """
+    Idle instances built by `factory`, handed to one caller at a time.
+    
+    Instances that may still be in use after they are released (e.g. a
+    crew abandoned at its deadline keeps running in a background thread)
+    are released with `reusable=False` and dropped instead of being
+    handed to the next run.
+    """
+    
+    def __init__(self, factory: Callable[[], T]):
+        self.factory = factory
+        self._idle: List[T] = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.discarded = 0
+    
+    def acquire(self) -> T:
+        """Take an idle instance, or build a new one when all are checked out."""
+        with self._lock:
+            self.in_use += 1
+            if self._idle:
+                return self._idle.pop()
+        try:
+            instance = self.factory()
+        except BaseException:
+            with self._lock:
+                self.in_use -= 1
+            raise
+        with self._lock:
+            self.created += 1
+        return instance
+    
+    def release(self, instance: T, reusable: bool = True) -> None:
+        """Return an instance; non-reusable ones are dropped."""
+        with self._lock:
+            self.in_use -= 1
+            if reusable:
+                self._idle.append(instance)
+            else:
+                self.discarded += 1
+    
+    def warm(self) -> None:
+        """Build one idle instance ahead of the first run."""
+        with self._lock:
+            if self._idle or self.in_use:
+                return
+        self.release(self.acquire())
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"created": self.created, "idle": len(self._idle), "in_use": self.in_use, "discarded": self.discarded}
@@ -0,0 +1,407 @@
+"""
+Full-text and faceted search index over all historical mentions.
+Mentions from every run are upserted into a local SQLite database with an
+FTS5 index over their title and content, and B-tree indexes on company,
+platform and publication time. Sentiment scores are filled in
+when the sentiment stage completes. Searches combine a full-text query with
+structured filters and return facet counts.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+FACETS = ("platform", "company", "sentiment_band", "mention_type")
+
+# Same bands as analytics.sentiment_model.sentiment_band
+_SENTIMENT_BAND_SQL = (
+    "CASE WHEN m.sentiment IS NULL THEN 'unscored' "
+    "WHEN m.sentiment < -0.5 THEN 'critical' "
+    "WHEN m.sentiment < -0.1 THEN 'negative' "
+    "WHEN m.sentiment <= 0.1 THEN 'neutral' "
+    "ELSE 'positive' END"
+)
+_FACET_COLUMNS = {
+    "platform": "m.platform",
+    "company": "m.company",
+    "sentiment_band": _SENTIMENT_BAND_SQL,
+    "mention_type": "COALESCE(m.mention_type, 'unknown')",
+}
+
+# Structured columns and text live in separate tables: filters and facets then
+# read small rows, and FTS5 indexes the text table
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mentions (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    mention_type TEXT,
+    published_at REAL NOT NULL,
+    sentiment REAL,
+    urgency REAL,
+    viral_potential TEXT,
+    url TEXT NOT NULL,
+    run_id TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mentions_company ON mentions (company_key, published_at);
+CREATE INDEX IF NOT EXISTS mentions_platform ON mentions (platform, published_at);
+CREATE INDEX IF NOT EXISTS mentions_recent ON mentions (published_at, sentiment, platform, company, mention_type);
+CREATE TABLE IF NOT EXISTS mention_text (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS mentions_fts USING fts5(
+    title, content, content='mention_text', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS mention_text_insert AFTER INSERT ON mention_text BEGIN
+    INSERT INTO mentions_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS mention_text_delete AFTER DELETE ON mention_text BEGIN
+    INSERT INTO mentions_fts (mentions_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS mention_text_update AFTER UPDATE ON mention_text BEGIN
+    INSERT INTO mentions_fts (mentions_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO mentions_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+"""
+
+_QUERY_PART = re.compile(r'"([^"]+)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+def fts_query(text: str) -> str:
+    """
+    Translate a user query into FTS5 syntax.
+    
+    Words must all match (a trailing * matches prefixes), quoted text matches
+    as a phrase, and upper-case OR / NOT are kept as operators. Everything
+    else is quoted, so user input can't produce FTS5 syntax errors.
+    """
+    parts = []
+    for phrase, word in _QUERY_PART.findall(text):
+        if phrase:
+            tokens = _WORD.findall(phrase)
+            if tokens:
+                parts.append('"' + " ".join(tokens) + '"')
+        elif word in ("OR", "NOT") and parts and parts[-1] not in ("OR", "NOT"):
+            parts.append(word)
+        else:
+            terms = [f'"{token}"' for token in _WORD.findall(word)]
+            if terms and word.endswith("*"):
+                terms[-1] += "*"
+            parts.extend(terms)
+    while parts and parts[-1] in ("OR", "NOT"):
+        parts.pop()
+    return " ".join(parts)
+
+
+def _timestamp(published: Any, default: float) -> float:
+    """Epoch seconds of an ISO publication date, or `default` if missing or unparseable."""
+    try:
+        when = datetime.fromisoformat(str(published).replace("Z", "+00:00"))
+    except ValueError:
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def _mention_id(company_name: str, mention: Dict[str, Any]) -> str:
+    identity = str(mention.get("url") or mention.get("title") or mention.get("content", ""))
+    return hashlib.sha1(f"{company_name.lower()}|{identity}".encode()).hexdigest()
+
+
+class MentionIndex:
+    """
+    SQLite FTS5 index of mentions.
+    
+    Writes go through one connection under a lock; searches use a
+    connection per thread, so they run concurrently with each other and
+    with indexing (WAL mode). API and worker processes on the same host can
+    share the database.
+    """
+    
+    def __init__(self, path: str, facet_scan_limit: int = 10000):
+        self.path = path
+        self.facet_scan_limit = facet_scan_limit
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+    
+    def index_mentions(self, company_name: str, mentions: List[Dict[str, Any]], run_id: Optional[str] = None) -> int:
+        """
+        Add or refresh a run's mentions.
+        
+        A mention already indexed for the company (same URL, or title when
+        there is none) is updated in place and keeps its sentiment score.
+        
+        Returns:
+            Number of mentions written
+        """
+        now = time.time()
+        if not mentions:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for m in mentions:
+                    (mention_id,) = self._conn.execute(
+                        "INSERT INTO mentions (key, company, company_key, platform, mention_type, published_at, url, "
+                        "run_id, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET platform = excluded.platform, "
+                        "mention_type = COALESCE(excluded.mention_type, mention_type), "
+                        "published_at = MIN(published_at, excluded.published_at), "
+                        "run_id = excluded.run_id, indexed_at = excluded.indexed_at RETURNING id",
+                        (
+                            _mention_id(company_name, m), company_name, company_name.lower(),
+                            m.get("platform") or "News/Web", m.get("mention_type"),
+                            _timestamp(m.get("published_date"), now), str(m.get("url") or ""), run_id, now
+                        )
+                    ).fetchone()
+                    # Unchanged text is left alone, so re-indexed mentions don't churn FTS5
+                    self._conn.execute(
+                        "INSERT INTO mention_text (id, title, content) VALUES (?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET title = excluded.title, content = excluded.content "
+                        "WHERE title != excluded.title OR content != excluded.content",
+                        (mention_id, str(m.get("title") or ""), str(m.get("content") or ""))
+                    )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(mentions)
+    
+    def update_sentiment(
+        self,
+        company_name: str,
+        scored: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> int:
+        """
+        Store sentiment scores from the sentiment stage.
+        
+        Args:
+            company_name: Company the mentions are about
+            scored: (mention, sentiment entry) pairs; entries carry
+                sentiment_score and optionally urgency_level and viral_potential
+        
+        Returns:
+            Number of mentions updated
+        """
+        rows = []
+        for mention, entry in scored:
+            try:
+                score = float(entry["sentiment_score"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            try:
+                urgency = float(entry.get("urgency_level"))
+            except (TypeError, ValueError):
+                urgency = None
+            viral = entry.get("viral_potential")
+            rows.append((score, urgency, str(viral).capitalize() if viral else None, _mention_id(company_name, mention)))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE mentions SET sentiment = ?, urgency = ?, viral_potential = ? WHERE key = ?", rows
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return len(rows)
+    
+    def search(
+        self,
+        query: Optional[str] = None,
+        company: Optional[str] = None,
+        platform: Optional[str] = None,
+        mention_type: Optional[str] = None,
+        sentiment_min: Optional[float] = None,
+        sentiment_max: Optional[float] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        sort: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        facets: Sequence[str] = FACETS
+    ) -> Dict[str, Any]:
+        """
+        Search mentions.
+        
+        Args:
+            query: Full-text query over title and content (see fts_query)
+            company, platform, mention_type: Exact filters (company is case-insensitive)
+            sentiment_min, sentiment_max: Inclusive sentiment score bounds;
+                unscored mentions are excluded when either is set
+            since, until: Publication time bounds in epoch seconds
+            sort: "recent" (default) or "relevance" (BM25, with a query only)
+            limit, offset: Page of results
+            facets: Facets to count over the matching mentions
+        
+        Returns:
+            Dictionary with the total, the page of results and facet counts.
+            Totals and facets cover at most `facet_scan_limit` matches;
+            `exact` is false when that cap was hit.
+        """
+        started = time.perf_counter()
+        filters: List[str] = []
+        params: List[Any] = []
+        for column, value in (("m.company_key", company.lower() if company else None),
+                              ("m.platform", platform), ("m.mention_type", mention_type)):
+            if value:
+                filters.append(f"{column} = ?")
+                params.append(value)
+        for condition, value in (("m.sentiment >= ?", sentiment_min), ("m.sentiment <= ?", sentiment_max),
+                                 ("m.published_at >= ?", since), ("m.published_at <= ?", until)):
+            if value is not None:
+                filters.append(condition)
+                params.append(value)
+        
+        match = fts_query(query) if query else ""
+        conditions, condition_params = list(filters), list(params)
+        if match:
+            # The full-text match is evaluated once into a rowid set; the
+            # planner then picks a B-tree index for the structured filters
+            conditions.insert(0, "m.id IN (SELECT rowid FROM mentions_fts WHERE mentions_fts MATCH ?)")
+            condition_params.insert(0, match)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        sort = "relevance" if sort == "relevance" and match else "recent"
+        conn = self._reader()
+        columns = "m.id, m.company, m.platform, m.url, m.mention_type, m.published_at, m.sentiment, m.urgency, m.viral_potential"
+        if sort == "relevance":
+            # Ranking needs the FTS5 table as the outer loop (CROSS JOIN keeps that order)
+            page = conn.execute(
+                f"SELECT {columns} FROM mentions_fts CROSS JOIN mentions m ON m.id = mentions_fts.rowid "
+                f"WHERE {' AND '.join(['mentions_fts MATCH ?'] + filters)} ORDER BY bm25(mentions_fts) LIMIT ? OFFSET ?",
+                (match, *params, limit, offset)
+            ).fetchall()
+        else:
+            page = conn.execute(
+                f"SELECT {columns} FROM mentions m {where} ORDER BY m.published_at DESC LIMIT ? OFFSET ?",
+                (*condition_params, limit, offset)
+            ).fetchall()
+        
+        # Titles and snippets for the page only
+        ids = [row["id"] for row in page]
+        marks = ",".join("?" * len(ids))
+        if match and ids:
+            texts = conn.execute(
+                f"SELECT rowid AS id, title, snippet(mentions_fts, 1, '[', ']', '…', 16) AS snippet "
+                f"FROM mentions_fts WHERE mentions_fts MATCH ? AND rowid IN ({marks})",
+                (match, *ids)
+            ).fetchall()
+        else:
+            texts = conn.execute(
+                f"SELECT id, title, substr(content, 1, 200) AS snippet FROM mention_text WHERE id IN ({marks})", ids
+            ).fetchall() if ids else []
+        text_by_id = {row["id"]: row for row in texts}
+        
+        # Count and facet over the matches (capped) in a single scan
+        wanted = [name for name in facets if name in _FACET_COLUMNS]
+        facet_columns = ", ".join(f"{_FACET_COLUMNS[name]} AS {name}" for name in wanted)
+        scan = f"SELECT {facet_columns or '1'} FROM mentions m {where} LIMIT {int(self.facet_scan_limit)}"
+        group = f" GROUP BY {', '.join(wanted)}" if wanted else ""
+        total = 0
+        facet_counts: Dict[str, Dict[str, int]] = {name: {} for name in wanted}
+        for row in conn.execute(f"SELECT {', '.join(wanted + ['COUNT(*)'])} FROM ({scan}){group}", condition_params):
+            count = row[-1]
+            total += count
+            for name, value in zip(wanted, row):
+                facet_counts[name][value] = facet_counts[name].get(value, 0) + count
+        facet_counts = {
+            name: dict(sorted(counts.items(), key=lambda item: -item[1])[:20]) for name, counts in facet_counts.items()
+        }
+        
+        return {
+            "query": match or None,
+            "total": total,
+            "exact": total < self.facet_scan_limit,
+            "sort": sort,
+            "results": [
+                {
+                    **{key: row[key] for key in ("id", "company", "platform", "url", "mention_type", "sentiment", "urgency", "viral_potential")},
+                    "title": text_by_id[row["id"]]["title"] if row["id"] in text_by_id else "",
+                    "published_at": datetime.fromtimestamp(row["published_at"], timezone.utc).isoformat(),
+                    "snippet": text_by_id[row["id"]]["snippet"] if row["id"] in text_by_id else "",
+                }
+                for row in page
+            ],
+            "facets": facet_counts,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Number of indexed mentions and companies."""
+        row = self._reader().execute("SELECT COUNT(*), COUNT(DISTINCT company_key) FROM mentions").fetchone()
+        return {"path": self.path, "mentions": row[0], "companies": row[1]}
+    
+    def close(self) -> None:
+        with self._lock:
+            # Refresh the planner statistics that index choices depend on
+            self._conn.execute("PRAGMA optimize")
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._conn.close()
+
+
+_index: Optional[MentionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_mention_index() -> Optional[MentionIndex]:
+    """Process-wide index configured from the MENTION_INDEX_* settings, or None when disabled."""
+    global _index
+    if not settings.MENTION_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = MentionIndex(settings.MENTION_INDEX_PATH, facet_scan_limit=settings.SEARCH_FACET_SCAN_LIMIT)
+    return _index
+
+
+def close_mention_index() -> None:
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+            _index = None
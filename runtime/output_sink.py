@@ -0,0 +1,255 @@
+"""
+Asynchronous, batched sink for workflow stage outputs.
+Stage outputs are queued on the request path and written by a background
+thread in batches with one fsync per batch. Outputs go either to per-run
+files under a unique run id or to an append-only (optionally gzip) JSONL
+log, and the sink can be switched off entirely.
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# File name prefix and extension per stage (files mode)
+STAGE_FILES = {
+    "monitor": ("monitor", "json"),
+    "sentiment": ("sentiment", "json"),
+    "priority": ("priority", "json"),
+    "investigation": ("investigation", "json"),
+    "response": ("emails", "txt"),
+}
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^a-z0-9_.-]+")
+
+
+def new_run_id() -> str:
+    """Unique, time-sortable id for one workflow run."""
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+class OutputSink:
+    """
+    Background writer for stage outputs.
+    
+    Modes:
+        "files": outputs/<run_id>/<stage>_<company>_<workflow>.<ext>
+        "jsonl": one record per stage appended to a daily log per process
+                 (gzip-compressed when `compress` is set)
+        "off":   outputs are discarded
+    
+    submit() never blocks; if the queue is full the output is dropped and
+    counted rather than slowing the request down.
+    """
+    
+    def __init__(
+        self,
+        mode: str = "files",
+        directory: str = "outputs",
+        compress: bool = False,
+        fsync: bool = True,
+        batch_size: int = 64,
+        flush_interval: float = 0.5,
+        queue_size: int = 1000
+    ):
+        self.mode = mode
+        self.directory = directory
+        self.compress = compress
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stats = {"submitted": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+        
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._log = None
+        self._log_path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+    
+    def submit(self, run_id: str, workflow: str, company: str, stage: str, output: str) -> None:
+        """Queue a stage output for writing."""
+        if not self.enabled:
+            return
+        self._ensure_started()
+        record = {
+            "run_id": run_id,
+            "workflow": workflow,
+            "company": company,
+            "stage": stage,
+            "timestamp": datetime.utcnow().isoformat(),
+            "output": output
+        }
+        try:
+            self._queue.put_nowait(record)
+            self.stats["submitted"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning(f"Output sink queue full, dropped {stage} output of run {run_id}")
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been written."""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """Write pending outputs and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+    
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._writer, name="output-sink", daemon=True)
+                    self._thread.start()
+    
+    def _writer(self) -> None:
+        """Drain the queue in batches until close() is called."""
+        running = True
+        while running:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            
+            batch: List[Dict[str, Any]] = []
+            items = 1
+            if first is None:
+                running = False
+            else:
+                batch.append(first)
+            while running and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                items += 1
+                if record is None:
+                    running = False
+                else:
+                    batch.append(record)
+            
+            try:
+                if batch:
+                    self._write_batch(batch)
+                    self.stats["written"] += len(batch)
+                    self.stats["batches"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Output sink failed to write {len(batch)} outputs: {e}")
+            finally:
+                for _ in range(items):
+                    self._queue.task_done()
+        
+        self._close_log()
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        if self.mode == "jsonl":
+            self._append_log(batch)
+        else:
+            self._write_files(batch)
+    
+    def _write_files(self, batch: List[Dict[str, Any]]) -> None:
+        """Write one file per output, then fsync the whole batch."""
+        handles = []
+        try:
+            for record in batch:
+                prefix, extension = STAGE_FILES.get(record["stage"], (record["stage"], "txt"))
+                company = _UNSAFE_PATH_CHARS.sub("_", record["company"].lower())
+                run_dir = os.path.join(self.directory, _UNSAFE_PATH_CHARS.sub("_", record["run_id"]))
+                os.makedirs(run_dir, exist_ok=True)
+                
+                f = open(os.path.join(run_dir, f"{prefix}_{company}_{record['workflow']}.{extension}"), "w", encoding="utf-8")
+                handles.append(f)
+                f.write(record["output"])
+                f.flush()
+            
+            if self.fsync:
+                for f in handles:
+                    os.fsync(f.fileno())
+        finally:
+            for f in handles:
+                f.close()
+    
+    def _append_log(self, batch: List[Dict[str, Any]]) -> None:
+        """Append the batch to the current log and fsync once."""
+        path = os.path.join(
+            self.directory,
+            f"stage_outputs-{datetime.utcnow():%Y%m%d}-{os.getpid()}.jsonl{'.gz' if self.compress else ''}"
+        )
+        if path != self._log_path:
+            self._close_log()
+            os.makedirs(self.directory, exist_ok=True)
+            raw = open(path, "ab")
+            self._log = (gzip.GzipFile(fileobj=raw, mode="ab"), raw) if self.compress else (raw, raw)
+            self._log_path = path
+        
+        stream, raw = self._log
+        stream.write(b"".join(
+            json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in batch
+        ))
+        if self.compress:
+            stream.flush(zlib.Z_SYNC_FLUSH)
+        raw.flush()
+        if self.fsync:
+            os.fsync(raw.fileno())
+    
+    def _close_log(self) -> None:
+        if self._log is not None:
+            stream, raw = self._log
+            if stream is not raw:
+                stream.close()
+            raw.close()
+            self._log = None
+            self._log_path = None
+
+
+_sink: Optional[OutputSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_output_sink() -> OutputSink:
+    """Process-wide sink configured from the OUTPUT_SINK* settings."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = OutputSink(
+                    mode=settings.OUTPUT_SINK,
+                    directory=settings.OUTPUT_DIR,
+                    compress=settings.OUTPUT_SINK_COMPRESS,
+                    fsync=settings.OUTPUT_SINK_FSYNC,
+                    batch_size=settings.OUTPUT_SINK_BATCH_SIZE,
+                    flush_interval=settings.OUTPUT_SINK_FLUSH_SECONDS
+                )
+    return _sink
+
+
+def close_output_sink() -> None:
+    """Flush and stop the process-wide sink, if one was created."""
+    if _sink is not None:
+        _sink.close()
@@ -0,0 +1,247 @@
+"""
+Priority-aware admission scheduling for workflow runs.
+Interactive requests, scheduled monitoring and batch work share the same
+execution slots. Runs wait in per-class queues and are admitted by weighted
+fair queuing within per-class concurrency caps; queued batch work always
+yields to interactive requests. Queue times are tracked per class.
+"""
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from runtime.deadline import DeadlineExceeded
+
+
+PRIORITY_CLASSES = ("interactive", "scheduled", "batch")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a run cannot be queued because its class queue is full."""
+
+
+class _Ticket:
+    """A run waiting for an execution slot."""
+    
+    __slots__ = ("priority", "cost", "finish_tag", "seq", "enqueued_at", "admitted", "rejected")
+    
+    def __init__(self, priority: str, cost: float, finish_tag: float, seq: int):
+        self.priority = priority
+        self.cost = cost
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.admitted = threading.Event()
+        self.rejected = False
+
+
+class _ClassStats:
+    """Counters and a rolling window of queue times for one priority class."""
+    
+    def __init__(self, window: int):
+        self.queue_times: Deque[float] = deque(maxlen=window)
+        self.submitted = 0
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.running = 0
+    
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.queue_times:
+            return None
+        ordered = sorted(self.queue_times)
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 3)
+
+
+class AdmissionScheduler:
+    """
+    Admits workflow runs into a fixed number of execution slots.
+    
+    Each priority class has a weight, a concurrency cap (0 = may use every
+    slot) and a queue limit.
+    Among classes that are under their cap, the queued run with the smallest
+    weighted-fair-queuing finish tag is admitted next, so each class gets
+    slots in proportion to its weight while it has work queued. Queued batch
+    runs are preempted by interactive runs: while an interactive run is
+    waiting, no batch run is admitted.
+    
+    Usage:
+        with scheduler.admit("interactive", timeout=deadline.remaining()):
+            run_workflow()
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int,
+        weights: Dict[str, float],
+        caps: Dict[str, int],
+        max_queued: Dict[str, int],
+        window: int = 500
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.weights = {cls: max(weights.get(cls, 1.0), 1e-6) for cls in PRIORITY_CLASSES}
+        self.caps = {cls: max(0, caps.get(cls, 0)) for cls in PRIORITY_CLASSES}
+        self.max_queued = {cls: max_queued.get(cls, 0) for cls in PRIORITY_CLASSES}
+        
+        self._queues: Dict[str, Deque[_Ticket]] = {cls: deque() for cls in PRIORITY_CLASSES}
+        self._last_finish = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._seq = itertools.count()
+        self._stats = {cls: _ClassStats(window) for cls in PRIORITY_CLASSES}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._draining = False
+    
+    @contextmanager
+    def admit(self, priority: str, timeout: Optional[float] = None, cost: float = 1.0) -> Iterator[float]:
+        """
+        Wait for an execution slot, hold it for the body of the with block.
+        
+        Args:
+            priority: "interactive", "scheduled" or "batch"
+            timeout: Maximum seconds to wait in the queue
+            cost: Relative size of the run (e.g. deep runs cost more than
+                fast ones), used for fair sharing between classes
+        
+        Yields:
+            Seconds spent waiting in the queue
+        
+        Raises:
+            ValueError: If the priority class is unknown
+            AdmissionRejected: If the class queue is full or the scheduler is draining
+            DeadlineExceeded: If no slot frees up within `timeout`
+        """
+        ticket = self._enqueue(priority, cost)
+        if not ticket.admitted.wait(timeout):
+            with self._lock:
+                if not ticket.admitted.is_set():
+                    self._queues[priority].remove(ticket)
+                    self._stats[priority].timed_out += 1
+                    raise DeadlineExceeded(f"No execution slot for {priority} run before the deadline")
+        if ticket.rejected:
+            raise AdmissionRejected("The server is shutting down")
+        
+        waited = time.monotonic() - ticket.enqueued_at
+        try:
+            yield waited
+        finally:
+            self._release(priority)
+    
+    def cap(self, priority: str) -> int:
+        """Slots the class may use at the current concurrency."""
+        cap = self.caps[priority]
+        return min(cap, self.max_concurrency) if cap else self.max_concurrency
+    
+    def resize(self, max_concurrency: int) -> None:
+        """Change the number of execution slots; queued runs are admitted if it grew."""
+        with self._lock:
+            self.max_concurrency = max(1, max_concurrency)
+            self._dispatch()
+    
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop admitting runs and wait for the running ones to finish.
+        
+        Queued and newly submitted runs are rejected with AdmissionRejected.
+        
+        Returns:
+            True if every running run finished within `timeout`
+        """
+        with self._lock:
+            self._draining = True
+            for cls, queue in self._queues.items():
+                while queue:
+                    ticket = queue.popleft()
+                    ticket.rejected = True
+                    self._stats[cls].rejected += 1
+                    ticket.admitted.set()
+            return self._idle.wait_for(lambda: self._running == 0, timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Slot usage and per-class queue-time percentiles and counters."""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "draining": self._draining,
+                "classes": {
+                    cls: {
+                        "weight": self.weights[cls],
+                        "cap": self.cap(cls),
+                        "queued": len(self._queues[cls]),
+                        "running": stats.running,
+                        "submitted": stats.submitted,
+                        "completed": stats.completed,
+                        "rejected": stats.rejected,
+                        "timed_out": stats.timed_out,
+                        "queue_time_p50": stats.percentile(0.50),
+                        "queue_time_p95": stats.percentile(0.95),
+                        "queue_time_max": round(max(stats.queue_times), 3) if stats.queue_times else None
+                    }
+                    for cls, stats in self._stats.items()
+                }
+            }
+    
+    def _enqueue(self, priority: str, cost: float) -> _Ticket:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+        
+        with self._lock:
+            stats = self._stats[priority]
+            if self._draining:
+                stats.rejected += 1
+                raise AdmissionRejected("The server is shutting down")
+            limit = self.max_queued[priority]
+            if limit and len(self._queues[priority]) >= limit:
+                stats.rejected += 1
+                raise AdmissionRejected(f"The {priority} queue is full ({limit} runs waiting)")
+            
+            # Weighted fair queuing: a run's finish tag advances its class's
+            # virtual clock by cost / weight
+            start = max(self._virtual_time, self._last_finish[priority])
+            finish = start + cost / self.weights[priority]
+            self._last_finish[priority] = finish
+            
+            ticket = _Ticket(priority, cost, finish, next(self._seq))
+            self._queues[priority].append(ticket)
+            stats.submitted += 1
+            self._dispatch()
+            return ticket
+    
+    def _release(self, priority: str) -> None:
+        with self._lock:
+            self._running -= 1
+            self._stats[priority].running -= 1
+            self._stats[priority].completed += 1
+            self._dispatch()
+            if self._running == 0:
+                self._idle.notify_all()
+    
+    def _dispatch(self) -> None:
+        """Admit queued runs while slots are free. Caller holds the lock."""
+        while self._running < self.max_concurrency:
+            candidates: List[_Ticket] = [
+                queue[0] for cls, queue in self._queues.items()
+                if queue and self._stats[cls].running < self.cap(cls)
+            ]
+            if any(ticket.priority == "interactive" for ticket in candidates):
+                # Queued batch work never goes ahead of an admissible interactive run
+                candidates = [ticket for ticket in candidates if ticket.priority != "batch"]
+            if not candidates:
+                return
+            
+            ticket = min(candidates, key=lambda t: (t.finish_tag, t.seq))
+            self._queues[ticket.priority].popleft()
+            self._virtual_time = max(self._virtual_time, ticket.finish_tag - ticket.cost / self.weights[ticket.priority])
+            
+            stats = self._stats[ticket.priority]
+            stats.running += 1
+            stats.admitted += 1
+            stats.queue_times.append(time.monotonic() - ticket.enqueued_at)
+            self._running += 1
+            ticket.admitted.set()
@@ -0,0 +1,112 @@
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight execution,
+and completed results are served from a short-lived cache window.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from runtime.deadline import DeadlineExceeded
+
+
+class _Call:
+    """A single in-flight execution that followers can wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent executions by key.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running (followers) block until it finishes and receive
+    the same result. Results accepted by `cache_if` are kept for `result_ttl`
+    seconds so callers arriving just after completion are also served without
+    a new execution.
+    """
+    
+    def __init__(
+        self,
+        result_ttl: float = 0.0,
+        cache_if: Optional[Callable[[Any], bool]] = None
+    ):
+        self.result_ttl = result_ttl
+        self.cache_if = cache_if or (lambda result: True)
+        self._calls: Dict[Hashable, _Call] = {}
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "coalesced": 0, "cache_hits": 0}
+    
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Run `fn` once per key across concurrent callers.
+        
+        Args:
+            key: Deduplication key
+            fn: Zero-argument function producing the result
+            timeout: Maximum seconds a follower waits for the leader
+            
+        Returns:
+            Tuple of (result, shared) where shared is True if the result came
+            from another caller's execution or from the cache
+            
+        Raises:
+            DeadlineExceeded: If a follower's timeout elapses first
+        """
+        with self._lock:
+            self._evict_expired()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached[1], True
+            
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats["executions"] += 1
+            else:
+                call.followers += 1
+                self.stats["coalesced"] += 1
+        
+        if not leader:
+            if not call.done.wait(timeout):
+                raise DeadlineExceeded("Timed out waiting for a shared in-flight execution")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is None and self.result_ttl > 0 and self.cache_if(call.result):
+                    self._cache[key] = (time.monotonic() + self.result_ttl, call.result)
+            call.done.set()
+    
+    def in_flight(self) -> int:
+        """Number of keys currently executing."""
+        with self._lock:
+            return len(self._calls)
+    
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
@@ -0,0 +1,340 @@
+"""
+Pre-forked worker pool for running workflows outside the API process.
+Each worker process holds its own warm FastWorkflow/DeepWorkflow, so CPU-heavy
+work in one analysis does not contend on the GIL with other requests.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from runtime.deadline import Deadline, DeadlineExceeded
+from runtime.checkpoints import close_checkpoint_store
+from runtime.clients import close_client_registry
+from runtime.insights import close_insights_store
+from runtime.mention_index import close_mention_index
+from runtime.output_sink import close_output_sink
+
+
+logger = logging.getLogger(__name__)
+
+# Payloads larger than this are zlib-compressed before crossing the pipe
+_COMPRESS_THRESHOLD = 4096
+
+
+def encode_payload(obj: Dict[str, Any]) -> bytes:
+    """Serialize a message as compact JSON, compressing large payloads."""
+    data = json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+    if len(data) > _COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(data, 1)
+    return b"j" + data
+
+
+def decode_payload(data: bytes) -> Dict[str, Any]:
+    """Inverse of encode_payload()."""
+    body = zlib.decompress(data[1:]) if data[:1] == b"z" else data[1:]
+    return json.loads(body.decode("utf-8"))
+
+
+def _worker_main(conn: Any, max_jobs: int) -> None:
+    """
+    Worker process entry point.
+    
+    Builds both workflows once, then serves run messages until it has
+    handled `max_jobs` runs, at which point it exits so the pool can recycle it.
+    """
+    from workflows.fast_workflow import FastWorkflow
+    from workflows.deep_workflow import DeepWorkflow
+    
+    workflows = {"fast": FastWorkflow(), "deep": DeepWorkflow()}
+    jobs = 0
+    conn.send_bytes(encode_payload({"op": "ready", "pid": os.getpid()}))
+    
+    while True:
+        try:
+            message = decode_payload(conn.recv_bytes())
+        except (EOFError, OSError):
+            break
+        
+        if message.get("op") == "stop":
+            break
+        
+        jobs += 1
+        try:
+            workflow = workflows[message["workflow"]]
+            results = workflow.run(
+                message["company"],
+                deadline=Deadline(message.get("deadline_seconds")),
+                resume_run_id=message.get("resume_run_id")
+            )
+        except Exception as e:
+            results = {"status": "error", "workflow": message.get("workflow"), "error": str(e)}
+        
+        # A crew abandoned at its deadline keeps running on this worker's agents;
+        # exiting is the only way to stop it before the next run reuses them
+        recycle = (max_jobs > 0 and jobs >= max_jobs) or bool(results.get("crew_abandoned"))
+        conn.send_bytes(encode_payload({"op": "result", "results": results, "recycle": recycle}))
+        if recycle:
+            break
+    
+    close_output_sink()
+    close_checkpoint_store()
+    close_mention_index()
+    close_insights_store()
+    close_client_registry()
+    conn.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process."""
+    
+    def __init__(self, process: Any, conn: Any):
+        self.process = process
+        self.conn = conn
+        self.pid = process.pid
+        self.jobs = 0
+        self.busy = False
+        self.started_at = time.time()
+    
+    def alive(self) -> bool:
+        return self.process.is_alive()
+    
+    def terminate(self, grace: float = 0.0) -> None:
+        """
+        Stop the worker process.
+        
+        Args:
+            grace: Seconds to wait for a worker that is exiting on its own
+                (recycled or told to stop) to flush its stores before it
+                is killed
+        """
+        if grace > 0:
+            self.process.join(timeout=grace)
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            if grace > 0:
+                logger.warning(f"Workflow worker {self.pid} did not exit within {grace}s; terminating it")
+            self.process.terminate()
+        self.process.join(timeout=5)
+
+
+class WorkflowWorkerPool:
+    """
+    Pool of pre-warmed worker processes that execute workflow runs.
+    
+    Workers are started up front and each builds its own workflows before
+    accepting jobs. Inputs and results cross the process boundary as compact
+    JSON payloads. A worker is replaced after `max_jobs_per_worker` runs (to
+    contain memory growth), when it dies, or when it overruns a deadline.
+    """
+    
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        start_method: Optional[str] = None,
+        startup_timeout: float = 120.0
+    ):
+        self.size = size or settings.WORKER_POOL_SIZE or os.cpu_count() or 1
+        self.max_jobs_per_worker = (
+            max_jobs_per_worker if max_jobs_per_worker is not None else settings.WORKER_MAX_JOBS
+        )
+        self.startup_timeout = startup_timeout
+        self._context = multiprocessing.get_context(start_method or settings.WORKER_START_METHOD)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._retiring: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"jobs": 0, "recycled": 0, "replaced": 0}
+    
+    def start(self) -> None:
+        """Start all workers and wait for them to finish warming up."""
+        logger.info(f"Starting workflow worker pool with {self.size} workers")
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+    
+    def _spawn(self) -> _Worker:
+        """Start one worker process and wait for its ready message."""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.max_jobs_per_worker),
+            name="workflow-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        
+        try:
+            if not parent_conn.poll(self.startup_timeout):
+                raise RuntimeError("Workflow worker did not become ready in time")
+            decode_payload(parent_conn.recv_bytes())
+        except (EOFError, OSError):
+            process.terminate()
+            raise RuntimeError("Workflow worker exited during startup")
+        except RuntimeError:
+            process.terminate()
+            raise
+        
+        worker = _Worker(process, parent_conn)
+        with self._lock:
+            self._workers.append(worker)
+        logger.info(f"Workflow worker {worker.pid} ready")
+        return worker
+    
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        """
+        Retire a worker and start a replacement in the background.
+        
+        A recycled worker is exiting on its own and gets up to
+        WORKER_EXIT_TIMEOUT_SECONDS to drain its output sink and close its
+        stores; dead, crashed or overrunning workers are killed right away.
+        """
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if reason == "recycle":
+                self._retiring.append(worker)
+            self.stats["recycled" if reason == "recycle" else "replaced"] += 1
+        logger.info(f"Retiring workflow worker {worker.pid} ({reason})")
+        
+        def _retire() -> None:
+            worker.terminate(grace=settings.WORKER_EXIT_TIMEOUT_SECONDS)
+            with self._lock:
+                if worker in self._retiring:
+                    self._retiring.remove(worker)
+        
+        if reason == "recycle":
+            threading.Thread(target=_retire, name="worker-retire", daemon=True).start()
+        else:
+            worker.terminate()
+        
+        def _respawn() -> None:
+            if self._closed:
+                return
+            try:
+                self._idle.put(self._spawn())
+            except Exception as e:
+                logger.error(f"Failed to start replacement workflow worker: {e}")
+        
+        threading.Thread(target=_respawn, name="worker-respawn", daemon=True).start()
+    
+    def run(
+        self,
+        workflow: str,
+        company_name: str,
+        deadline: Deadline,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a workflow run on an idle worker.
+        
+        Args:
+            workflow: "fast" or "deep"
+            company_name: Company to analyze
+            deadline: Request deadline; its remaining budget is passed to the worker
+            resume_run_id: Earlier run to resume, if the request is a retry
+            
+        Returns:
+            The workflow's result dictionary
+            
+        Raises:
+            DeadlineExceeded: If no worker frees up, or the worker overruns, in time
+        """
+        try:
+            worker = self._idle.get(timeout=deadline.remaining())
+        except queue.Empty:
+            raise DeadlineExceeded("No workflow worker became available before the deadline")
+        
+        if not worker.alive():
+            self._replace(worker, "died")
+            return self.run(workflow, company_name, deadline, resume_run_id)
+        
+        worker.busy = True
+        try:
+            worker.conn.send_bytes(encode_payload({
+                "op": "run",
+                "workflow": workflow,
+                "company": company_name,
+                "deadline_seconds": deadline.remaining(),
+                "resume_run_id": resume_run_id
+            }))
+            
+            # Give the worker a short grace period past the deadline to return partial results
+            wait = None if not deadline.bounded else deadline.remaining() + settings.WORKER_DEADLINE_GRACE_SECONDS
+            if not worker.conn.poll(wait):
+                self._replace(worker, "deadline overrun")
+                raise DeadlineExceeded("Workflow worker did not return before the deadline")
+            
+            message = decode_payload(worker.conn.recv_bytes())
+        except (EOFError, OSError) as e:
+            self._replace(worker, "crashed")
+            raise RuntimeError(f"Workflow worker crashed: {e}")
+        
+        worker.jobs += 1
+        with self._lock:
+            self.stats["jobs"] += 1
+        
+        if message.get("recycle"):
+            self._replace(worker, "recycle")
+        else:
+            worker.busy = False
+            self._idle.put(worker)
+        
+        return message["results"]
+    
+    def health_check(self) -> Dict[str, Any]:
+        """
+        Report the liveness of every worker.
+        
+        Liveness comes from the process table, so the check never blocks on
+        a worker's pipe and never takes idle workers away from runs. A dead
+        idle worker is replaced when a run next checks it out.
+        
+        Returns:
+            Dictionary with pool size, idle/busy counts and per-worker status
+        """
+        with self._lock:
+            workers = list(self._workers)
+        busy = sum(1 for worker in workers if worker.busy)
+        
+        return {
+            "size": self.size,
+            "running": len(workers),
+            "idle": len(workers) - busy,
+            "busy": busy,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "workers": [
+                {"pid": worker.pid, "jobs": worker.jobs, "busy": worker.busy, "healthy": worker.alive()}
+                for worker in workers
+            ],
+            **self.stats
+        }
+    
+    def close(self) -> None:
+        """Stop all workers, giving them WORKER_EXIT_TIMEOUT_SECONDS in total to flush their stores."""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            # Recycled workers still flushing their stores are waited for too
+            retiring = list(self._retiring)
+        for worker in workers:
+            try:
+                worker.conn.send_bytes(encode_payload({"op": "stop"}))
+            except (EOFError, OSError):
+                pass
+        workers += retiring
+        exit_by = time.monotonic() + settings.WORKER_EXIT_TIMEOUT_SECONDS
+        for worker in workers:
+            worker.terminate(grace=max(0.01, exit_by - time.monotonic()))
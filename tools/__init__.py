@@ -1,8 +1,20 @@
 """
 Custom tools for the Customer Sentiment Alert System.
+
+Tools are imported lazily so that importing this package does not pull in
+CrewAI or the Tavily client until a tool is actually used.
 """
+from importlib import import_module
+
+_LAZY_EXPORTS = {
+    "TavilyCompanySearchTool": "tools.tavily_search",
+    "EmailPreviewTool": "tools.email_preview",
+}
+
+__all__ = ["TavilyCompanySearchTool", "EmailPreviewTool"]
 
-from .tavily_search import TavilyCompanySearchTool
-from .email_preview import EmailPreviewTool
 
-__all__ = ["TavilyCompanySearchTool", "EmailPreviewTool"]
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,174 @@
+"""
+Compiled platform extraction and mention classification.
+Platforms are resolved with a host dictionary lookup; mention types with one
+precompiled, trie-structured regex per lexicon, loaded from config, so
+lexicons can grow to thousands of terms without per-term scans.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Registrable host → platform name; subdomains (www., old., mobile.) resolve to their parent
+PLATFORM_HOSTS = {
+    "twitter.com": "Twitter/X",
+    "x.com": "Twitter/X",
+    "reddit.com": "Reddit",
+    "news.ycombinator.com": "Hacker News",
+    "techcrunch.com": "TechCrunch",
+    "theverge.com": "The Verge",
+    "arstechnica.com": "Ars Technica",
+}
+DEFAULT_PLATFORM = "News/Web"
+
+_URL_HOST = re.compile(r"^(?:[A-Za-z][A-Za-z0-9+.-]*:)?//(?:[^/?#@]*@)?([^/?#:]+)")
+
+# Used when the lexicon file is missing; mirrors data/mention_lexicons.json
+DEFAULT_LEXICONS = {
+    "precedence": ["complaint", "positive", "negative"],
+    "default": "neutral",
+    "lexicons": {
+        "complaint": ["complaint", "issue", "problem", "bug", "broken"],
+        "positive": ["love", "great", "amazing", "excellent"],
+        "negative": ["hate", "terrible", "awful", "worst"],
+    },
+}
+
+
+def extract_platform(url: str) -> str:
+    """
+    Map a URL to its platform name.
+    
+    Args:
+        url: Mention URL
+        
+    Returns:
+        Platform name, or "News/Web" for unknown hosts
+    """
+    match = _URL_HOST.match(url if "//" in url else f"//{url}")
+    return _platform_for_host(match.group(1).lower()) if match else DEFAULT_PLATFORM
+
+
+@lru_cache(maxsize=4096)
+def _platform_for_host(host: str) -> str:
+    """Resolve a host, or the nearest parent domain, to its platform."""
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        platform = PLATFORM_HOSTS.get(".".join(labels[i:]))
+        if platform:
+            return platform
+    return DEFAULT_PLATFORM
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Build a regex alternation structured as a prefix trie.
+    
+    Shared prefixes are matched once, so matching cost depends on the text
+    length and the depth of the trie rather than the number of terms.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def _render(node: Dict[str, dict]) -> str:
+        branches = []
+        optional = False
+        for char in sorted(node):
+            if char == "":
+                optional = True
+            else:
+                branches.append(re.escape(char) + _render(node[char]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if optional else body
+    
+    return _render(trie)
+
+
+class MentionClassifier:
+    """
+    Classifies mention text into a mention type with compiled lexicon regexes.
+    
+    Each lexicon term matches at the start of a word (so "issue" also matches
+    "issues"). Lexicons are tried in `precedence` order and the first one with
+    a match wins; text without any match gets `default`.
+    """
+    
+    def __init__(self, lexicons: Dict[str, List[str]], precedence: Optional[List[str]] = None, default: str = "neutral"):
+        self.precedence = list(precedence or lexicons)
+        self.precedence += [category for category in lexicons if category not in self.precedence]
+        self.default = default
+        
+        self._patterns = []
+        self._term_count = 0
+        for category in self.precedence:
+            terms = {term.lower().strip() for term in lexicons.get(category, [])} - {""}
+            if terms:
+                self._term_count += len(terms)
+                self._patterns.append((category, re.compile(r"\b" + _trie_pattern(terms))))
+    
+    @classmethod
+    def from_file(cls, path: str) -> "MentionClassifier":
+        """Load lexicons from a JSON file, falling back to the built-in lexicons."""
+        config = DEFAULT_LEXICONS
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load mention lexicons from {path}: {e}")
+        return cls(config["lexicons"], config.get("precedence"), config.get("default", "neutral"))
+    
+    @property
+    def term_count(self) -> int:
+        return self._term_count
+    
+    def classify(self, text: str) -> str:
+        """
+        Classify a mention's text.
+        
+        Args:
+            text: Mention content
+            
+        Returns:
+            Mention type (e.g. "complaint", "positive", "negative", "neutral")
+        """
+        if not text:
+            return self.default
+        
+        text = text.lower()
+        for category, pattern in self._patterns:
+            if pattern.search(text):
+                return category
+        return self.default
+    
+    def classify_many(self, texts: Iterable[str]) -> List[str]:
+        """Classify a batch of mention texts."""
+        return [self.classify(text) for text in texts]
+
+
+_classifier: Optional[MentionClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_mention_classifier() -> MentionClassifier:
+    """Process-wide classifier built from MENTION_LEXICONS_PATH."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = MentionClassifier.from_file(settings.MENTION_LEXICONS_PATH)
+    return _classifier
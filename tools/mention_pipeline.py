@@ -0,0 +1,248 @@
+"""
+Streaming mention ingestion pipeline.
+Search results flow one at a time through generator stages
+(fetch → normalize → filter → dedup → score → top-K), so memory and latency
+grow with the number of mentions kept rather than the number of raw results.
+"""
+import heapq
+import itertools
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from tools.resilient_search import CircuitOpenError
+from tools.search_plans import QueryScheduler
+
+
+logger = logging.getLogger(__name__)
+
+Mention = Dict[str, Any]
+
+
+def fetch(
+    client: Any,
+    scheduler: QueryScheduler,
+    search_kwargs: Dict[str, Any],
+    max_workers: int = 5
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run search queries in concurrent waves and yield raw results as responses arrive.
+    
+    The scheduler picks each wave after the previous one has been consumed
+    downstream, so it can react to what was found. Stops once the circuit
+    breaker opens or the latency budget is spent; queries still in flight
+    at that point are abandoned.
+    
+    Yields:
+        Tuples of (query, raw search result)
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="search-query")
+    try:
+        wave = scheduler.next_wave()
+        while wave:
+            futures = {pool.submit(client.search, query=query, **search_kwargs): query for query in wave}
+            try:
+                for future in as_completed(futures, timeout=scheduler.remaining_latency()):
+                    query = futures[future]
+                    try:
+                        response = future.result()
+                    except CircuitOpenError:
+                        logger.warning("Tavily circuit breaker open, skipping remaining queries")
+                        scheduler.stop("circuit_open")
+                        return
+                    except Exception as e:
+                        logger.error(f"Error searching for '{query}': {e}")
+                        continue
+                    
+                    results = (response or {}).get("results", [])
+                    scheduler.record_results(len(results))
+                    for result in results:
+                        yield query, result
+            except FutureTimeoutError:
+                logger.warning("Search latency budget spent, abandoning in-flight queries")
+                scheduler.stop("max_latency")
+                return
+            
+            wave = scheduler.next_wave()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def normalize(
+    items: Iterable[Tuple[str, Dict[str, Any]]],
+    normalizer: Callable[[Dict[str, Any], str], Mention]
+) -> Iterator[Mention]:
+    """Convert raw search results into the mention schema, dropping malformed results."""
+    for query, result in items:
+        try:
+            yield normalizer(result, query)
+        except Exception as e:
+            logger.error(f"Error processing result: {e}")
+
+
+def filter_company(mentions: Iterable[Mention], company_name: str) -> Iterator[Mention]:
+    """Keep only mentions whose content names the company."""
+    needle = company_name.lower()
+    for mention in mentions:
+        if needle in mention.get("content", "").lower():
+            yield mention
+
+
+def mention_key(mention: Mention) -> str:
+    """Identity of a mention for deduplication: its normalized URL, else its content."""
+    url = str(mention.get("url", "")).strip().lower().split("#")[0].rstrip("/")
+    return url or mention.get("content", "")[:200]
+
+
+def dedup(mentions: Iterable[Mention], window: int = 256) -> Iterator[Mention]:
+    """
+    Drop mentions already seen among the last `window` unique keys.
+    
+    The window keeps memory bounded; repeats older than the window are
+    resolved by TopK, which keeps a single entry per key.
+    """
+    recent: "OrderedDict[str, None]" = OrderedDict()
+    for mention in mentions:
+        key = mention_key(mention)
+        if key in recent:
+            recent.move_to_end(key)
+            continue
+        recent[key] = None
+        if len(recent) > window:
+            recent.popitem(last=False)
+        yield mention
+
+
+def score(
+    mentions: Iterable[Mention],
+    scorer: Callable[[Mention], float] = lambda m: float(m.get("relevance_score", 0) or 0)
+) -> Iterator[Tuple[float, Mention]]:
+    """Pair each mention with its ranking score."""
+    for mention in mentions:
+        yield scorer(mention), mention
+
+
+class TopK:
+    """
+    Bounded min-heap holding the K highest-scoring mentions.
+    
+    Keeps at most one entry per mention key (the highest-scoring one). Among
+    equal scores, earlier mentions win, matching a stable descending sort.
+    """
+    
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, str, Mention]] = []
+        self._keys = set()
+        self._counter = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def push(self, item_score: float, mention: Mention) -> bool:
+        """
+        Offer a mention to the heap.
+        
+        Returns:
+            True if the mention is now among the top K
+        """
+        if self.k <= 0:
+            return False
+        
+        key = mention_key(mention)
+        entry = (item_score, -next(self._counter), key, mention)
+        
+        if key in self._keys:
+            for i, existing in enumerate(self._heap):
+                if existing[2] == key:
+                    if item_score <= existing[0]:
+                        return False
+                    self._heap[i] = entry
+                    heapq.heapify(self._heap)
+                    return True
+        
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            self._keys.discard(evicted[2])
+        else:
+            return False
+        
+        self._keys.add(key)
+        return True
+    
+    def items(self) -> List[Mention]:
+        """Mentions ordered from highest to lowest score."""
+        return [entry[3] for entry in sorted(self._heap, reverse=True)]
+
+
+class MentionPipeline:
+    """
+    Composes the ingestion stages for one search run.
+    
+    Accepted mentions can be streamed to `on_mention` as they arrive, while
+    only the current top K are held in memory.
+    """
+    
+    def __init__(
+        self,
+        client: Any,
+        normalizer: Callable[[Dict[str, Any], str], Mention],
+        top_k: int = 15,
+        max_workers: int = 5,
+        on_mention: Optional[Callable[[Mention], None]] = None
+    ):
+        self.client = client
+        self.normalizer = normalizer
+        self.top_k = top_k
+        self.max_workers = max_workers
+        self.on_mention = on_mention
+        self.stats = {"raw": 0, "accepted": 0}
+    
+    def stream(
+        self,
+        company_name: str,
+        queries: Union[List[str], QueryScheduler],
+        **search_kwargs: Any
+    ) -> Iterator[Mention]:
+        """Yield normalized, relevant, deduplicated mentions as search responses arrive."""
+        scheduler = queries if isinstance(queries, QueryScheduler) else QueryScheduler(queries)
+        
+        def _counted(items: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+            for item in items:
+                self.stats["raw"] += 1
+                yield item
+        
+        raw = _counted(fetch(self.client, scheduler, search_kwargs, self.max_workers))
+        mentions = dedup(filter_company(normalize(raw, self.normalizer), company_name), window=4 * max(self.top_k, 64))
+        for mention in mentions:
+            scheduler.observe(mention)
+            yield mention
+    
+    def run(
+        self,
+        company_name: str,
+        queries: Union[List[str], QueryScheduler],
+        **search_kwargs: Any
+    ) -> List[Mention]:
+        """
+        Run the pipeline to completion.
+        
+        Args:
+            company_name: Company the mentions must name
+            queries: Search queries to run concurrently, or a QueryScheduler
+                that issues them adaptively
+            **search_kwargs: Extra arguments for client.search
+            
+        Returns:
+            The top K mentions, highest score first
+        """
+        top = TopK(self.top_k)
+        for item_score, mention in score(self.stream(company_name, queries, **search_kwargs)):
+            self.stats["accepted"] += 1
+            if self.on_mention:
+                self.on_mention(mention)
+            top.push(item_score, mention)
+        return top.items()
@@ -0,0 +1,283 @@
+"""
+Resilient search client for Tavily API calls.
+Wraps TavilyClient with per-query deadlines, jittered retries, hedged requests
+and a circuit breaker so a single slow or failing query cannot stall the monitor stage.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, Optional
+
+from tavily.errors import (
+    BadRequestError,
+    ForbiddenError,
+    InvalidAPIKeyError,
+    MissingAPIKeyError,
+    UsageLimitExceededError,
+)
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Errors that will not go away by asking again
+NON_RETRYABLE_ERRORS = (
+    BadRequestError,
+    ForbiddenError,
+    InvalidAPIKeyError,
+    MissingAPIKeyError,
+    UsageLimitExceededError,
+)
+
+
+class SearchUnavailableError(Exception):
+    """Raised when a search cannot be answered and the caller should fall back."""
+
+
+class CircuitOpenError(SearchUnavailableError):
+    """Raised when the circuit breaker is open and calls are short-circuited."""
+
+
+class SearchTimeoutError(SearchUnavailableError):
+    """Raised when a query does not complete within its deadline."""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+    
+    CLOSED passes calls through, OPEN rejects them until the reset timeout
+    elapses, and HALF_OPEN lets a single probe call decide the next state.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """Current breaker state, moving OPEN to HALF_OPEN once the reset timeout passes."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+    
+    def allow_request(self) -> bool:
+        """Return True if a call may go through right now."""
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_ignored(self) -> None:
+        """End a call that says nothing about upstream health (e.g. a rejected request)."""
+        with self._lock:
+            self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failure and open the breaker once the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging delay."""
+    
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile of recorded latencies, or None if empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+_default_breaker: Optional[CircuitBreaker] = None
+_default_breaker_lock = threading.Lock()
+
+
+def get_tavily_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker shared by all Tavily search clients."""
+    global _default_breaker
+    with _default_breaker_lock:
+        if _default_breaker is None:
+            _default_breaker = CircuitBreaker(
+                failure_threshold=settings.TAVILY_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.TAVILY_BREAKER_RESET_SECONDS
+            )
+        return _default_breaker
+
+
+class ResilientSearchClient:
+    """
+    Fault-tolerant wrapper around a Tavily-compatible client.
+    
+    Every query gets an overall deadline. Within that deadline transient errors
+    are retried with full-jitter exponential backoff, and a duplicate (hedged)
+    request is issued when the first attempt runs past the observed p95 latency.
+    While the circuit breaker is open, calls fail immediately so the caller can
+    go straight to its fallback path.
+    """
+    
+    def __init__(
+        self,
+        client: Any,
+        deadline: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_enabled: Optional[bool] = None,
+        max_workers: int = 8
+    ):
+        self.client = client
+        self.deadline = deadline if deadline is not None else settings.TAVILY_QUERY_DEADLINE_SECONDS
+        self.max_retries = max_retries if max_retries is not None else settings.TAVILY_MAX_RETRIES
+        self.breaker = breaker or get_tavily_breaker()
+        self.hedge_enabled = settings.TAVILY_HEDGE_ENABLED if hedge_enabled is None else hedge_enabled
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tavily")
+    
+    def search(self, query: str, **kwargs) -> Dict[str, Any]:
+        """
+        Run a Tavily search with deadline, retries, hedging and circuit breaking.
+        
+        The breaker counts one failure per query once its retries are
+        exhausted; non-retryable client errors are not counted.
+        
+        Args:
+            query: Search query string
+            **kwargs: Extra arguments forwarded to the underlying client's search()
+            
+        Returns:
+            Raw Tavily response dictionary
+            
+        Raises:
+            CircuitOpenError: If the breaker is open
+            SearchTimeoutError: If the query deadline elapses
+            Exception: Non-retryable client errors are re-raised unchanged
+        """
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Tavily circuit breaker is open")
+        
+        deadline_at = time.monotonic() + self.deadline
+        last_error: Optional[Exception] = None
+        
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            try:
+                response = self._attempt(query, kwargs, remaining)
+                self.breaker.record_success()
+                return response
+            except NON_RETRYABLE_ERRORS:
+                # Client errors are not upstream failures and must not open the breaker
+                self.breaker.record_ignored()
+                raise
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Search attempt {attempt + 1} for '{query}' failed: {e}")
+                
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    # Other queries opened it meanwhile
+                    raise CircuitOpenError("Tavily circuit breaker opened") from e
+                
+                if attempt < self.max_retries:
+                    delay = self._backoff_delay(attempt)
+                    if time.monotonic() + delay >= deadline_at:
+                        break
+                    time.sleep(delay)
+        
+        # One failure per logical query, however many attempts it took
+        self.breaker.record_failure()
+        if isinstance(last_error, SearchTimeoutError) or last_error is None:
+            raise SearchTimeoutError(f"Query '{query}' exceeded its {self.deadline}s deadline")
+        raise last_error
+    
+    def _attempt(self, query: str, kwargs: Dict[str, Any], remaining: float) -> Dict[str, Any]:
+        """Run one attempt, hedging with a duplicate request past the p95 latency."""
+        started = time.monotonic()
+        call_kwargs = dict(kwargs, timeout=max(1, int(remaining + 0.999)))
+        futures = [self._executor.submit(self.client.search, query=query, **call_kwargs)]
+        submitted_at = {futures[0]: started}
+        
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None and hedge_delay < remaining:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                logger.info(f"Hedging search '{query}' after {hedge_delay:.2f}s")
+                hedge = self._executor.submit(self.client.search, query=query, **call_kwargs)
+                submitted_at[hedge] = time.monotonic()
+                futures.append(hedge)
+        
+        error: Optional[Exception] = None
+        pending = set(futures)
+        while pending:
+            timeout = remaining - (time.monotonic() - started)
+            if timeout <= 0:
+                break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self.latency.record(time.monotonic() - submitted_at[future])
+                    return future.result()
+                error = future.exception()
+        
+        if error is not None and not pending:
+            raise error
+        raise SearchTimeoutError(f"Query '{query}' timed out after {remaining:.1f}s")
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Return the delay after which to send a hedged request, or None."""
+        if not self.hedge_enabled or self.latency.count() < settings.TAVILY_HEDGE_MIN_SAMPLES:
+            return None
+        return self.latency.percentile(settings.TAVILY_HEDGE_PERCENTILE)
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        cap = min(settings.TAVILY_BACKOFF_MAX_SECONDS, settings.TAVILY_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        return random.uniform(0, cap)
@@ -0,0 +1,293 @@
+"""
+Search plans for company mention monitoring.
+A plan sets the queries, domains and budgets for one company (or a tier of
+companies). The QueryScheduler executes a plan in waves, expanding with extra
+queries when early results are dense with critical mentions and stopping
+early when they are sparse.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Dict, List, Optional, Set
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Mention types that count as critical when measuring result density
+CRITICAL_MENTION_TYPES = {"complaint", "negative"}
+
+_DEFAULT_DOMAINS = [
+    "twitter.com", "x.com", "reddit.com",
+    "news.ycombinator.com", "techcrunch.com",
+    "theverge.com", "arstechnica.com"
+]
+
+
+@dataclass
+class SearchPlan:
+    """Queries, domains and budgets for searching one company's mentions."""
+    tier: str = "standard"
+    queries: List[str] = field(default_factory=list)            # "{company}" is substituted
+    expansion_queries: List[str] = field(default_factory=list)  # Only issued when results are dense
+    include_domains: List[str] = field(default_factory=lambda: list(_DEFAULT_DOMAINS))
+    max_results: Optional[int] = None                           # Per query; defaults to SEARCH_MAX_RESULTS
+    max_queries: int = 8
+    max_latency_seconds: float = 12.0
+    wave_size: Optional[int] = None                             # Defaults to SEARCH_QUERY_CONCURRENCY
+    dense_threshold: float = 0.5                                # Critical share of results that triggers expansion
+    sparse_threshold: float = 0.1                               # Critical share below which searching stops
+    
+    def scheduler(self, company_name: str) -> "QueryScheduler":
+        """Build a scheduler that executes this plan for a company."""
+        return QueryScheduler(
+            queries=[q.format(company=company_name) for q in self.queries],
+            expansion_queries=[q.format(company=company_name) for q in self.expansion_queries],
+            wave_size=self.wave_size or settings.SEARCH_QUERY_CONCURRENCY,
+            max_queries=self.max_queries,
+            max_latency_seconds=self.max_latency_seconds,
+            dense_threshold=self.dense_threshold,
+            sparse_threshold=self.sparse_threshold
+        )
+    
+    def search_kwargs(self) -> Dict[str, Any]:
+        """Per-query arguments for the search client."""
+        return {
+            "max_results": self.max_results or settings.SEARCH_MAX_RESULTS,
+            "search_depth": "advanced",
+            "include_domains": self.include_domains
+        }
+
+
+# Built-in tiers. data/search_plans.json (SEARCH_PLANS_PATH) can override any
+# field per tier and assign companies to tiers or give them their own plan.
+DEFAULT_SEARCH_PLANS = {
+    "small": SearchPlan(
+        tier="small",
+        queries=["{company} complaints", "{company} reviews", "{company} problems"],
+        expansion_queries=["{company} customer service", "{company} refund"],
+        include_domains=_DEFAULT_DOMAINS + ["trustpilot.com"],
+        max_queries=5,
+        max_latency_seconds=8.0
+    ),
+    "standard": SearchPlan(
+        tier="standard",
+        queries=[
+            "{company} complaints",
+            "{company} negative feedback",
+            "{company} issues",
+            "{company} problems Twitter",
+            "{company} problems Reddit"
+        ],
+        expansion_queries=["{company} outage", "{company} bug", "{company} customer service"],
+        max_queries=8,
+        max_latency_seconds=12.0
+    ),
+    "enterprise": SearchPlan(
+        tier="enterprise",
+        queries=[
+            "{company} complaints",
+            "{company} negative feedback",
+            "{company} issues",
+            "{company} problems Twitter",
+            "{company} problems Reddit",
+            "{company} outage",
+            "{company} update broken",
+            "{company} customer service"
+        ],
+        expansion_queries=[
+            "{company} bug report",
+            "{company} recall",
+            "{company} security issue",
+            "{company} refund",
+            "{company} lawsuit",
+            "{company} boycott",
+            "{company} price increase",
+            "{company} down"
+        ],
+        include_domains=_DEFAULT_DOMAINS + ["cnbc.com", "reuters.com", "bloomberg.com", "engadget.com"],
+        max_results=10,
+        max_queries=16,
+        max_latency_seconds=15.0
+    ),
+}
+
+_PLAN_FIELDS = {f.name for f in fields(SearchPlan)}
+_overrides_lock = threading.Lock()
+_overrides: Optional[Dict[str, Any]] = None
+_unknown_tiers: Set[str] = set()
+
+
+def _load_overrides() -> Dict[str, Any]:
+    """Read the plan overrides file once per process."""
+    global _overrides
+    with _overrides_lock:
+        if _overrides is None:
+            _overrides = {"tiers": {}, "companies": {}}
+            path = settings.SEARCH_PLANS_PATH
+            if path and os.path.exists(path):
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    _overrides["tiers"] = data.get("tiers", {})
+                    _overrides["companies"] = {
+                        name.lower(): plan for name, plan in data.get("companies", {}).items()
+                    }
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to load search plans from {path}: {e}")
+        return _overrides
+
+
+def _apply(plan: SearchPlan, overrides: Dict[str, Any]) -> SearchPlan:
+    """Apply known SearchPlan fields from an overrides dict."""
+    changes = {key: value for key, value in overrides.items() if key in _PLAN_FIELDS}
+    return replace(plan, **changes) if changes else plan
+
+
+def get_search_plan(company_name: str) -> SearchPlan:
+    """
+    Resolve the search plan for a company.
+    
+    The company's tier comes from its entry in the plans file (or
+    SEARCH_DEFAULT_TIER); tier overrides and then company overrides are
+    applied on top of the built-in tier plan. A tier that is neither
+    built in nor defined in the plans file is logged (once) and replaced
+    by "standard".
+    
+    Args:
+        company_name: Company to search for
+        
+    Returns:
+        The effective SearchPlan
+    """
+    overrides = _load_overrides()
+    company = overrides["companies"].get(company_name.lower(), {})
+    tier = company.get("tier", settings.SEARCH_DEFAULT_TIER)
+    if tier not in DEFAULT_SEARCH_PLANS and tier not in overrides["tiers"]:
+        with _overrides_lock:
+            first = tier not in _unknown_tiers
+            _unknown_tiers.add(tier)
+        if first:
+            logger.warning(f"Unknown search tier {tier!r} for {company_name}; using the standard plan")
+        tier = "standard"
+    
+    plan = DEFAULT_SEARCH_PLANS.get(tier, DEFAULT_SEARCH_PLANS["standard"])
+    plan = _apply(plan, overrides["tiers"].get(tier, {}))
+    plan = _apply(plan, company)
+    if company.get("extra_queries"):
+        plan = replace(plan, queries=plan.queries + list(company["extra_queries"]))
+    return replace(plan, tier=tier)
+
+
+class QueryScheduler:
+    """
+    Issues a plan's queries in waves within query and latency budgets.
+    
+    After each wave the share of critical mentions among the results seen so
+    far decides what happens next: below `sparse_threshold` searching stops,
+    at or above `dense_threshold` expansion queries are added once the initial
+    queries are used up.
+    """
+    
+    def __init__(
+        self,
+        queries: List[str],
+        expansion_queries: Optional[List[str]] = None,
+        wave_size: Optional[int] = None,
+        max_queries: Optional[int] = None,
+        max_latency_seconds: Optional[float] = None,
+        dense_threshold: Optional[float] = None,
+        sparse_threshold: Optional[float] = None
+    ):
+        self._pending = list(queries)
+        self._expansion = list(expansion_queries or [])
+        self.wave_size = wave_size or max(1, len(self._pending))
+        self.max_queries = max_queries
+        self.max_latency_seconds = max_latency_seconds
+        self.dense_threshold = dense_threshold
+        self.sparse_threshold = sparse_threshold
+        self.issued = 0
+        self.expanded = 0
+        self.results = 0
+        self.critical = 0
+        self.stopped: Optional[str] = None
+        self._started = time.monotonic()
+    
+    def record_results(self, count: int) -> None:
+        """Count raw results returned by a query."""
+        self.results += count
+    
+    def observe(self, mention: Dict[str, Any]) -> None:
+        """Count an accepted mention towards the critical density."""
+        if mention.get("mention_type") in CRITICAL_MENTION_TYPES:
+            self.critical += 1
+    
+    def density(self) -> float:
+        """Share of raw results that turned out to be critical mentions."""
+        return self.critical / self.results if self.results else 0.0
+    
+    def remaining_latency(self) -> Optional[float]:
+        """Seconds left in the latency budget, or None if unbounded."""
+        if not self.max_latency_seconds:
+            return None
+        return max(0.0, self.max_latency_seconds - (time.monotonic() - self._started))
+    
+    def stop(self, reason: str) -> None:
+        """Stop issuing queries."""
+        self.stopped = self.stopped or reason
+    
+    def next_wave(self) -> List[str]:
+        """
+        Decide the next batch of queries to run concurrently.
+        
+        Returns:
+            Queries to issue now (empty when searching is finished)
+        """
+        if self.stopped:
+            return []
+        
+        budget = self.wave_size
+        if self.max_queries is not None:
+            budget = min(budget, self.max_queries - self.issued)
+        if budget <= 0:
+            self.stop("max_queries")
+            return []
+        if self.remaining_latency() == 0.0:
+            self.stop("max_latency")
+            return []
+        
+        if self.issued:
+            density = self.density()
+            if self.sparse_threshold is not None and density < self.sparse_threshold:
+                self.stop("sparse_results")
+                return []
+            if not self._pending:
+                if self._expansion and self.dense_threshold is not None and density >= self.dense_threshold:
+                    wave = self._expansion[:budget]
+                    del self._expansion[:budget]
+                    self.expanded += len(wave)
+                    self.issued += len(wave)
+                    return wave
+                self.stop("plan_complete")
+                return []
+        
+        wave = self._pending[:budget]
+        del self._pending[:budget]
+        self.issued += len(wave)
+        if not wave:
+            self.stop("plan_complete")
+        return wave
+    
+    def summary(self) -> Dict[str, Any]:
+        """How the plan was executed, for logging and tool output."""
+        return {
+            "queries_issued": self.issued,
+            "expansion_queries": self.expanded,
+            "results_seen": self.results,
+            "critical_density": round(self.density(), 2),
+            "stopped": self.stopped or "plan_complete"
+        }
@@ -0,0 +1,301 @@
+"""
+Mention source adapters.
+Every source yields mentions in the same schema (platform, content, title,
+url, published_date, relevance_score, search_query, mention_type), so the
+search tool and the ingestion pipeline do not care where mentions come from:
+Tavily, a JSONL/CSV replay file, a directory of exported feeds, or the
+bundled mock data.
+"""
+import csv
+import glob
+import io
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from tools.classification import extract_platform, get_mention_classifier
+from tools.mention_pipeline import Mention, MentionPipeline, TopK, dedup, filter_company, score
+from tools.search_plans import get_search_plan
+
+
+logger = logging.getLogger(__name__)
+
+
+def to_mention(record: Dict[str, Any], query: str = "") -> Mention:
+    """
+    Normalize a raw record into the mention schema.
+    
+    Accepts Tavily results (`score`) as well as exported mention records;
+    missing platform and mention type are derived from the URL and content.
+    """
+    url = str(record.get("url") or "")
+    content = str(record.get("content") or record.get("text") or "")
+    relevance = record.get("relevance_score", record.get("score", 0.5))
+    try:
+        relevance = float(relevance)
+    except (TypeError, ValueError):
+        relevance = 0.5
+    
+    return {
+        "platform": record.get("platform") or extract_platform(url),
+        "content": content[:500],  # Limit content length
+        "title": str(record.get("title") or ""),
+        "url": url,
+        "published_date": str(record.get("published_date") or record.get("timestamp") or ""),
+        "relevance_score": relevance,
+        "search_query": record.get("search_query") or query,
+        "mention_type": record.get("mention_type") or get_mention_classifier().classify(content)
+    }
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Stream records from a JSONL, CSV or JSON file.
+    
+    Args:
+        path: File to read
+        offset: Byte offset to resume from (JSONL and CSV only)
+        
+    Yields:
+        Tuples of (record, byte offset after the record). Incomplete trailing
+        lines are left for the next read.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    
+    if extension == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("mentions") or data.get("fallback_mentions") or []
+        size = os.path.getsize(path)
+        for record in data:
+            if isinstance(record, dict):
+                yield record, size
+        return
+    
+    with open(path, "rb") as f:
+        header = None
+        if extension == ".csv":
+            header_line = f.readline()
+            if not header_line.endswith(b"\n"):
+                return
+            header = next(csv.reader([header_line.decode("utf-8-sig")]))
+            offset = max(offset, f.tell())
+        f.seek(offset)
+        
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            text = line.decode("utf-8").strip()
+            if not text:
+                continue
+            try:
+                if header is not None:
+                    yield dict(zip(header, next(csv.reader(io.StringIO(text))))), offset
+                else:
+                    record = json.loads(text)
+                    if isinstance(record, dict):
+                        yield record, offset
+            except (ValueError, StopIteration) as e:
+                logger.warning(f"Skipping malformed record in {path}: {e}")
+
+
+class MentionSource(ABC):
+    """Interface for anything that can supply mentions of a company."""
+    
+    name: str = "source"
+    
+    @abstractmethod
+    def fetch(self, company_name: str) -> Tuple[List[Mention], Dict[str, Any]]:
+        """
+        Collect the top mentions of a company.
+        
+        Returns:
+            Tuple of (mentions ordered by relevance, metadata for the tool output)
+        """
+    
+    def _top(self, company_name: str, records: Iterator[Dict[str, Any]]) -> Tuple[List[Mention], Dict[str, Any]]:
+        """Run file records through filter → dedup → score → top-K."""
+        stats = {"raw": 0, "accepted": 0}
+        
+        def _normalized() -> Iterator[Mention]:
+            for record in records:
+                stats["raw"] += 1
+                yield to_mention(record)
+        
+        top = TopK(settings.SEARCH_TOP_K)
+        window = 4 * max(settings.SEARCH_TOP_K, 64)
+        for item_score, mention in score(dedup(filter_company(_normalized(), company_name), window=window)):
+            stats["accepted"] += 1
+            top.push(item_score, mention)
+        return top.items(), stats
+
+
+class TavilySource(MentionSource):
+    """Real internet search through Tavily, following the company's search plan."""
+    
+    name = "tavily_real_internet"
+    
+    def __init__(self, client: Any):
+        self.client = client
+    
+    def fetch(self, company_name: str) -> Tuple[List[Mention], Dict[str, Any]]:
+        # Queries, domains and budgets come from the company's search plan;
+        # queries are issued in adaptive waves
+        plan = get_search_plan(company_name)
+        scheduler = plan.scheduler(company_name)
+        
+        # Stream results through normalize → filter → dedup → top-K
+        pipeline = MentionPipeline(
+            self.client,
+            normalizer=to_mention,
+            top_k=settings.SEARCH_TOP_K,
+            max_workers=settings.SEARCH_QUERY_CONCURRENCY
+        )
+        mentions = pipeline.run(company_name, scheduler, **plan.search_kwargs())
+        return mentions, {"search_plan": {"tier": plan.tier, **scheduler.summary()}, **pipeline.stats}
+
+
+class ReplaySource(MentionSource):
+    """Replays mentions from a JSONL or CSV export (or a JSON list)."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"replay:{os.path.basename(path)}"
+    
+    def fetch(self, company_name: str) -> Tuple[List[Mention], Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            logger.warning(f"Replay file {self.path} not found")
+            return [], {}
+        records = (record for record, _ in read_records(self.path))
+        return self._top(company_name, records)
+
+
+class DirectorySource(MentionSource):
+    """
+    Reads exported social feeds dropped into a directory.
+    
+    fetch() scans every matching file; follow() tails the directory and yields
+    mentions from new files and appended lines as they arrive.
+    """
+    
+    def __init__(self, directory: str, pattern: str = "*.jsonl"):
+        self.directory = directory
+        self.pattern = pattern
+        self.name = f"directory:{directory}"
+        self._offsets: Dict[str, int] = {}
+    
+    def _files(self) -> List[str]:
+        files = []
+        for part in self.pattern.split(","):
+            files.extend(glob.glob(os.path.join(self.directory, part.strip())))
+        return sorted(set(files), key=lambda path: (os.path.getmtime(path), path))
+    
+    def fetch(self, company_name: str) -> Tuple[List[Mention], Dict[str, Any]]:
+        def _records() -> Iterator[Dict[str, Any]]:
+            for path in self._files():
+                for record, _ in read_records(path):
+                    yield record
+        
+        mentions, stats = self._top(company_name, _records())
+        return mentions, {**stats, "files": len(self._files())}
+    
+    def poll(self) -> Iterator[Mention]:
+        """Yield mentions added since the previous poll."""
+        for path in self._files():
+            offset = self._offsets.get(path, 0)
+            if path.endswith(".json") and offset:
+                continue
+            for record, offset in read_records(path, offset):
+                self._offsets[path] = offset
+                yield to_mention(record)
+    
+    def follow(self, poll_interval: float = 1.0, should_stop=lambda: False) -> Iterator[Mention]:
+        """Yield new mentions as feed files are created or appended to."""
+        while not should_stop():
+            found = False
+            for mention in self.poll():
+                found = True
+                yield mention
+            if not found:
+                time.sleep(poll_interval)
+
+
+class MockDataSource(MentionSource):
+    """Bundled sample mentions (data/mock_data.json), used when no other source is available."""
+    
+    name = "fallback_mock_data"
+    
+    def __init__(self, path: str = "data/mock_data.json"):
+        self.path = path
+    
+    def fetch(self, company_name: str) -> Tuple[List[Mention], Dict[str, Any]]:
+        mentions, stats = [], {}
+        if os.path.exists(self.path):
+            mentions, stats = self._top(company_name, (record for record, _ in read_records(self.path)))
+        if not mentions:
+            mentions = self._templated_mentions(company_name)
+        return mentions, stats
+    
+    @staticmethod
+    def _templated_mentions(company_name: str) -> List[Mention]:
+        """Generic sample mentions for companies without bundled data."""
+        return [
+            {
+                "platform": "Twitter/X",
+                "content": f"Anyone else having issues with {company_name} app crashing today? Really frustrating when trying to get work done.",
+                "title": f"{company_name} App Issues",
+                "url": f"https://twitter.com/user123/status/fake",
+                "published_date": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
+                "relevance_score": 0.8,
+                "search_query": f"{company_name} complaints",
+                "mention_type": "complaint"
+            },
+            {
+                "platform": "Reddit",
+                "content": f"PSA: {company_name} seems to be having server issues. Multiple users reporting the same problem in our office.",
+                "title": f"{company_name} Server Issues Discussion",
+                "url": f"https://reddit.com/r/tech/comments/fake",
+                "published_date": (datetime.utcnow() - timedelta(hours=4)).isoformat(),
+                "relevance_score": 0.7,
+                "search_query": f"{company_name} issues",
+                "mention_type": "complaint"
+            },
+            {
+                "platform": "Hacker News",
+                "content": f"The latest update from {company_name} introduced a critical bug that's affecting productivity. When will they fix this?",
+                "title": f"{company_name} Update Bug Report",
+                "url": f"https://news.ycombinator.com/item?id=fake",
+                "published_date": (datetime.utcnow() - timedelta(hours=6)).isoformat(),
+                "relevance_score": 0.9,
+                "search_query": f"{company_name} problems",
+                "mention_type": "complaint"
+            }
+        ]
+
+
+def create_mention_source(tavily_client: Optional[Any] = None) -> MentionSource:
+    """
+    Build the source selected by MENTION_SOURCE.
+    
+    Args:
+        tavily_client: Search client for the "tavily" source
+        
+    Returns:
+        The configured source; the mock data source if Tavily is selected
+        but no client is available
+    """
+    source = settings.MENTION_SOURCE
+    if source == "replay":
+        return ReplaySource(settings.MENTION_REPLAY_PATH)
+    if source == "directory":
+        return DirectorySource(settings.MENTION_WATCH_DIR, settings.MENTION_WATCH_PATTERN)
+    if source == "mock" or tavily_client is None:
+        return MockDataSource()
+    return TavilySource(tavily_client)
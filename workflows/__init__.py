@@ -1,9 +1,21 @@
 """
 Workflow orchestration for the Customer Sentiment Alert System.
 Defines both Fast (3 agents) and Deep (5 agents) analysis workflows.
+
+Workflow classes are imported lazily so that importing this package (for
+example to use the lightweight execution helpers) does not pull in CrewAI.
 """
+from importlib import import_module
+
+_LAZY_EXPORTS = {
+    "FastWorkflow": "workflows.fast_workflow",
+    "DeepWorkflow": "workflows.deep_workflow",
+}
+
+__all__ = ["FastWorkflow", "DeepWorkflow"]
 
-from .fast_workflow import FastWorkflow
-from .deep_workflow import DeepWorkflow
 
-__all__ = ["FastWorkflow", "DeepWorkflow"]
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
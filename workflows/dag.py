@@ -0,0 +1,168 @@
+"""
+Stage dependency DAG for workflow execution.
+Describes which stages depend on which, derives the parallel levels and
+critical path, and maps them onto CrewAI's async task execution. Also turns
+recorded stage completion times into a Gantt-style timeline.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+# Deep workflow dependencies: priority ranking and pattern investigation only
+# need monitor and sentiment output, so they run side by side.
+DEEP_STAGE_DEPENDENCIES = {
+    "monitor": [],
+    "sentiment": ["monitor"],
+    "priority": ["monitor", "sentiment"],
+    "investigation": ["monitor", "sentiment"],
+    "response": ["monitor", "sentiment", "priority", "investigation"],
+}
+
+
+class StageDAG:
+    """
+    Directed acyclic graph of workflow stages.
+    
+    `dependencies` maps each stage to the stages whose output it needs, and
+    `order` is the stage order used to lay tasks out for CrewAI.
+    """
+    
+    def __init__(self, dependencies: Dict[str, List[str]], order: List[str]):
+        self.dependencies = {stage: list(dependencies[stage]) for stage in order}
+        self.order = list(order)
+    
+    @classmethod
+    def sequential(cls, order: List[str]) -> "StageDAG":
+        """A chain where every stage depends on all stages before it."""
+        return cls({stage: order[:i] for i, stage in enumerate(order)}, order)
+    
+    def restrict(self, stages: Iterable[str]) -> "StageDAG":
+        """Drop stages not in `stages`, along with the edges that point at them."""
+        keep = set(stages)
+        order = [stage for stage in self.order if stage in keep]
+        return StageDAG(
+            {stage: [d for d in self.dependencies[stage] if d in keep] for stage in order},
+            order
+        )
+    
+    def levels(self) -> List[List[str]]:
+        """Group stages into levels; every stage in a level only depends on earlier levels."""
+        depth: Dict[str, int] = {}
+        for stage in self.order:
+            deps = self.dependencies[stage]
+            depth[stage] = 1 + max((depth[d] for d in deps), default=-1)
+        
+        levels: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for stage in self.order:
+            levels[depth[stage]].append(stage)
+        return levels
+    
+    def execution_order(self) -> List[str]:
+        """Stages flattened level by level, which is the order tasks are handed to CrewAI."""
+        return [stage for level in self.levels() for stage in level]
+    
+    def async_stages(self) -> Set[str]:
+        """
+        Stages CrewAI should run with async_execution=True.
+        
+        Stages sharing a level run concurrently; the next synchronous task
+        waits for all of them. A crew may not end on several async tasks, so
+        the final level always runs synchronously.
+        """
+        levels = self.levels()
+        return {
+            stage
+            for level in levels[:-1] if len(level) > 1
+            for stage in level
+        }
+    
+    def critical_path(self, estimates: Dict[str, float]) -> Tuple[List[str], float]:
+        """
+        Longest estimated path through the DAG.
+        
+        Returns:
+            Tuple of (stages on the critical path, estimated seconds)
+        """
+        finish: Dict[str, float] = {}
+        via: Dict[str, str] = {}
+        for stage in self.execution_order():
+            deps = self.dependencies[stage]
+            start = 0.0
+            for dep in deps:
+                if finish[dep] > start:
+                    start, via[stage] = finish[dep], dep
+            finish[stage] = start + estimates.get(stage, 0.0)
+        
+        if not finish:
+            return [], 0.0
+        
+        stage = max(finish, key=finish.get)
+        total = finish[stage]
+        path = [stage]
+        while stage in via:
+            stage = via[stage]
+            path.append(stage)
+        return list(reversed(path)), total
+
+
+def stage_timeline(
+    order: List[str],
+    async_stages: Set[str],
+    finished_at: Dict[str, float],
+    started_at: float
+) -> List[Dict[str, float]]:
+    """
+    Reconstruct when each stage ran from its completion time.
+    
+    CrewAI launches consecutive async tasks together as soon as the previous
+    synchronous task finishes, and a synchronous task starts once every
+    pending async task is done, so start times follow from completion times.
+    
+    Args:
+        order: Stages in the order they were handed to CrewAI
+        async_stages: Stages that ran with async_execution=True
+        finished_at: Monotonic completion time per finished stage
+        started_at: Monotonic time the crew was kicked off
+        
+    Returns:
+        List of {"stage", "start", "end", "duration"} in seconds from kickoff
+    """
+    timeline = []
+    cursor = started_at
+    pending: List[str] = []
+    
+    for stage in order:
+        if stage not in finished_at:
+            break
+        if stage in async_stages:
+            start = cursor
+            pending.append(stage)
+        else:
+            if pending:
+                cursor = max(cursor, *(finished_at[p] for p in pending))
+                pending = []
+            start = cursor
+            cursor = finished_at[stage]
+        
+        timeline.append({
+            "stage": stage,
+            "start": round(start - started_at, 2),
+            "end": round(finished_at[stage] - started_at, 2),
+            "duration": round(finished_at[stage] - start, 2)
+        })
+    
+    return timeline
+
+
+def format_gantt(timeline: List[Dict[str, float]], width: int = 40) -> str:
+    """Render a stage timeline as a text Gantt chart."""
+    if not timeline:
+        return ""
+    
+    total = max(entry["end"] for entry in timeline) or 1.0
+    lines = []
+    for entry in timeline:
+        begin = int(round(entry["start"] / total * width))
+        end = max(begin + 1, int(round(entry["end"] / total * width)))
+        bar = " " * begin + "█" * (end - begin) + " " * (width - end)
+        lines.append(f"{entry['stage']:<14}|{bar}| {entry['start']:6.1f}s - {entry['end']:6.1f}s")
+    return "\n".join(lines)
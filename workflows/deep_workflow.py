@@ -4,204 +4,484 @@ Provides thorough sentiment analysis in 25-35 seconds using all 5 agents for com
 """
 import time
 import json
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from crewai import Task, Crew, Process
-from langchain_openai import ChatOpenAI
 
 from agents.monitor_agent import create_monitor_agent
 from agents.sentiment_analyzer import create_sentiment_analyzer
 from agents.priority_ranker import create_priority_ranker
 from agents.context_investigator import create_context_investigator
 from agents.response_coordinator import create_response_coordinator
+from agents.routing import attach_router, get_model_router
+from tools.tavily_search import TavilyCompanySearchTool
+from analytics import MentionClusterer, PriorityEngine, extract_mentions
 from config import settings
+from workflows.dag import DEEP_STAGE_DEPENDENCIES, StageDAG, format_gantt, stage_timeline
+from workflows.memory import ScopedMemoryRegistry
+from workflows.planning import COMPANY_PLACEHOLDER, StaticPlanner
+from workflows.indexing import attach_mention_index, record_insights
+from workflows.sentiment_routing import SentimentRouting
+from runtime.clients import get_client_registry
+from runtime.deadline import Deadline, DeadlineExceeded
+from workflows.execution import (
+    WORKFLOW_STAGES,
+    StageRecorder,
+    attach_output_sink,
+    build_partial_results,
+    finish_run,
+    inject_context,
+    inject_restored,
+    kickoff_with_deadline,
+    open_run,
+    plan_stages,
+    run_tool_stage,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class DeepWorkflow:
     """
     Deep 5-agent workflow for comprehensive sentiment analysis.
     
-    Workflow: Monitor → Sentiment Analyzer → Priority Ranker → Context Investigator → Response Coordinator
+    Workflow: Monitor → Sentiment Analyzer → (Priority Ranker ∥ Context Investigator) → Response Coordinator
     Expected Time: 25-35 seconds
     Use Case: Comprehensive analysis for strategic decision making
     """
     
-    def __init__(self):
-        """Initialize the deep workflow with all 5 agents."""
-        # Create shared LLM instance
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.3
-        )
+    # Stage order and rough per-stage timing used for deadline planning.
+    # Optional stages are dropped in the listed order when the budget is tight.
+    STAGES = WORKFLOW_STAGES["deep"]
+    OPTIONAL_STAGES = ["investigation", "priority"]
+    STAGE_ESTIMATES = {
+        "monitor": 5.0,
+        "sentiment": 6.0,
+        "priority": 6.0,
+        "investigation": 7.0,
+        "response": 8.0
+    }
+    
+    def __init__(self, memory_registry: Optional[ScopedMemoryRegistry] = None):
+        """
+        Initialize the deep workflow with all 5 agents.
+        
+        Args:
+            memory_registry: Crew memory scopes to share with other instances
+                of this workflow. Defaults to a registry of its own.
+        """
+        # Shared LLM instance on the process-wide pooled OpenAI client
+        self.llm = get_client_registry().chat_model(temperature=0.3)
         
-        # Initialize all agents
-        self.monitor_agent = create_monitor_agent(self.llm)
+        # Initialize all agents. The search tool is shared so the monitor stage
+        # can also call it directly (MONITOR_MODE=tool)
+        self.search_tool = TavilyCompanySearchTool()
+        self.monitor_agent = create_monitor_agent(self.llm, search_tool=self.search_tool)
         self.sentiment_analyzer = create_sentiment_analyzer(self.llm)
         self.priority_ranker = create_priority_ranker(self.llm)
         self.context_investigator = create_context_investigator(self.llm)
         self.response_coordinator = create_response_coordinator(self.llm)
+        
+        # Per-stage model, token and timeout routing with p95 SLO fallback
+        self.router = get_model_router()
+        attach_router({
+            "monitor": self.monitor_agent,
+            "sentiment": self.sentiment_analyzer,
+            "priority": self.priority_ranker,
+            "investigation": self.context_investigator,
+            "response": self.response_coordinator
+        }, self.router)
+        
+        # Stage dependencies; priority ranking and investigation run concurrently
+        # unless DEEP_PARALLEL_STAGES is off
+        if settings.DEEP_PARALLEL_STAGES:
+            dependencies = DEEP_STAGE_DEPENDENCIES
+        else:
+            dependencies = StageDAG.sequential(self.STAGES).dependencies
+        if settings.INVESTIGATION_MODE == "clusters":
+            # The investigator gets cluster summaries instead of the raw monitor output
+            dependencies = {
+                **dependencies,
+                "investigation": [dep for dep in dependencies["investigation"] if dep != "monitor"]
+            }
+        self.dag = StageDAG(dependencies, self.STAGES)
+        
+        # Deterministic 0-100 business impact scoring (PRIORITY_MODE local/hybrid)
+        self.priority_engine = PriorityEngine()
+        
+        # Local mention clustering for the investigation stage (INVESTIGATION_MODE=clusters)
+        self.clusterer = MentionClusterer.from_settings()
+        
+        # Bounded, scoped crew memory shared across runs of this workflow
+        self.memory_registry = memory_registry or ScopedMemoryRegistry()
+        
+        # Precompiled execution plan replacing the per-run planning LLM call
+        self.planner = StaticPlanner(
+            lambda: list(zip(self.dag.execution_order(), self.create_tasks(COMPANY_PLACEHOLDER))),
+            llm=self.llm
+        )
     
-    def create_tasks(self, company_name: str) -> list[Task]:
+    def create_tasks(
+        self,
+        company_name: str,
+        stages: Optional[List[str]] = None,
+        recorder: Optional[StageRecorder] = None
+    ) -> list[Task]:
         """
         Create the comprehensive task sequence for deep workflow.
         
         Args:
             company_name: Name of the company to analyze (e.g., "Apple", "Tesla")
+            stages: Stages to include. Defaults to all stages.
+            recorder: Optional recorder that captures each stage's output
             
         Returns:
-            List of tasks configured for the deep workflow
+            List of tasks configured for the deep workflow, in DAG execution order
         """
+        include = set(stages or self.STAGES)
+        callback = recorder.callback if recorder else (lambda stage, **_: None)
+        dag = self.dag.restrict(include)
+        async_stages = dag.async_stages()
+        built: Dict[str, Task] = {}
+        
+        def wiring(stage: str) -> Dict[str, Any]:
+            """Context, async flag and callback for a stage, derived from the DAG."""
+            return {
+                "context": [built[dep] for dep in dag.dependencies[stage]] or None,
+                "async_execution": stage in async_stages,
+                "callback": callback(stage, check_deadline=stage not in async_stages)
+            }
         
         # Task 1: Search real internet for company mentions
-        monitor_task = Task(
-            description=(
-                f"Conduct comprehensive real internet search for {company_name} mentions using Tavily API. "
-                f"Search across Twitter, Reddit, news sites, review platforms, and forums for actual customer "
-                f"feedback from the last 24-48 hours. Focus on complaints, issues, negative sentiment, and "
-                f"any potential PR risks. Gather 10-20 high-quality real mentions with platform details, "
-                f"content, URLs, timestamps, and relevance scores. This must be REAL internet data."
-            ),
-            expected_output=(
-                "Comprehensive JSON dataset of real internet mentions including: platform, user, content, "
-                "URL, timestamp, relevance_score, mention_type. Minimum 10-20 mentions from actual sources "
-                "with detailed metadata for further analysis."
-            ),
-            agent=self.monitor_agent,
-            output_file=f"outputs/monitor_{company_name.lower()}_deep.json"
-        )
+        if "monitor" in include:
+            monitor_task = Task(
+                description=(
+                    f"Conduct comprehensive real internet search for {company_name} mentions using Tavily API. "
+                    f"Search across Twitter, Reddit, news sites, review platforms, and forums for actual customer "
+                    f"feedback from the last 24-48 hours. Focus on complaints, issues, negative sentiment, and "
+                    f"any potential PR risks. Gather 10-20 high-quality real mentions with platform details, "
+                    f"content, URLs, timestamps, and relevance scores. This must be REAL internet data."
+                ),
+                expected_output=(
+                    "Comprehensive JSON dataset of real internet mentions including: platform, user, content, "
+                    "URL, timestamp, relevance_score, mention_type. Minimum 10-20 mentions from actual sources "
+                    "with detailed metadata for further analysis."
+                ),
+                agent=self.monitor_agent,
+                **wiring("monitor")
+            )
+            built["monitor"] = monitor_task
         
         # Task 2: Detailed sentiment analysis
-        sentiment_task = Task(
-            description=(
-                f"Perform detailed sentiment analysis on all {company_name} mentions from Monitor Agent. "
-                f"For each mention, calculate: precise sentiment score (-1 to +1), urgency level (0-10), "
-                f"user influence estimation based on platform and engagement, viral potential assessment "
-                f"(Low/Medium/High), and emotional intensity. Identify patterns in negative sentiment and "
-                f"flag all mentions with sentiment < -0.5 as critical. Provide detailed reasoning for scores."
-            ),
-            expected_output=(
-                "Detailed sentiment analysis with each mention scored for: sentiment_score, urgency_level, "
-                "user_influence, viral_potential, emotional_intensity, critical_flag, and detailed reasoning. "
-                "Include aggregate statistics, sentiment trends, and top critical issues requiring attention."
-            ),
-            agent=self.sentiment_analyzer,
-            context=[monitor_task],
-            output_file=f"outputs/sentiment_{company_name.lower()}_deep.json"
-        )
+        if "sentiment" in include:
+            sentiment_task = Task(
+                description=(
+                    f"Perform detailed sentiment analysis on all {company_name} mentions from Monitor Agent. "
+                    f"For each mention, calculate: precise sentiment score (-1 to +1), urgency level (0-10), "
+                    f"user influence estimation based on platform and engagement, viral potential assessment "
+                    f"(Low/Medium/High), and emotional intensity. Identify patterns in negative sentiment and "
+                    f"flag all mentions with sentiment < -0.5 as critical. Provide detailed reasoning for scores."
+                ),
+                expected_output=(
+                    "Detailed sentiment analysis with each mention scored for: sentiment_score, urgency_level, "
+                    "user_influence, viral_potential, emotional_intensity, critical_flag, and detailed reasoning. "
+                    "Include aggregate statistics, sentiment trends, and top critical issues requiring attention."
+                ),
+                agent=self.sentiment_analyzer,
+                **wiring("sentiment")
+            )
+            built["sentiment"] = sentiment_task
         
         # Task 3: Priority ranking with business impact scoring
-        priority_task = Task(
-            description=(
-                f"Rank all {company_name} issues by business impact using comprehensive scoring system. "
-                f"Score each issue (0-100 points): User Influence (0-30), Sentiment Severity (0-25), "
-                f"Viral Potential (0-25), Frequency/Pattern (0-20). Classify as: Critical (71-100), "
-                f"High (51-70), Medium (31-50), Low (0-30). Provide rationale for each score and "
-                f"identify which issues pose the greatest business risk if left unaddressed."
-            ),
-            expected_output=(
-                "Prioritized ranking of all issues with business impact scores, classification levels, "
-                "detailed scoring rationale, and risk assessment. Include recommended response timeline "
-                "for each priority level and identification of top 3-5 most critical issues."
-            ),
-            agent=self.priority_ranker,
-            context=[monitor_task, sentiment_task],
-            output_file=f"outputs/priority_{company_name.lower()}_deep.json"
-        )
+        if "priority" in include:
+            priority_task = Task(
+                description=(
+                    f"Rank all {company_name} issues by business impact using comprehensive scoring system. "
+                    f"Score each issue (0-100 points): User Influence (0-30), Sentiment Severity (0-25), "
+                    f"Viral Potential (0-25), Frequency/Pattern (0-20). Classify as: Critical (71-100), "
+                    f"High (51-70), Medium (31-50), Low (0-30). Provide rationale for each score and "
+                    f"identify which issues pose the greatest business risk if left unaddressed."
+                ),
+                expected_output=(
+                    "Prioritized ranking of all issues with business impact scores, classification levels, "
+                    "detailed scoring rationale, and risk assessment. Include recommended response timeline "
+                    "for each priority level and identification of top 3-5 most critical issues."
+                ),
+                agent=self.priority_ranker,
+                **wiring("priority")
+            )
+            built["priority"] = priority_task
         
         # Task 4: Pattern investigation and root cause analysis
-        investigation_task = Task(
-            description=(
-                f"Investigate patterns in {company_name} customer feedback to determine if issues are "
-                f"isolated incidents or systemic problems. Analyze: frequency patterns, user overlap, "
-                f"geographic distribution, platform correlation, and growth trends. Identify root causes "
-                f"from real mention content. Determine if this represents growing dissatisfaction that "
-                f"could escalate into a major crisis or if these are manageable isolated complaints."
-            ),
-            expected_output=(
-                "Comprehensive pattern analysis report including: issue categorization (isolated vs systemic), "
-                "frequency trends, correlation analysis, root cause identification, growth projection, "
-                "and assessment of crisis escalation risk. Include specific evidence from real mentions."
-            ),
-            agent=self.context_investigator,
-            context=[monitor_task, sentiment_task, priority_task],
-            output_file=f"outputs/investigation_{company_name.lower()}_deep.json"
-        )
+        if "investigation" in include:
+            investigation_task = Task(
+                description=(
+                    f"Investigate patterns in {company_name} customer feedback to determine if issues are "
+                    f"isolated incidents or systemic problems. Analyze: frequency patterns, user overlap, "
+                    f"geographic distribution, platform correlation, and growth trends. Identify root causes "
+                    f"from real mention content. Determine if this represents growing dissatisfaction that "
+                    f"could escalate into a major crisis or if these are manageable isolated complaints."
+                ),
+                expected_output=(
+                    "Comprehensive pattern analysis report including: issue categorization (isolated vs systemic), "
+                    "frequency trends, correlation analysis, root cause identification, growth projection, "
+                    "and assessment of crisis escalation risk. Include specific evidence from real mentions."
+                ),
+                agent=self.context_investigator,
+                **wiring("investigation")
+            )
+            built["investigation"] = investigation_task
         
         # Task 5: Comprehensive response coordination with detailed email previews
-        response_task = Task(
-            description=(
-                f"Create comprehensive response strategy with detailed email previews for {company_name} "
-                f"based on complete analysis. Generate 3-5 email previews for: Engineering (technical issues), "
-                f"PR/Marketing (reputation management), Customer Support (response templates), and "
-                f"Management (strategic decisions). Each email should include: appropriate recipient, "
-                f"priority-based subject line, full message body with evidence from real mentions, "
-                f"specific recommended actions, timeline expectations, and success metrics. "
-                f"DO NOT send actual emails - create detailed previews only."
-            ),
-            expected_output=(
-                "Complete response strategy with 3-5 detailed email previews formatted for immediate use. "
-                "Include email headers, priority levels, full professional content, specific evidence, "
-                "actionable recommendations, and implementation timelines. Format for easy review and approval."
-            ),
-            agent=self.response_coordinator,
-            context=[monitor_task, sentiment_task, priority_task, investigation_task],
-            output_file=f"outputs/emails_{company_name.lower()}_deep.txt"
-        )
+        if "response" in include:
+            response_task = Task(
+                description=(
+                    f"Create comprehensive response strategy with detailed email previews for {company_name} "
+                    f"based on complete analysis. Generate 3-5 email previews for: Engineering (technical issues), "
+                    f"PR/Marketing (reputation management), Customer Support (response templates), and "
+                    f"Management (strategic decisions). Each email should include: appropriate recipient, "
+                    f"priority-based subject line, full message body with evidence from real mentions, "
+                    f"specific recommended actions, timeline expectations, and success metrics. "
+                    f"DO NOT send actual emails - create detailed previews only."
+                ),
+                expected_output=(
+                    "Complete response strategy with 3-5 detailed email previews formatted for immediate use. "
+                    "Include email headers, priority levels, full professional content, specific evidence, "
+                    "actionable recommendations, and implementation timelines. Format for easy review and approval."
+                ),
+                agent=self.response_coordinator,
+                **wiring("response")
+            )
+            built["response"] = response_task
         
-        return [monitor_task, sentiment_task, priority_task, investigation_task, response_task]
+        return [built[stage] for stage in dag.execution_order()]
     
-    def run(self, company_name: str) -> Dict[str, Any]:
+    def _attach_local_priority(
+        self,
+        company_name: str,
+        recorder: StageRecorder,
+        staged_tasks: Dict[str, Task]
+    ) -> None:
+        """
+        Score priorities locally as soon as the monitor stage finishes, or
+        right away when its output was restored from a checkpoint.
+        
+        In "local" mode the report stands in for the priority stage and is
+        handed to the stages that depend on it. In "hybrid" mode it is given to
+        the Priority Ranker, which then only writes the narrative.
+        
+        Args:
+            company_name: Company being analyzed
+            recorder: Recorder of the current run
+            staged_tasks: Tasks of the current run keyed by stage
+        """
+        def _score(monitor_output: str) -> None:
+            mentions = extract_mentions(monitor_output)
+            if not mentions:
+                logger.warning(f"No structured mentions in monitor output for {company_name}; skipping local priority scoring")
+                return
+            
+            report = self.priority_engine.report_json(company_name, mentions)
+            if settings.PRIORITY_MODE == "local":
+                recorder.record("priority", report)
+                dependents = [
+                    task for stage, task in staged_tasks.items()
+                    if "priority" in self.dag.dependencies[stage]
+                ]
+                inject_context(dependents, "Priority ranking (computed by the local scoring engine)", report)
+            elif "priority" in staged_tasks:
+                inject_context(
+                    [staged_tasks["priority"]],
+                    "Precomputed priority scores. Use these exact scores and levels; do not recompute them. "
+                    "Explain the ranking, assess the business risk and highlight the top issues",
+                    report
+                )
+        
+        if "monitor" in recorder.restored:
+            _score(recorder.restored["monitor"])
+        else:
+            recorder.on_complete("monitor", _score)
+    
+    def _attach_clusters(self, company_name: str, recorder: StageRecorder, investigation_task: Task) -> None:
+        """
+        Cluster the monitor's mentions locally and hand the summaries to the investigator.
+        
+        If the monitor output has no structured mentions, the investigator gets
+        the raw output instead.
+        
+        Args:
+            company_name: Company being analyzed
+            recorder: Recorder of the current run
+            investigation_task: Investigation task of the current run
+        """
+        def _cluster(monitor_output: str) -> None:
+            mentions = extract_mentions(monitor_output)
+            if not mentions:
+                logger.warning(f"No structured mentions in monitor output for {company_name}; investigator gets the raw output")
+                inject_context([investigation_task], f"Real internet mentions of {company_name}", monitor_output)
+                return
+            
+            inject_context(
+                [investigation_task],
+                f"Mention clusters (computed locally from all {len(mentions)} mentions): size, cross-platform "
+                f"spread, top terms and representative mentions per cluster. Base the isolated vs systemic "
+                f"assessment on these clusters",
+                self.clusterer.summary_json(company_name, mentions)
+            )
+        
+        if "monitor" in recorder.restored:
+            _cluster(recorder.restored["monitor"])
+        else:
+            recorder.on_complete("monitor", _cluster)
+    
+    def _routing_records(self, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """Model routing decisions and latencies of a run's tasks."""
+        return self.router.pop_records(tasks) if self.router else []
+    
+    def run(
+        self,
+        company_name: str,
+        deadline: Optional[Deadline] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute the comprehensive deep workflow for a given company.
         
         Args:
             company_name: Name of the company to analyze
+            deadline: Optional request deadline. Optional stages are dropped up
+                front when the budget is tight, and if it runs out mid-run the
+                remaining stages are skipped and partial results are returned.
+            resume_run_id: Run id of an earlier partial or failed run to
+                resume; its completed stages are not run again
             
         Returns:
             Dictionary containing comprehensive workflow results and metadata
         """
         start_time = time.time()
+        deadline = deadline or Deadline()
+        # Resume the earlier run a retry names, if it can be resumed
+        recorder = open_run("deep", company_name, deadline, resume_run_id)
+        attach_output_sink(recorder, "deep", company_name)
+        attach_mention_index(recorder, company_name)
+        restored = list(recorder.restored)
+        local_priority = settings.PRIORITY_MODE in ("local", "hybrid")
+        estimates = dict(self.STAGE_ESTIMATES)
+        if settings.PRIORITY_MODE == "local":
+            estimates["priority"] = 0.0
+        for stage in restored:
+            estimates[stage] = 0.0
+        stages, skipped = plan_stages(
+            self.STAGES,
+            self.OPTIONAL_STAGES,
+            estimates,
+            deadline,
+            total_estimate=lambda chosen: self.dag.restrict(chosen).critical_path(estimates)[1]
+        )
+        
+        # Stages restored from a checkpoint are not run again. With local
+        # priority scoring the priority stage needs no LLM call, and in tool
+        # mode the monitor stage runs the search without the agent
+        tool_monitor = settings.MONITOR_MODE == "tool" and "monitor" not in restored
+        run_stages = [
+            stage for stage in stages
+            if stage not in restored and not (stage == "priority" and settings.PRIORITY_MODE == "local")
+        ]
+        dag = self.dag.restrict(run_stages)
+        order = dag.execution_order()
+        crew_order = [stage for stage in order if not (stage == "monitor" and tool_monitor)]
+        memory_key = self.memory_registry.scope_key(company_name)
+        tasks: List[Task] = []
+        routing = SentimentRouting(recorder, company_name)
+        status = "error"
         
         try:
-            # Create tasks for this company
-            tasks = self.create_tasks(company_name)
+            # Create tasks for this company, downgraded to fit the deadline
+            tasks = self.create_tasks(company_name, stages=crew_order, recorder=recorder)
+            staged_tasks = dict(zip(crew_order, tasks))
+            inject_restored(
+                recorder,
+                lambda done: [task for stage, task in staged_tasks.items() if done in self.dag.dependencies[stage]]
+            )
+            if local_priority and "priority" in stages and "priority" not in restored:
+                self._attach_local_priority(company_name, recorder, staged_tasks)
+            if settings.INVESTIGATION_MODE == "clusters" and "investigation" in staged_tasks:
+                self._attach_clusters(company_name, recorder, staged_tasks["investigation"])
+            # Confident mentions are scored by the local sentiment model
+            routing.attach(staged_tasks.get("sentiment"))
+            
+            # Inject the cached static plan instead of planning with the LLM every run
+            if settings.DEEP_PLANNING_MODE == "static":
+                self.planner.apply(list(staged_tasks.items()), company_name)
             
-            # Create and configure crew for deep analysis
-            crew = Crew(
-                agents=[
-                    self.monitor_agent,
-                    self.sentiment_analyzer, 
-                    self.priority_ranker,
-                    self.context_investigator,
-                    self.response_coordinator
-                ],
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True,
-                memory=True,  # Enable memory for complex analysis
-                max_rpm=20,   # Slightly lower rate for deeper processing
-                planning=True  # Enable planning for complex workflow
+            recorder.mark_started()
+            if tool_monitor:
+                run_tool_stage(
+                    recorder,
+                    "monitor",
+                    lambda: self.search_tool._run(company_name),
+                    [task for stage, task in staged_tasks.items() if "monitor" in self.dag.dependencies[stage]],
+                    f"Real internet mentions of {company_name} (JSON, collected by the monitor stage)"
+                )
+            tasks = routing.take_over(
+                tasks,
+                staged_tasks.get("sentiment"),
+                [task for stage, task in staged_tasks.items() if "sentiment" in self.dag.dependencies[stage]]
             )
             
-            # Execute the comprehensive workflow
-            result = crew.kickoff()
+            if tasks:
+                # Create and configure crew for deep analysis
+                crew = Crew(
+                    agents=[task.agent for task in tasks],
+                    tasks=tasks,
+                    process=Process.sequential,
+                    verbose=True,
+                    **self.memory_registry.crew_kwargs(memory_key),  # Bounded memory scoped per company/request
+                    max_rpm=20,   # Slightly lower rate for deeper processing
+                    planning=settings.DEEP_PLANNING_MODE == "llm"  # Static plans are injected above instead
+                )
+                
+                # Execute the comprehensive workflow within the request deadline
+                result = kickoff_with_deadline(crew, deadline, recorder)
+            else:
+                # Every stage was completed by an earlier attempt of this run
+                result = recorder.completed["response"]
             
             end_time = time.time()
             processing_time = round(end_time - start_time, 2)
+            timeline = stage_timeline(order, dag.async_stages(), recorder.finished_at, recorder.started_at)
+            logger.info(f"🕒 Deep workflow stage timeline for {company_name}:\n{format_gantt(timeline)}")
             
             # Parse and structure the comprehensive results
             workflow_results = {
-                "status": "success",
+                # Optional stages dropped up front leave the run partial, and resumable
+                "status": "partial" if skipped else "success",
+                "run_id": recorder.run_id,
                 "workflow": "deep",
                 "company": company_name,
-                "agents_used": 5,
+                "agents_used": len(crew_order),
                 "processing_time": f"{processing_time} seconds",
                 "execution_timestamp": datetime.utcnow().isoformat(),
                 "tasks_completed": len(tasks),
+                "stages_completed": [stage for stage in stages if stage in order or stage in recorder.completed],
+                "stages_skipped": skipped,
+                "partial": bool(skipped),
+                "partial_reason": (
+                    f"Optional stages dropped to fit the deadline: {', '.join(skipped)}" if skipped else None
+                ),
+                "deadline": deadline.to_dict(),
                 "crew_output": str(result),
-                "analysis_depth": "comprehensive",
+                "stage_timeline": timeline,
+                "critical_path": dag.critical_path(estimates)[0],
+                "priority_mode": settings.PRIORITY_MODE,
+                "monitor_mode": settings.MONITOR_MODE,
+                "investigation_mode": settings.INVESTIGATION_MODE,
+                "model_routing": self._routing_records(tasks),
+                "resumed_stages": restored,
+                "sentiment_routing": routing.to_dict(),
+                "analysis_depth": "comprehensive" if not skipped else "reduced",
                 "performance": {
                     "target_time": "25-35 seconds",
                     "actual_time": processing_time,
@@ -216,18 +496,47 @@ class DeepWorkflow:
                 ]
             }
             
+            status = workflow_results["status"]
             return workflow_results
             
+        except DeadlineExceeded as e:
+            processing_time = round(time.time() - start_time, 2)
+            results = build_partial_results(
+                workflow="deep",
+                company_name=company_name,
+                stages=self.STAGES,
+                recorder=recorder,
+                processing_time=processing_time,
+                reason=str(e),
+                skipped=skipped
+            )
+            results["stage_timeline"] = stage_timeline(
+                order, dag.async_stages(), recorder.finished_at, recorder.started_at
+            )
+            results["analysis_depth"] = "partial"
+            results["model_routing"] = self._routing_records(tasks)
+            results["resumed_stages"] = restored
+            status = "partial"
+            return results
+            
         except Exception as e:
             end_time = time.time()
             processing_time = round(end_time - start_time, 2)
             
             return {
                 "status": "error",
+                "run_id": recorder.run_id,
                 "workflow": "deep",
                 "company": company_name,
                 "error": str(e),
                 "processing_time": f"{processing_time} seconds",
                 "execution_timestamp": datetime.utcnow().isoformat(),
                 "analysis_depth": "failed"
-            }
\ No newline at end of file
+            }
+        
+        finally:
+            # Completed runs are closed; partial and failed ones stay resumable
+            finish_run(recorder, status)
+            record_insights(recorder, "deep", company_name, status)
+            if memory_key.startswith("request:"):
+                self.memory_registry.release(memory_key)
\ No newline at end of file
@@ -0,0 +1,407 @@
+"""
+Shared execution helpers for the Fast and Deep workflows.
+Handles deadline-aware stage planning, per-stage output capture,
+checkpoint/resume of completed stages and bounded crew kickoff so a run
+can return partial results.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from runtime.checkpoints import get_checkpoint_store
+from runtime.deadline import Deadline, DeadlineExceeded
+from runtime.output_sink import get_output_sink, new_run_id
+
+
+logger = logging.getLogger(__name__)
+
+
+# Stage order for each workflow. Kept here (rather than only on the workflow
+# classes) so callers can reason about stages without importing CrewAI.
+WORKFLOW_STAGES = {
+    "fast": ["monitor", "sentiment", "response"],
+    "deep": ["monitor", "sentiment", "priority", "investigation", "response"],
+}
+
+
+def plan_stages(
+    stages: List[str],
+    optional_stages: List[str],
+    estimates: Dict[str, float],
+    deadline: Deadline,
+    total_estimate: Optional[Callable[[List[str]], float]] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Choose which stages to run within the remaining request budget.
+    
+    Optional stages are dropped in the order given until the estimated
+    total fits. Required stages are always kept; if even those do not fit,
+    the run proceeds and is cut short at a stage boundary instead.
+    
+    Args:
+        stages: All stages of the workflow, in execution order
+        optional_stages: Stages that may be skipped, in drop order
+        estimates: Estimated seconds per stage
+        deadline: Request deadline
+        total_estimate: Optional function estimating the wall time of a set of
+            stages. Defaults to the sum of their estimates (sequential run).
+        
+    Returns:
+        Tuple of (stages to run, stages skipped)
+    """
+    selected = list(stages)
+    skipped = []
+    total_estimate = total_estimate or (lambda chosen: sum(estimates.get(s, 0.0) for s in chosen))
+    
+    for stage in optional_stages:
+        if deadline.can_fit(total_estimate(selected)):
+            break
+        if stage in selected:
+            selected.remove(stage)
+            skipped.append(stage)
+    
+    return selected, skipped
+
+
+class StageRecorder:
+    """
+    Collects completed stage outputs through Task callbacks.
+    
+    After recording a stage, the callback checks the deadline and raises
+    DeadlineExceeded so that stages which have not started yet are skipped.
+    Completion times are recorded too, for stage timelines. Stages restored
+    from a checkpoint count as completed but have no completion time.
+    
+    Once the run is cancelled (its response was returned without waiting
+    for the crew), outputs the crew still produces are dropped: they reach
+    neither listeners nor hooks. Hooks registered with on_crew_exit() run
+    once that abandoned crew has exited.
+    """
+    
+    def __init__(self, deadline: Deadline, run_id: Optional[str] = None):
+        self.deadline = deadline
+        self.run_id = run_id or new_run_id()
+        self.completed: Dict[str, str] = {}
+        self.restored: Dict[str, str] = {}
+        self.finished_at: Dict[str, float] = {}
+        self.checkpoints: Any = None
+        self.started_at = time.monotonic()
+        self.cancelled = False
+        self._crew_running = False
+        self._exit_hooks: List[Callable[[], None]] = []
+        self._hooks: Dict[str, List[Callable[[str], None]]] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+    
+    def on_complete(self, stage: str, hook: Callable[[str], None]) -> None:
+        """Run `hook(output)` when a stage completes, before the deadline check."""
+        self._hooks.setdefault(stage, []).append(hook)
+    
+    def subscribe(self, listener: Callable[[str, str], None]) -> None:
+        """Call `listener(stage, output)` for every recorded stage output."""
+        self._listeners.append(listener)
+    
+    def cancel(self) -> None:
+        """Stop recording: the run's response is final, later stage outputs are dropped."""
+        with self._lock:
+            self.cancelled = True
+    
+    def crew_started(self) -> None:
+        """Mark the crew as running in a thread the run may stop waiting for."""
+        with self._lock:
+            self._crew_running = True
+    
+    def crew_exited(self) -> None:
+        """Mark the crew as finished and run the on_crew_exit hooks."""
+        with self._lock:
+            self._crew_running = False
+            hooks, self._exit_hooks = self._exit_hooks, []
+        for hook in hooks:
+            hook()
+    
+    def on_crew_exit(self, hook: Callable[[], None]) -> None:
+        """Run `hook()` once the crew has exited, right away if it is not running."""
+        with self._lock:
+            if self._crew_running:
+                self._exit_hooks.append(hook)
+                return
+        hook()
+    
+    @property
+    def crew_running(self) -> bool:
+        return self._crew_running
+    
+    def record(self, stage: str, output: Any) -> None:
+        """Record a stage output, including stages computed outside the crew."""
+        output = str(output)
+        with self._lock:
+            if self.cancelled:
+                logger.info(f"Dropping {stage} output of cancelled run {self.run_id}")
+                return
+            self.completed[stage] = output
+            self.finished_at[stage] = time.monotonic()
+        for listener in self._listeners:
+            listener(stage, output)
+    
+    def restore(self, stage: str, output: str) -> None:
+        """Mark a stage completed by an earlier attempt of this run, without notifying listeners."""
+        with self._lock:
+            self.completed[stage] = output
+            self.restored[stage] = output
+    
+    def mark_started(self) -> None:
+        """Record the moment the crew is kicked off."""
+        self.started_at = time.monotonic()
+    
+    def callback(self, stage: str, check_deadline: bool = True) -> Callable[[Any], None]:
+        """
+        Build the Task callback for a stage.
+        
+        Args:
+            stage: Stage name
+            check_deadline: Raise DeadlineExceeded once the budget is spent.
+                Disable for async tasks: CrewAI does not propagate exceptions
+                from async task threads, so raising there would stall the crew.
+        """
+        def _on_complete(output: Any) -> None:
+            if self.cancelled:
+                # Abandoned by kickoff_with_deadline; stop the crew at this boundary
+                if check_deadline:
+                    raise DeadlineExceeded(f"Run {self.run_id} was cancelled")
+                return
+            self.record(stage, output)
+            if self.cancelled:
+                return
+            for hook in self._hooks.get(stage, []):
+                hook(str(output))
+            if check_deadline:
+                self.deadline.check(f"after {stage} stage")
+        return _on_complete
+    
+    def combined_output(self) -> str:
+        """Concatenate completed stage outputs in completion order."""
+        with self._lock:
+            return "\n\n".join(
+                f"=== {stage.upper()} ===\n{output}" for stage, output in self.completed.items()
+            )
+
+
+def open_run(
+    workflow: str,
+    company_name: str,
+    deadline: Deadline,
+    resume_run_id: Optional[str] = None
+) -> StageRecorder:
+    """
+    Start a run, or resume the earlier run `resume_run_id` when a retry names one.
+    
+    Outputs of stages the earlier attempt completed are in `recorder.restored`;
+    every stage completed from now on is checkpointed. A run that can't be
+    resumed (unknown, finished, expired or possibly still executing) starts
+    over under a new run id. Without a checkpoint store
+    (CHECKPOINT_ENABLED=false) this is a plain new recorder.
+    """
+    store = get_checkpoint_store()
+    if store is None:
+        return StageRecorder(deadline)
+    
+    try:
+        run_id = store.claim(resume_run_id, workflow, company_name) if resume_run_id else None
+        recorder = StageRecorder(deadline, run_id=run_id)
+        if run_id:
+            for stage, output in store.load_stages(run_id).items():
+                recorder.restore(stage, output)
+            logger.info(f"Resuming {workflow} run {run_id} for {company_name}: {list(recorder.restored)} already done")
+        else:
+            store.start_run(recorder.run_id, workflow, company_name)
+    except Exception as e:
+        logger.error(f"Checkpoint store unavailable, running {workflow} for {company_name} without checkpoints: {e}")
+        return StageRecorder(deadline)
+    
+    def _checkpoint(stage: str, output: str) -> None:
+        try:
+            store.save_stage(recorder.run_id, stage, output)
+        except Exception as e:
+            logger.error(f"Failed to checkpoint {stage} stage of run {recorder.run_id}: {e}")
+    
+    recorder.checkpoints = store
+    recorder.subscribe(_checkpoint)
+    return recorder
+
+
+def finish_run(recorder: StageRecorder, status: str) -> None:
+    """
+    Record how a checkpointed run ended; only successful runs are not resumed.
+    
+    A run whose crew is still running after its response was returned is
+    recorded as "abandoned", and becomes "partial" (resumable) once the
+    crew exits.
+    """
+    store = recorder.checkpoints
+    if store is None:
+        return
+    
+    def _settle() -> None:
+        try:
+            store.settle_abandoned(recorder.run_id)
+        except Exception as e:
+            logger.error(f"Failed to release abandoned run {recorder.run_id}: {e}")
+    
+    try:
+        if status != "success" and recorder.crew_running:
+            store.finish_run(recorder.run_id, "abandoned")
+            recorder.on_crew_exit(_settle)
+        else:
+            store.finish_run(recorder.run_id, "completed" if status == "success" else status)
+    except Exception as e:
+        logger.error(f"Failed to record the end of run {recorder.run_id}: {e}")
+
+
+def inject_restored(recorder: StageRecorder, dependents: Callable[[str], List[Any]]) -> None:
+    """Hand the outputs of restored stages to the tasks that depend on them."""
+    for stage, output in recorder.restored.items():
+        inject_context(dependents(stage), f"Output of the {stage} stage (completed earlier in this run)", output)
+
+
+def attach_output_sink(recorder: StageRecorder, workflow: str, company_name: str) -> None:
+    """Persist every stage output of a run through the process-wide output sink."""
+    sink = get_output_sink()
+    if sink.enabled:
+        recorder.subscribe(
+            lambda stage, output: sink.submit(recorder.run_id, workflow, company_name, stage, output)
+        )
+
+
+def inject_context(tasks: List[Any], title: str, text: str) -> None:
+    """
+    Append precomputed stage output to the descriptions of downstream tasks.
+    
+    Must be called before those tasks start, e.g. from a StageRecorder hook
+    on an upstream stage.
+    """
+    for task in tasks:
+        task.description = f"{task.description}\n\n{title}:\n{text}"
+
+
+def run_tool_stage(
+    recorder: StageRecorder,
+    stage: str,
+    run: Callable[[], str],
+    dependents: List[Any],
+    title: str
+) -> str:
+    """
+    Run a deterministic stage outside the crew, without an LLM round trip.
+    
+    The output is handed to the dependent tasks as context and then recorded
+    like a crew stage, so on_complete hooks run and the deadline is checked
+    before the crew is kicked off.
+    
+    Args:
+        recorder: Recorder of the current run
+        stage: Stage name
+        run: Produces the stage output, e.g. a direct tool call
+        dependents: Tasks that would have received the stage as context
+        title: Heading for the injected output
+        
+    Returns:
+        The stage output
+    """
+    output = run()
+    inject_context(dependents, title, output)
+    recorder.callback(stage)(output)
+    return output
+
+
+def build_partial_results(
+    workflow: str,
+    company_name: str,
+    stages: List[str],
+    recorder: StageRecorder,
+    processing_time: float,
+    reason: str,
+    skipped: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Build the result dictionary for a run that was cut short by its deadline.
+    
+    Args:
+        workflow: Workflow name ("fast" or "deep")
+        company_name: Company that was analyzed
+        stages: All stages of the workflow, in execution order
+        recorder: Recorder holding the outputs of completed stages
+        processing_time: Seconds spent before giving up
+        reason: Why the run was cut short
+        skipped: Stages dropped before the run started
+        
+    Returns:
+        Dictionary with the completed stage outputs, marked as partial.
+        "crew_abandoned" is True while the crew cut off at the deadline is
+        still running, so its workflow instance must not be reused.
+    """
+    completed = [stage for stage in stages if stage in recorder.completed]
+    
+    return {
+        "status": "partial",
+        "partial": True,
+        "run_id": recorder.run_id,
+        "workflow": workflow,
+        "company": company_name,
+        "processing_time": f"{processing_time} seconds",
+        "execution_timestamp": datetime.utcnow().isoformat(),
+        "tasks_completed": len(completed),
+        "stages_completed": completed,
+        "stages_skipped": [stage for stage in stages if stage not in completed],
+        "stages_dropped_for_deadline": skipped or [],
+        "partial_reason": reason,
+        "deadline": recorder.deadline.to_dict(),
+        "crew_abandoned": recorder.crew_running,
+        "crew_output": recorder.combined_output()
+    }
+
+
+def kickoff_with_deadline(crew: Any, deadline: Deadline, recorder: Optional[StageRecorder] = None) -> Any:
+    """
+    Run crew.kickoff() and stop waiting once the deadline passes.
+    
+    An LLM call in progress cannot be cancelled, so the crew keeps running
+    in its worker thread until its next stage boundary. The recorder is
+    cancelled first: from then on the crew's stage outputs are dropped
+    (no checkpoints, sink writes, indexing or labels) and the next stage
+    callback aborts the crew.
+    
+    Raises:
+        DeadlineExceeded: If the budget runs out before kickoff returns
+    """
+    if not deadline.bounded:
+        return crew.kickoff()
+    
+    future: Future = Future()
+    
+    def _target() -> None:
+        result, error = None, None
+        try:
+            result = crew.kickoff()
+        except BaseException as e:
+            error = e
+        # Before the waiter wakes up, so a completed crew is never seen as still running
+        if recorder is not None:
+            recorder.crew_exited()
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+    
+    if recorder is not None:
+        recorder.crew_started()
+    threading.Thread(target=_target, name="crew-kickoff", daemon=True).start()
+    
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        if recorder is not None:
+            recorder.cancel()
+        raise DeadlineExceeded(f"Request deadline of {deadline.budget_seconds}s exceeded during crew execution")
@@ -4,16 +4,32 @@ Provides quick sentiment analysis in 10-15 seconds using Monitor, Sentiment Anal
 """
 import time
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from crewai import Task, Crew, Process
-from langchain_openai import ChatOpenAI
 
 from agents.monitor_agent import create_monitor_agent
 from agents.sentiment_analyzer import create_sentiment_analyzer
 from agents.response_coordinator import create_response_coordinator
+from agents.routing import attach_router, get_model_router
+from tools.tavily_search import TavilyCompanySearchTool
 from config import settings
+from runtime.clients import get_client_registry
+from runtime.deadline import Deadline, DeadlineExceeded
+from workflows.execution import (
+    WORKFLOW_STAGES,
+    StageRecorder,
+    attach_output_sink,
+    build_partial_results,
+    finish_run,
+    inject_restored,
+    kickoff_with_deadline,
+    open_run,
+    run_tool_stage,
+)
+from workflows.indexing import attach_mention_index, record_insights
+from workflows.sentiment_routing import SentimentRouting
 
 
 class FastWorkflow:
@@ -25,121 +41,193 @@ class FastWorkflow:
     Use Case: Quick analysis for immediate response needs
     """
     
+    # Stage order, used to report which stages a partial run skipped
+    STAGES = WORKFLOW_STAGES["fast"]
+    
     def __init__(self):
         """Initialize the fast workflow with required agents."""
-        # Create shared LLM instance
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL_NAME,
-            api_key=settings.OPENAI_API_KEY,
-            temperature=0.3
-        )
+        # Shared LLM instance on the process-wide pooled OpenAI client
+        self.llm = get_client_registry().chat_model(temperature=0.3)
         
-        # Initialize agents
-        self.monitor_agent = create_monitor_agent(self.llm)
+        # Initialize agents. The search tool is shared so the monitor stage
+        # can also call it directly (MONITOR_MODE=tool)
+        self.search_tool = TavilyCompanySearchTool()
+        self.monitor_agent = create_monitor_agent(self.llm, search_tool=self.search_tool)
         self.sentiment_analyzer = create_sentiment_analyzer(self.llm)
-        self.response_coordinator = create_response_coordinator(self.llm)
+        self.response_coordinator = create_response_coordinator(
+            self.llm,
+            departments=["engineering", "pr", "support"]
+        )
+        
+        # Per-stage model, token and timeout routing with p95 SLO fallback
+        self.router = get_model_router()
+        attach_router({
+            "monitor": self.monitor_agent,
+            "sentiment": self.sentiment_analyzer,
+            "response": self.response_coordinator
+        }, self.router)
     
-    def create_tasks(self, company_name: str) -> list[Task]:
+    def create_tasks(
+        self,
+        company_name: str,
+        recorder: Optional[StageRecorder] = None,
+        stages: Optional[List[str]] = None
+    ) -> list[Task]:
         """
         Create the task sequence for fast workflow.
         
         Args:
             company_name: Name of the company to analyze (e.g., "Apple", "Tesla")
+            recorder: Optional recorder that captures each stage's output
+            stages: Stages to include. Defaults to all stages.
             
         Returns:
             List of tasks configured for the fast workflow
         """
+        include = set(stages or self.STAGES)
+        callback = recorder.callback if recorder else (lambda stage: None)
         
         # Task 1: Search real internet for company mentions
-        monitor_task = Task(
-            description=(
-                f"Search the real internet for recent mentions of {company_name} using Tavily API. "
-                f"Focus on finding actual customer complaints, issues, and negative sentiment from "
-                f"Twitter, Reddit, news sites, and review platforms from the last 24-48 hours. "
-                f"Return structured data with platform, content, URLs, timestamps, and relevance scores. "
-                f"This should be REAL internet data, not mock data."
-            ),
-            expected_output=(
-                "JSON formatted data containing real internet mentions of the company including: "
-                "platform name, content text, URLs, publication dates, relevance scores, and mention types. "
-                "Minimum 5-15 real mentions from actual internet sources."
-            ),
-            agent=self.monitor_agent,
-            output_file=f"outputs/monitor_{company_name.lower()}_fast.json"
-        )
+        monitor_task = None
+        if "monitor" in include:
+            monitor_task = Task(
+                description=(
+                    f"Search the real internet for recent mentions of {company_name} using Tavily API. "
+                    f"Focus on finding actual customer complaints, issues, and negative sentiment from "
+                    f"Twitter, Reddit, news sites, and review platforms from the last 24-48 hours. "
+                    f"Return structured data with platform, content, URLs, timestamps, and relevance scores. "
+                    f"This should be REAL internet data, not mock data."
+                ),
+                expected_output=(
+                    "JSON formatted data containing real internet mentions of the company including: "
+                    "platform name, content text, URLs, publication dates, relevance scores, and mention types. "
+                    "Minimum 5-15 real mentions from actual internet sources."
+                ),
+                agent=self.monitor_agent,
+                callback=callback("monitor")
+            )
         
         # Task 2: Analyze sentiment of real mentions
-        sentiment_task = Task(
-            description=(
-                f"Analyze the sentiment of real {company_name} mentions from the Monitor Agent. "
-                f"For each mention, provide: sentiment score (-1 to +1), urgency level (0-10), "
-                f"user influence estimation, and viral potential (Low/Medium/High). "
-                f"Flag any mentions with sentiment < -0.5 as 'critical'. "
-                f"Focus on the most negative and potentially damaging mentions."
-            ),
-            expected_output=(
-                "JSON formatted analysis with each mention including: "
-                "sentiment_score, urgency_level, user_influence, viral_potential, critical_flag, "
-                "and reasoning for the assessment. Include summary statistics and top critical issues."
-            ),
-            agent=self.sentiment_analyzer,
-            context=[monitor_task],
-            output_file=f"outputs/sentiment_{company_name.lower()}_fast.json"
-        )
+        sentiment_task = None
+        if "sentiment" in include:
+            sentiment_task = Task(
+                description=(
+                    f"Analyze the sentiment of real {company_name} mentions from the Monitor Agent. "
+                    f"For each mention, provide: sentiment score (-1 to +1), urgency level (0-10), "
+                    f"user influence estimation, and viral potential (Low/Medium/High). "
+                    f"Flag any mentions with sentiment < -0.5 as 'critical'. "
+                    f"Focus on the most negative and potentially damaging mentions."
+                ),
+                expected_output=(
+                    "JSON formatted analysis with each mention including: "
+                    "sentiment_score, urgency_level, user_influence, viral_potential, critical_flag, "
+                    "and reasoning for the assessment. Include summary statistics and top critical issues."
+                ),
+                agent=self.sentiment_analyzer,
+                context=[task for task in [monitor_task] if task] or None,
+                callback=callback("sentiment")
+            )
         
         # Task 3: Create email previews for critical issues
-        response_task = Task(
-            description=(
-                f"Based on the sentiment analysis of {company_name} mentions, create email previews "
-                f"for the most critical issues. Generate 1-3 email previews showing what WOULD be sent to: "
-                f"1) Engineering team (for technical issues), "
-                f"2) PR team (for reputation management), "
-                f"3) Support team (for customer response templates). "
-                f"Each email should include appropriate recipient, subject line, priority level, "
-                f"issue summary, evidence from real mentions, and recommended actions. "
-                f"DO NOT actually send emails - only create previews."
-            ),
-            expected_output=(
-                "Formatted email previews showing exactly what would be sent to different departments. "
-                "Include email headers (To, Subject, Priority), full message bodies with evidence "
-                "from real mentions, recommended actions, and formatting for easy review. "
-                "Maximum 3 email previews focusing on the most critical issues."
-            ),
-            agent=self.response_coordinator,
-            context=[monitor_task, sentiment_task],
-            output_file=f"outputs/emails_{company_name.lower()}_fast.txt"
-        )
+        response_task = None
+        if "response" in include:
+            response_task = Task(
+                description=(
+                    f"Based on the sentiment analysis of {company_name} mentions, create email previews "
+                    f"for the most critical issues. Generate 1-3 email previews showing what WOULD be sent to: "
+                    f"1) Engineering team (for technical issues), "
+                    f"2) PR team (for reputation management), "
+                    f"3) Support team (for customer response templates). "
+                    f"Each email should include appropriate recipient, subject line, priority level, "
+                    f"issue summary, evidence from real mentions, and recommended actions. "
+                    f"DO NOT actually send emails - only create previews."
+                ),
+                expected_output=(
+                    "Formatted email previews showing exactly what would be sent to different departments. "
+                    "Include email headers (To, Subject, Priority), full message bodies with evidence "
+                    "from real mentions, recommended actions, and formatting for easy review. "
+                    "Maximum 3 email previews focusing on the most critical issues."
+                ),
+                agent=self.response_coordinator,
+                context=[task for task in [monitor_task, sentiment_task] if task],
+                callback=callback("response")
+            )
         
-        return [monitor_task, sentiment_task, response_task]
+        return [task for task in [monitor_task, sentiment_task, response_task] if task]
     
-    def run(self, company_name: str) -> Dict[str, Any]:
+    def _routing_records(self, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """Model routing decisions and latencies of a run's tasks."""
+        return self.router.pop_records(tasks) if self.router else []
+    
+    def run(
+        self,
+        company_name: str,
+        deadline: Optional[Deadline] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute the fast workflow for a given company.
         
         Args:
             company_name: Name of the company to analyze
+            deadline: Optional request deadline. If it runs out, stages that
+                have not started are skipped and partial results are returned.
+            resume_run_id: Run id of an earlier partial or failed run to
+                resume; its completed stages are not run again
             
         Returns:
             Dictionary containing workflow results and metadata
         """
         start_time = time.time()
+        deadline = deadline or Deadline()
+        # Resume the earlier run a retry names, if it can be resumed
+        recorder = open_run("fast", company_name, deadline, resume_run_id)
+        attach_output_sink(recorder, "fast", company_name)
+        attach_mention_index(recorder, company_name)
+        restored = list(recorder.restored)
+        tasks: List[Task] = []
+        routing = SentimentRouting(recorder, company_name)
+        status = "error"
         
         try:
-            # Create tasks for this company
-            tasks = self.create_tasks(company_name)
-            
-            # Create and configure crew
-            crew = Crew(
-                agents=[self.monitor_agent, self.sentiment_analyzer, self.response_coordinator],
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True,
-                memory=False,  # Disable memory for faster execution
-                max_rpm=30
-            )
+            # Create tasks for the stages still to run. In tool mode the monitor
+            # stage runs the search directly instead of going through the Monitor agent
+            tool_monitor = settings.MONITOR_MODE == "tool"
+            crew_stages = [
+                stage for stage in self.STAGES
+                if stage not in restored and not (stage == "monitor" and tool_monitor)
+            ]
+            tasks = self.create_tasks(company_name, recorder=recorder, stages=crew_stages)
+            staged_tasks = dict(zip(crew_stages, tasks))
+            inject_restored(recorder, lambda stage: tasks)
+            # Confident mentions are scored by the local sentiment model
+            routing.attach(staged_tasks.get("sentiment"))
+            if tool_monitor and "monitor" not in restored:
+                run_tool_stage(
+                    recorder,
+                    "monitor",
+                    lambda: self.search_tool._run(company_name),
+                    tasks,
+                    f"Real internet mentions of {company_name} (JSON, collected by the monitor stage)"
+                )
+            tasks = routing.take_over(tasks, staged_tasks.get("sentiment"), [task for task in [staged_tasks.get("response")] if task])
             
-            # Execute the workflow
-            result = crew.kickoff()
+            if tasks:
+                # Create and configure crew
+                crew = Crew(
+                    agents=[task.agent for task in tasks],
+                    tasks=tasks,
+                    process=Process.sequential,
+                    verbose=True,
+                    memory=False,  # Disable memory for faster execution
+                    max_rpm=30
+                )
+                
+                # Execute the workflow within the request deadline
+                result = kickoff_with_deadline(crew, deadline, recorder)
+            else:
+                # Every stage was completed by an earlier attempt of this run
+                result = recorder.completed["response"]
             
             end_time = time.time()
             processing_time = round(end_time - start_time, 2)
@@ -147,12 +235,20 @@ class FastWorkflow:
             # Parse and structure the results
             workflow_results = {
                 "status": "success",
+                "run_id": recorder.run_id,
                 "workflow": "fast",
                 "company": company_name,
-                "agents_used": 3,
+                "agents_used": len(tasks),
                 "processing_time": f"{processing_time} seconds",
                 "execution_timestamp": datetime.utcnow().isoformat(),
                 "tasks_completed": len(tasks),
+                "stages_completed": list(self.STAGES),
+                "partial": False,
+                "deadline": deadline.to_dict(),
+                "monitor_mode": settings.MONITOR_MODE,
+                "model_routing": self._routing_records(tasks),
+                "resumed_stages": restored,
+                "sentiment_routing": routing.to_dict(),
                 "crew_output": str(result),
                 "performance": {
                     "target_time": "10-15 seconds",
@@ -161,20 +257,42 @@ class FastWorkflow:
                 }
             }
             
+            status = "success"
             return workflow_results
             
+        except DeadlineExceeded as e:
+            processing_time = round(time.time() - start_time, 2)
+            results = build_partial_results(
+                workflow="fast",
+                company_name=company_name,
+                stages=self.STAGES,
+                recorder=recorder,
+                processing_time=processing_time,
+                reason=str(e)
+            )
+            results["model_routing"] = self._routing_records(tasks)
+            results["resumed_stages"] = restored
+            status = "partial"
+            return results
+            
         except Exception as e:
             end_time = time.time()
             processing_time = round(end_time - start_time, 2)
             
             return {
                 "status": "error",
+                "run_id": recorder.run_id,
                 "workflow": "fast", 
                 "company": company_name,
                 "error": str(e),
                 "processing_time": f"{processing_time} seconds",
                 "execution_timestamp": datetime.utcnow().isoformat()
             }
+        
+        finally:
+            # Completed runs are closed; partial and failed ones stay resumable
+            finish_run(recorder, status)
+            record_insights(recorder, "fast", company_name, status)
 
 
 # Standalone execution for testing
@@ -0,0 +1,55 @@
+"""
+Incremental updates of the mention search index and the materialized
+dashboard insights from workflow runs.
+"""
+import logging
+
+from analytics import extract_mentions
+from analytics.insights import run_aggregates
+from analytics.sentiment_model import match_entries
+from runtime.insights import get_insights_store
+from runtime.mention_index import get_mention_index
+from workflows.execution import StageRecorder
+
+
+logger = logging.getLogger(__name__)
+
+
+def attach_mention_index(recorder: StageRecorder, company_name: str) -> None:
+    """
+    Index a run's mentions when the monitor stage completes, and their
+    sentiment scores when the sentiment stage does.
+    
+    Restored stages were indexed by the attempt that completed them.
+    """
+    index = get_mention_index()
+    if index is None:
+        return
+    
+    def _index(stage: str, output: str) -> None:
+        try:
+            if stage == "monitor":
+                index.index_mentions(company_name, extract_mentions(output), recorder.run_id)
+            elif stage == "sentiment" and "monitor" in recorder.completed:
+                mentions = extract_mentions(recorder.completed["monitor"])
+                index.update_sentiment(company_name, match_entries(mentions, output))
+        except Exception as e:
+            logger.error(f"Failed to index {stage} output of run {recorder.run_id}: {e}")
+    
+    recorder.subscribe(_index)
+
+
+def record_insights(recorder: StageRecorder, workflow: str, company_name: str, status: str) -> None:
+    """
+    Materialize the aggregates of a completed run for GET /insights.
+    
+    Partial and failed runs are skipped: they may still be resumed, and
+    each run is counted in its company's rollup only once.
+    """
+    store = get_insights_store()
+    if store is None or status != "success" or "monitor" not in recorder.completed:
+        return
+    try:
+        store.record_run(recorder.run_id, workflow, company_name, run_aggregates(recorder.completed))
+    except Exception as e:
+        logger.error(f"Failed to record insights of run {recorder.run_id}: {e}")
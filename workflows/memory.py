@@ -0,0 +1,277 @@
+"""
+Bounded, scoped memory backend for the Deep workflow.
+Replaces CrewAI's default unbounded RAG/SQLite memory with in-process stores
+that are scoped per company or per request, capped in size, expired by TTL,
+and searched with a local hashing vector index instead of embedding API calls.
+"""
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class LocalHashingEmbedder:
+    """
+    Embeds text into a fixed-size vector with the hashing trick.
+    
+    Tokens are hashed into `dim` signed buckets and the vector is L2-normalized,
+    so cosine similarity is a dot product. No network calls, no model files.
+    """
+    
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+    
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_PATTERN.findall(str(text).lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def _provider_embedder() -> Callable[[str], np.ndarray]:
+    """Embed with the OpenAI embeddings API, normalized for cosine search."""
+    from langchain_openai import OpenAIEmbeddings
+    
+    client = OpenAIEmbeddings(api_key=settings.OPENAI_API_KEY)
+    
+    def embed(text: str) -> np.ndarray:
+        vector = np.asarray(client.embed_query(str(text)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    return embed
+
+
+class BoundedRAGStorage:
+    """
+    CrewAI-compatible RAG storage with a size cap and TTL eviction.
+    
+    Implements the save/search/reset interface used by ShortTermMemory and
+    EntityMemory. The oldest item is evicted once `max_items` is reached and
+    items older than `ttl_seconds` are dropped on every access.
+    """
+    
+    def __init__(self, embed: Callable[[str], np.ndarray], max_items: int, ttl_seconds: float):
+        self.embed = embed
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def save(self, value: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        vector = self.embed(value)
+        with self._lock:
+            self._evict_expired()
+            while len(self._items) >= self.max_items:
+                self._items.popitem(last=False)
+            self._items[uuid.uuid4().hex] = {
+                "context": str(value),
+                "metadata": metadata or {},
+                "vector": vector,
+                "saved_at": time.monotonic()
+            }
+    
+    def search(self, query: str, limit: int = 3, score_threshold: float = 0.35) -> List[Dict[str, Any]]:
+        query_vector = self.embed(query)
+        with self._lock:
+            self._evict_expired()
+            if not self._items:
+                return []
+            ids = list(self._items.keys())
+            matrix = np.stack([self._items[item_id]["vector"] for item_id in ids])
+            items = [self._items[item_id] for item_id in ids]
+        
+        scores = matrix @ query_vector
+        order = np.argsort(-scores)[:limit]
+        return [
+            {
+                "id": ids[i],
+                "context": items[i]["context"],
+                "metadata": items[i]["metadata"],
+                "score": float(scores[i])
+            }
+            for i in order if scores[i] >= score_threshold
+        ]
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._items.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+    
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._items:
+            oldest_id, oldest = next(iter(self._items.items()))
+            if oldest["saved_at"] > cutoff:
+                break
+            del self._items[oldest_id]
+
+
+class BoundedLongTermStorage:
+    """
+    CrewAI-compatible long-term memory storage with a size cap and TTL eviction.
+    
+    Mirrors the save/load/reset interface of CrewAI's LTMSQLiteStorage but
+    keeps a bounded number of entries in memory.
+    """
+    
+    def __init__(self, max_items: int, ttl_seconds: float):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def save(self, task_description: str, metadata: Dict[str, Any], datetime: str, score: float) -> None:
+        with self._lock:
+            self._evict_expired()
+            if len(self._entries) >= self.max_items:
+                self._entries.pop(0)
+            self._entries.append({
+                "task_description": task_description,
+                "metadata": metadata,
+                "datetime": datetime,
+                "score": score,
+                "saved_at": time.monotonic()
+            })
+    
+    def load(self, task_description: str, latest_n: int) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            self._evict_expired()
+            matches = [e for e in reversed(self._entries) if e["task_description"] == task_description]
+        if not matches:
+            return None
+        return [
+            {"metadata": e["metadata"], "datetime": e["datetime"], "score": e["score"]}
+            for e in matches[:latest_n]
+        ]
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+    
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        self._entries = [e for e in self._entries if e["saved_at"] > cutoff]
+
+
+class MemoryScope:
+    """The short-term, entity and long-term stores for one company or request."""
+    
+    def __init__(self, embed: Callable[[str], np.ndarray], max_items: int, ttl_seconds: float):
+        self.short_term = BoundedRAGStorage(embed, max_items, ttl_seconds)
+        self.entities = BoundedRAGStorage(embed, max_items, ttl_seconds)
+        self.long_term = BoundedLongTermStorage(max_items, ttl_seconds)
+        self.last_used = time.monotonic()
+    
+    def size(self) -> int:
+        return len(self.short_term) + len(self.entities) + len(self.long_term)
+
+
+class ScopedMemoryRegistry:
+    """
+    Hands out memory scopes keyed by company or request.
+    
+    At most `max_scopes` scopes are kept; the least recently used scope is
+    dropped when a new one is needed, and idle scopes expire after the TTL.
+    Per-request scopes are released as soon as their run finishes.
+    """
+    
+    def __init__(
+        self,
+        max_scopes: Optional[int] = None,
+        max_items: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        embedder: Optional[str] = None
+    ):
+        self.max_scopes = max_scopes or settings.MEMORY_MAX_SCOPES
+        self.max_items = max_items or settings.MEMORY_MAX_ITEMS
+        self.ttl_seconds = ttl_seconds or settings.MEMORY_TTL_SECONDS
+        embedder = embedder or settings.MEMORY_EMBEDDER
+        self.embed = _provider_embedder() if embedder == "provider" else LocalHashingEmbedder()
+        self._scopes: "OrderedDict[str, MemoryScope]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def scope_key(self, company_name: str) -> str:
+        """Build the scope key for a run according to MEMORY_SCOPE."""
+        if settings.MEMORY_SCOPE == "request":
+            return f"request:{uuid.uuid4().hex}"
+        return f"company:{company_name.strip().lower()}"
+    
+    def get(self, key: str) -> MemoryScope:
+        """Return the scope for `key`, creating it (and evicting others) as needed."""
+        with self._lock:
+            now = time.monotonic()
+            for stale in [k for k, s in self._scopes.items() if now - s.last_used > self.ttl_seconds]:
+                del self._scopes[stale]
+            
+            scope = self._scopes.get(key)
+            if scope is None:
+                while len(self._scopes) >= self.max_scopes:
+                    self._scopes.popitem(last=False)
+                scope = MemoryScope(self.embed, self.max_items, self.ttl_seconds)
+                self._scopes[key] = scope
+            else:
+                self._scopes.move_to_end(key)
+            scope.last_used = now
+            return scope
+    
+    def release(self, key: str) -> None:
+        """Drop a scope once it is no longer needed (used for per-request scopes)."""
+        with self._lock:
+            self._scopes.pop(key, None)
+    
+    def crew_kwargs(self, key: str) -> Dict[str, Any]:
+        """
+        Build the memory-related keyword arguments for a CrewAI Crew.
+        
+        Args:
+            key: Scope key from scope_key()
+            
+        Returns:
+            Keyword arguments selecting memory according to MEMORY_BACKEND
+        """
+        if settings.MEMORY_BACKEND == "off":
+            return {"memory": False}
+        if settings.MEMORY_BACKEND == "crewai":
+            return {"memory": True}
+        
+        from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+        
+        scope = self.get(key)
+        return {
+            "memory": True,
+            "short_term_memory": ShortTermMemory(storage=scope.short_term),
+            "entity_memory": EntityMemory(storage=scope.entities),
+            "long_term_memory": LongTermMemory(storage=scope.long_term)
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Scope counts and item totals for health reporting."""
+        with self._lock:
+            return {
+                "backend": settings.MEMORY_BACKEND,
+                "scope": settings.MEMORY_SCOPE,
+                "scopes": len(self._scopes),
+                "max_scopes": self.max_scopes,
+                "items": sum(scope.size() for scope in self._scopes.values()),
+                "max_items_per_store": self.max_items
+            }
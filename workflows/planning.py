@@ -0,0 +1,193 @@
+"""
+Static execution plans for the Deep workflow.
+Replaces CrewAI's per-run planning LLM call with a plan that is written by
+hand (or generated once by the CrewAI planner), cached, and appended to each
+task's description exactly as CrewAI's planner would.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Placeholder substituted for the company name when building template tasks
+COMPANY_PLACEHOLDER = "{company}"
+
+# Hand-written plan for the five deep stages. Mirrors what the CrewAI planner
+# produces for these tasks, without paying for an LLM round trip every run.
+HANDWRITTEN_DEEP_PLAN = {
+    "monitor": (
+        "1. Call the tavily_company_search tool once with the company name {company}.\n"
+        "2. Keep every returned mention with its platform, content, URL, timestamp, relevance_score and mention_type.\n"
+        "3. Return the mentions as JSON without rewriting or inventing any content."
+    ),
+    "sentiment": (
+        "1. Read every mention from the monitor output for {company}.\n"
+        "2. Score each mention: sentiment (-1 to +1), urgency (0-10), user influence, viral potential "
+        "(Low/Medium/High) and emotional intensity.\n"
+        "3. Flag mentions with sentiment < -0.5 as critical and explain each score in one sentence.\n"
+        "4. Finish with aggregate statistics and the top critical issues."
+    ),
+    "priority": (
+        "1. Group the scored {company} mentions into distinct issues.\n"
+        "2. Score each issue 0-100: User Influence (0-30), Sentiment Severity (0-25), Viral Potential (0-25), "
+        "Frequency/Pattern (0-20).\n"
+        "3. Classify Critical (71-100), High (51-70), Medium (31-50), Low (0-30) with a short rationale.\n"
+        "4. Recommend a response timeline per level and name the top 3-5 issues."
+    ),
+    "investigation": (
+        "1. Compare the {company} issues across platforms, time and wording.\n"
+        "2. Decide for each issue whether it is isolated or systemic, citing the supporting mentions.\n"
+        "3. Identify likely root causes and the growth trend.\n"
+        "4. Assess the risk of escalation into a crisis."
+    ),
+    "response": (
+        "1. Select the most critical {company} issues from the prior analysis.\n"
+        "2. Draft one email preview per department (Engineering, PR/Marketing, Customer Support, Management) "
+        "with recipient, priority, subject, evidence, actions, timeline and success metrics.\n"
+        "3. Format the previews with the email_preview_generator tool. Do not send anything."
+    ),
+}
+
+
+def task_signature(template_tasks: List[Tuple[str, Any]]) -> str:
+    """
+    Hash the task definitions a plan was made for.
+    
+    Args:
+        template_tasks: (stage, Task) pairs built with COMPANY_PLACEHOLDER as the company
+        
+    Returns:
+        Hex digest that changes whenever a description, expected output or agent changes
+    """
+    definition = [
+        {
+            "stage": stage,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "agent": task.agent.role if task.agent else None
+        }
+        for stage, task in template_tasks
+    ]
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class StaticPlanner:
+    """
+    Provides a cached per-stage plan and injects it into each run's tasks.
+    
+    With DEEP_PLAN_SOURCE="handwritten" the plan above is used as-is. With
+    "generated", the CrewAI planner runs once against template tasks, the
+    result is cached on disk keyed by the task signature, and it is only
+    regenerated when the task definitions change.
+    """
+    
+    def __init__(
+        self,
+        template_factory: Callable[[], List[Tuple[str, Any]]],
+        llm: Optional[Any] = None,
+        cache_path: Optional[str] = None
+    ):
+        self.template_factory = template_factory
+        self.llm = llm
+        self.cache_path = cache_path or settings.PLAN_CACHE_PATH
+        self._plan: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+    
+    def plan(self) -> Dict[str, str]:
+        """Return the per-stage plan, loading or generating it on first use."""
+        if self._plan is None:
+            with self._lock:
+                if self._plan is None:
+                    self._plan = self._load_plan()
+        return self._plan
+    
+    def apply(self, staged_tasks: List[Tuple[str, Any]], company_name: str) -> None:
+        """Append each stage's plan to its task description, as CrewAI's planner does."""
+        plan = self.plan()
+        for stage, task in staged_tasks:
+            step_plan = plan.get(stage)
+            if step_plan:
+                task.description += "\n\n" + step_plan.replace(COMPANY_PLACEHOLDER, company_name)
+    
+    def invalidate(self) -> None:
+        """Forget the in-memory plan so it is re-checked against the task definitions."""
+        with self._lock:
+            self._plan = None
+    
+    def _load_plan(self) -> Dict[str, str]:
+        if settings.DEEP_PLAN_SOURCE != "generated":
+            return dict(HANDWRITTEN_DEEP_PLAN)
+        
+        template_tasks = self.template_factory()
+        signature = task_signature(template_tasks)
+        
+        cached = self._read_cache()
+        if cached and cached.get("signature") == signature:
+            logger.info("Using cached deep workflow plan")
+            return cached["plans"]
+        
+        try:
+            plans = self._generate(template_tasks)
+        except (ImportError, AttributeError, TypeError) as e:
+            logger.warning(
+                f"CrewAI planner API is not compatible with this crewai version, using hand-written plan: {e}"
+            )
+            return dict(HANDWRITTEN_DEEP_PLAN)
+        except Exception as e:
+            logger.error(f"Plan generation failed, using hand-written plan: {e}")
+            return dict(HANDWRITTEN_DEEP_PLAN)
+        
+        self._write_cache({
+            "signature": signature,
+            "generated_at": datetime.utcnow().isoformat(),
+            "plans": plans
+        })
+        return plans
+    
+    def _generate(self, template_tasks: List[Tuple[str, Any]]) -> Dict[str, str]:
+        """
+        Run the CrewAI planner once over the template tasks.
+        
+        CrewPlanner._handle_crew_planning is private CrewAI API (tested with
+        the crewai range pinned in requirements.txt). If it moves or changes
+        shape, the ImportError, AttributeError or TypeError makes the caller
+        fall back to the hand-written plan.
+        
+        Raises:
+            ValueError: If the planner does not return one plan per task
+        """
+        from crewai.utilities.planning_handler import CrewPlanner
+        
+        logger.info("Generating deep workflow plan (task definitions changed)")
+        result = CrewPlanner(
+            tasks=[task for _, task in template_tasks],
+            planning_agent_llm=self.llm
+        )._handle_crew_planning()
+        
+        steps = list(result.list_of_plans_per_task)
+        if len(steps) != len(template_tasks):
+            raise ValueError(f"Planner returned {len(steps)} plans for {len(template_tasks)} tasks")
+        return {stage: str(step.plan) for (stage, _), step in zip(template_tasks, steps)}
+    
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_cache(self, data: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not cache deep workflow plan: {e}")
@@ -0,0 +1,146 @@
+"""
+Routing of sentiment scoring between the local model and the Sentiment Analyzer.
+High-confidence mentions are scored by the distilled local model and handed to
+the Sentiment Analyzer as precomputed entries; only the rest are analyzed by
+the LLM, whose labels are collected to train the next model version.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from analytics import extract_mentions
+from analytics.sentiment_model import (
+    SENTIMENT_BANDS,
+    extract_labels,
+    get_label_store,
+    get_model_registry,
+    mention_key,
+    sentiment_band,
+)
+from config import settings
+from workflows.execution import StageRecorder, inject_context
+
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentRouting:
+    """
+    Per-run sentiment routing and label collection.
+    
+    Once the monitor output is known, the local model scores every mention.
+    Mentions at or above SENTIMENT_CONFIDENCE_THRESHOLD are precomputed for
+    the Sentiment Analyzer. If all of them are, and the crew has not been
+    kicked off yet, `take_over` records the sentiment stage locally so the
+    LLM call is skipped entirely.
+    """
+    
+    def __init__(self, recorder: StageRecorder, company_name: str):
+        self.recorder = recorder
+        self.company_name = company_name
+        self.model = get_model_registry().current() if settings.SENTIMENT_MODE == "hybrid" else None
+        self.labels = get_label_store()
+        self.local: Dict[str, Dict[str, Any]] = {}
+        self.remaining: Optional[int] = None
+        self.took_over = False
+        self._report: Optional[str] = None
+    
+    def attach(self, sentiment_task: Any) -> None:
+        """
+        Route the run's mentions for a sentiment task and collect its labels.
+        
+        Args:
+            sentiment_task: Sentiment task of the current run, or None if the
+                stage does not run (e.g. restored from a checkpoint)
+        """
+        if sentiment_task is None:
+            return
+        if self.labels is not None:
+            self.recorder.subscribe(self._collect)
+        if self.model is None:
+            return
+        
+        def _route(monitor_output: str) -> None:
+            self._route(monitor_output, sentiment_task)
+        
+        if "monitor" in self.recorder.restored:
+            _route(self.recorder.restored["monitor"])
+        else:
+            self.recorder.on_complete("monitor", _route)
+    
+    def _route(self, monitor_output: str, sentiment_task: Any) -> None:
+        mentions = extract_mentions(monitor_output)
+        if not mentions:
+            return
+        
+        threshold = settings.SENTIMENT_CONFIDENCE_THRESHOLD
+        predictions = self.model.predict(mentions)
+        confident = [p for p in predictions if p["confidence"] >= threshold]
+        remaining = [m for m, p in zip(mentions, predictions) if p["confidence"] < threshold]
+        self.local = {mention_key(m): p for m, p in zip(mentions, predictions) if p["confidence"] >= threshold}
+        self.remaining = len(remaining)
+        if not confident:
+            return
+        
+        if not remaining:
+            self._report = self.report(confident)
+        inject_context(
+            [sentiment_task],
+            f"Precomputed sentiment from the local model {self.model.version} for {len(confident)} of "
+            f"{len(mentions)} mentions. Include these entries unchanged and analyze only the "
+            f"{len(remaining)} remaining mention(s)"
+            + (": " + json.dumps([m.get("url") or m.get("title", "") for m in remaining]) if remaining else ""),
+            json.dumps(confident)
+        )
+    
+    def report(self, predictions: List[Dict[str, Any]]) -> str:
+        """Sentiment stage output built from local predictions only."""
+        bands = [sentiment_band(p["sentiment_score"]) for p in predictions]
+        scores = [p["sentiment_score"] for p in predictions]
+        return json.dumps({
+            "company": self.company_name,
+            "scoring_source": f"local_model:{self.model.version}",
+            "mentions": predictions,
+            "summary": {
+                "total_mentions": len(predictions),
+                "average_sentiment": round(sum(scores) / len(scores), 2),
+                "band_counts": {band: bands.count(band) for band in SENTIMENT_BANDS},
+                "critical_issues": [p["title"] or p["url"] for p in predictions if p["critical_flag"]],
+            }
+        })
+    
+    def take_over(self, tasks: List[Any], sentiment_task: Any, dependents: List[Any]) -> List[Any]:
+        """
+        Record the sentiment stage locally when every mention was scored
+        before the crew starts, and drop its task.
+        
+        Returns:
+            The tasks still to run
+        """
+        if self._report is None or not any(task is sentiment_task for task in tasks):
+            return tasks
+        inject_context(dependents, "Sentiment analysis (scored by the local model)", self._report)
+        self.recorder.callback("sentiment")(self._report)
+        self.took_over = True
+        return [task for task in tasks if task is not sentiment_task]
+    
+    def _collect(self, stage: str, output: str) -> None:
+        """Keep the LLM's labels for mentions the local model did not score."""
+        monitor_output = self.recorder.completed.get("monitor")
+        if stage != "sentiment" or monitor_output is None or output == self._report:
+            return
+        try:
+            mentions = [m for m in extract_mentions(monitor_output) if mention_key(m) not in self.local]
+            self.labels.append(extract_labels(mentions, output), self.company_name, self.recorder.run_id)
+        except Exception as e:
+            logger.error(f"Failed to collect sentiment labels for run {self.recorder.run_id}: {e}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Routing summary for the workflow results."""
+        return {
+            "mode": settings.SENTIMENT_MODE,
+            "model_version": self.model.version if self.model else None,
+            "local_mentions": len(self.local),
+            "llm_mentions": self.remaining,
+            "llm_skipped": self.took_over,
+        }